@@ -10,8 +10,17 @@ import websockets
 from ssp_bridge.plugins.registry import create_plugin, auto_detect_plugin
 from ssp_bridge.outputs.ndjson import NdjsonWriter
 from ssp_bridge.outputs.ws import WSBroadcaster
-from ssp_bridge.outputs.serial_out import SerialOut
-from ssp_bridge.core.derived import RpmMaxTracker, add_engine_rpm_pct
+from ssp_bridge.outputs.serial_hub import SerialHub, load_serial_config, parse_serial_spec
+from ssp_bridge.core.derived import DerivedSignals
+from ssp_bridge.core.filters import SignalFilters, load_filter_config, parse_filter_spec
+from ssp_bridge.core.history import SampleRing
+from ssp_bridge.core.ingest import INGEST
+from ssp_bridge.core.leds import ShiftLights, ShiftProfiles, load_shift_profiles
+from ssp_bridge.core.latency import LatencyTracker
+from ssp_bridge.core.pacing import AdaptivePoller, FrameWaker
+from ssp_bridge.core.serialize import SerializedFrame, serialize
+from ssp_bridge.core.shm import FileMapping, SharedMapping
+from ssp_bridge.core.udp import KERNEL_TIMESTAMPS_SUPPORTED, RECEIVER_MODES, BatchUDPReceiver
 
 
 # Deduplication state (avoid repeating identical status events).
@@ -37,21 +46,66 @@ def make_capabilities_event(source: str, caps: dict) -> dict:
     }
 
 
+def make_stats_event(source: str | None, latency: dict, ingest: dict | None, ws: list | None, serial: list | None) -> dict:
+    return {
+        "type": "stats",
+        "ts": time.time(),
+        "source": source,
+        "latency": latency,  # stage -> {count, p50_ms, p90_ms, p99_ms, max_ms}
+        "ingest": ingest,    # plugin receive counters (UDP plugins)
+        "ws": ws,            # per-client queue counters
+        "serial": serial,    # per-device counters
+    }
+
+
 def parse_args():
     p = argparse.ArgumentParser(prog="ssp-bridge", description="SimRacing Standard Protocol Bridge")
-    p.add_argument("--game", default="ac", help="plugin id (ac, acc, ams2, beamng, auto)")
+    p.add_argument("--game", default="ac", help="plugin id (ac, acc, ams2, beamng, replay, auto)")
     p.add_argument("--hz", type=float, default=60.0, help="loop frequency (default: 60)")
     p.add_argument("--out", default="logs", help="output directory (default: logs)")
     p.add_argument("--ndjson", choices=["on", "off"], default="on", help="enable NDJSON logging")
+    p.add_argument("--stdout", choices=["on", "off"], default="on", help="echo every event to stdout")
     p.add_argument("--ws", choices=["on", "off"], default="on", help="enable WebSocket streaming")
     p.add_argument("--capabilities", default="auto", help="capabilities output: auto | off | <path>")
     p.add_argument("--session", default="auto", help="ndjson session name: auto | <name>")
+    p.add_argument("--ndjson-flush", choices=["line", "batch"], default="line", help="NDJSON flush policy (default: line)")
+    p.add_argument("--ndjson-flush-interval", type=float, default=1.0, help="batch mode: max seconds between flushes")
+    p.add_argument("--ndjson-flush-kb", type=int, default=64, help="batch mode: flush once this many KiB are buffered")
+    p.add_argument("--ndjson-fsync", choices=["on", "off"], default="off", help="fsync after every flush")
+    p.add_argument("--ndjson-rotate-mb", type=float, default=0.0, help="rotate NDJSON segments by size (0 = off)")
+    p.add_argument("--ndjson-rotate-min", type=float, default=0.0, help="rotate NDJSON segments by duration (0 = off)")
+    p.add_argument("--ndjson-compress", choices=["on", "off"], default="off", help="gzip closed NDJSON segments")
     p.add_argument("--wait", choices=["on", "off"], default="on", help="wait for simulator to be available")
     p.add_argument("--wait-interval", type=float, default=2.0, help="seconds between retry attempts")
+    p.add_argument("--udp-transport", choices=list(RECEIVER_MODES), default="asyncio", help="UDP plugins: receive on the event loop or on a thread per socket (default: asyncio)")
+    p.add_argument("--udp-timestamps", choices=["kernel", "off"], default="off", help="UDP plugins: use kernel receive timestamps (SO_TIMESTAMPNS, Linux) for latency stats")
+    p.add_argument("--stats-interval", type=float, default=0.0, help="seconds between stats events with per-stage latency (0 = off)")
+    p.add_argument("--stats-window", type=float, default=10.0, help="latency histogram window in seconds (default: 10)")
+    p.add_argument("--history", type=int, default=256, help="UDP plugins: samples kept per source to aggregate between frames (0 = off, default: 256)")
+    p.add_argument("--frame-window", choices=["on", "off"], default="off", help="add min/max/mean/last of the samples since the previous frame to each frame (needs --history)")
+    p.add_argument("--filter", action="append", default=None, help="smooth a signal: SIGNAL=KIND[:key=value...][+KIND...] with KIND ema|one_euro|median|rate (repeatable)")
+    p.add_argument("--filter-config", default=None, help="JSON file mapping signal names to filters")
+    p.add_argument("--shift-lights", default="off", help="publish hw.leds (shift light LED bitmask): off | default | <profiles.json>")
+    p.add_argument("--shm-dir", default=None, help="AC/ACC: read mirrored shared memory page files from this directory (e.g. /dev/shm) instead of WinAPI mappings")
     p.add_argument("--ws-host", default="127.0.0.1")
     p.add_argument("--ws-port", type=int, default=8765)
-    p.add_argument("--serial-out", default=None, help="Send NDJSON lines via Serial COM:BAUD (example: COM3:115200)",)
-    return p.parse_args()
+    p.add_argument("--serial-out", action="append", default=None, help="serial device PORT[:BAUD][,enc=..,hz=..,signals=a+b,precision=..] (repeatable; example: COM3:115200)",)
+    p.add_argument("--serial-config", default=None, help="JSON file with a list of serial devices")
+    p.add_argument("--serial-mode", choices=["json", "csv", "delta", "binary"], default="json", help="default serial encoding (default: json)")
+    p.add_argument("--replay", default=None, help="replay a recorded NDJSON session (implies --game replay)")
+    p.add_argument("--replay-speed", type=float, default=1.0, help="replay speed multiplier, 0 = as fast as possible (default: 1.0)")
+    p.add_argument("--replay-loop", choices=["on", "off"], default="off", help="restart the replay at the end of the session")
+    p.add_argument("--replay-seek", type=float, default=0.0, help="start the replay this many seconds into the session")
+    p.add_argument("--delta-keyframe", type=float, default=2.0, help="seconds between delta-mode keyframes (default: 2.0)")
+    args = p.parse_args()
+
+    # Unlike a simulator, a replay file never shows up later: --wait would retry forever.
+    if args.replay is not None or args.game.strip().lower() == "replay":
+        if not args.replay:
+            p.error("--game replay needs a recorded session: --replay <file>")
+        if not Path(args.replay).is_file():
+            p.error(f"--replay: no such file: {args.replay}")
+    return args
 
 
 def make_session_filename(args) -> str:
@@ -78,9 +132,28 @@ def resolve_capabilities_path(args, out_dir: Path, plugin_id: str) -> Path | Non
 
 async def main():
     args = parse_args()
+    BatchUDPReceiver.default_mode = args.udp_transport
+    BatchUDPReceiver.kernel_timestamps = args.udp_timestamps == "kernel"
+    SampleRing.default_capacity = max(args.history, 0)
+    if args.shm_dir:
+        SharedMapping.default_backend = "file"
+        FileMapping.directory = args.shm_dir
+    if BatchUDPReceiver.kernel_timestamps and not KERNEL_TIMESTAMPS_SUPPORTED:
+        print("Kernel UDP timestamps are not supported on this platform; using receive time.")
     out_dir = Path(args.out)
     out_dir.mkdir(parents=True, exist_ok=True)
-    rpm_tracker = RpmMaxTracker(publish_min_rpm=3000)
+    # Per-signal smoothing (core/filters.py); runs before the derivations.
+    filter_config = dict(parse_filter_spec(spec) for spec in (args.filter or []))
+    if args.filter_config:
+        filter_config.update(load_filter_config(args.filter_config))
+    filters = SignalFilters(filter_config)
+
+    # Derived signals (core/derived.py), compiled down to what the sinks below consume.
+    extra = []
+    if args.shift_lights != "off":
+        profiles = ShiftProfiles() if args.shift_lights == "default" else load_shift_profiles(args.shift_lights)
+        extra.append(ShiftLights(profiles, max_hz=max(args.hz, 1.0)))
+    derived = DerivedSignals(extra=extra)
 
 
     # --- Output Handlers Setup ---
@@ -88,43 +161,69 @@ async def main():
     nd_path = None
     if args.ndjson == "on":
         nd_path = out_dir / make_session_filename(args)
-        nd = NdjsonWriter(str(nd_path))
+        nd = NdjsonWriter(
+            str(nd_path),
+            flush=args.ndjson_flush,
+            flush_bytes=args.ndjson_flush_kb * 1024,
+            flush_interval=args.ndjson_flush_interval,
+            fsync=args.ndjson_fsync == "on",
+            rotate_bytes=int(args.ndjson_rotate_mb * 1024 * 1024),
+            rotate_seconds=args.ndjson_rotate_min * 60.0,
+            compress=args.ndjson_compress == "on",
+        )
 
     ws = None
     server = None
     if args.ws == "on":
-        ws = WSBroadcaster()
+        ws = WSBroadcaster(keyframe_interval=args.delta_keyframe)
         server = await websockets.serve(ws.handler, args.ws_host, args.ws_port)
 
     serial_out = None
-    if args.serial_out:
-        parts = args.serial_out.split(":")
-        port = parts[0].strip()
-        baud = int(parts[1]) if len(parts) > 1 and parts[1].strip() else 115200
-        serial_out = SerialOut(port, baud)
+    serial_configs = [parse_serial_spec(spec, args.serial_mode) for spec in (args.serial_out or [])]
+    if args.serial_config:
+        serial_configs += load_serial_config(args.serial_config, args.serial_mode)
+    if serial_configs:
+        serial_out = SerialHub(serial_configs, keyframe_interval=args.delta_keyframe)
 
-        
+
+    # Per-stage latency histograms (only maintained when stats events are on).
+    latency = LatencyTracker(window=args.stats_window) if args.stats_interval > 0 else None
 
     # --- Communication Helpers ---
-    def emit(obj: dict):
-        line = json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+    def emit(obj, clock=None) -> SerializedFrame:
+        # Encode once; every sink below shares the same text/bytes.
+        sf = serialize(obj)
+        if clock:
+            clock.mark("encode")
         # stdout
-        print(line)
+        if args.stdout == "on":
+            print(sf.text)
+            if clock:
+                clock.mark("stdout")
         # websocket
         if ws:
-            ws.update_sticky(obj)
+            ws.update_sticky(sf)
         # ndjson file
         if nd:
-            nd.write(obj)
-        # serial out
-        if serial_out:
-            serial_out.send_line(line)
-
-    async def emit_async(obj: dict):
+            nd.write(sf)
+            if clock:
+                clock.mark("ndjson")
+        # serial out (stats events are for dashboards, not devices)
+        if serial_out and sf.type != "stats":
+            serial_out.send(sf)
+            if clock:
+                clock.mark("serial")
+        return sf
+
+    async def emit_async(obj: dict, clock=None):
         """Async wrapper for emit that broadcasts to WebSocket."""
-        emit(obj)
+        sf = emit(obj, clock)
         if ws:
-            await ws.broadcast(obj)
+            await ws.broadcast(sf)
+            if clock:
+                clock.mark("ws")
+        if clock:
+            clock.done()
 
     async def emit_status(state: str, source: str | None):
         global _last_status_key
@@ -135,27 +234,50 @@ async def main():
         await emit_async(make_status_event(state, source))
 
     async def emit_capabilities(source: str, plugin):
-        await emit_async(make_capabilities_event(source, plugin.capabilities()))
+        await emit_async(make_capabilities_event(source, derived.capabilities(plugin.capabilities())))
 
     # --- Plugin Initialization ---
     game = args.game.strip().lower()
+    plugin_options = {}
+    if args.replay:
+        game = "replay"
+    if game == "replay":
+        plugin_options = {
+            "path": args.replay,
+            "speed": args.replay_speed,
+            "loop": args.replay_loop == "on",
+            "seek": args.replay_seek,
+        }
     plugin = None
 
+    # UDP ports stay bound for the whole process (core/ingest.py); receivers start on this loop.
+    INGEST.bind_loop(asyncio.get_running_loop())
+    # Wakes the main loop on fresh plugin data, and the detection loops when an idle UDP port
+    # starts receiving (INGEST.on_activity, set while detecting only).
+    waker = FrameWaker()
+
+    async def detect():
+        """Open the plugin (or auto-detect one) off the event loop, so WS clients keep being served."""
+        if game == "auto":
+            return await asyncio.to_thread(auto_detect_plugin)
+        candidate = create_plugin(game, **plugin_options)
+        await asyncio.to_thread(candidate.open)
+        return candidate  # only once open() succeeded
+
     # Emit "waiting" before entering the detection loop.
     await emit_status("waiting", None)
 
+    INGEST.on_activity = waker.notify
     while plugin is None:
         try:
-            if game == "auto":
-                plugin = auto_detect_plugin()
-            else:
-                plugin = create_plugin(game)
-                plugin.open()
+            plugin = await detect()
         except Exception as e:
             if args.wait == "off":
+                INGEST.close()
                 raise RuntimeError(f"Failed to open simulator ({args.game}): {e}") from e
             print(f"Waiting for simulator ({args.game})... ({e})")
-            await asyncio.sleep(max(args.wait_interval, 0.2))
+            await waker.wait(max(args.wait_interval, 0.2))
+    INGEST.on_activity = None
 
     # Emit "active" + capabilities on first detection.
     print(f"{plugin.name} detected, starting telemetry.")
@@ -167,7 +289,7 @@ async def main():
     if cap_path is not None:
         cap_path.parent.mkdir(parents=True, exist_ok=True)
         cap_path.write_text(
-            json.dumps(plugin.capabilities(), indent=2, ensure_ascii=False),
+            json.dumps(derived.capabilities(plugin.capabilities()), indent=2, ensure_ascii=False),
             encoding="utf-8"
         )
 
@@ -179,17 +301,54 @@ async def main():
 
     # --- Main Loop ---
     emit_period = 1.0 / max(args.hz, 1.0)
-    poll_sleep = min(0.005, emit_period / 4.0)
+
+    # Push plugins (UDP) wake the loop on every packet; this is only a liveness tick
+    # so stale/closed checks inside read_frame() still run while no packets arrive.
+    idle_wait = 0.25
+
+    # Pull plugins (shared memory) are polled fast while packetId advances, slow while idle.
+    poller = AdaptivePoller(min_interval=min(0.005, emit_period / 4.0), max_interval=0.2)
+
+    # Push plugins may keep every received sample; each emitted frame aggregates the ones
+    # received since the previous frame (peaks between frames still reach rpm_max).
+    history = None
+    history_cursor = 0
+
+    def attach(p) -> None:
+        nonlocal history, history_cursor
+        p.set_notify(waker.notify)
+        poller.reset()
+        history = p.history()
+        history_cursor = history.head if history is not None else 0
+        derived.reset()
+        if filters:
+            ignored = filters.bind(p.capabilities())
+            if ignored:
+                print(f"Filters ignored (not numeric signals of {p.id}): {', '.join(ignored)}")
+
+    attach(plugin)
 
     latest_frame: dict | None = None
+    latest_timing = None  # plugin receive/decode stamps of latest_frame
+    latest_read = 0.0     # perf_counter when latest_frame was read
+    next_stats = time.monotonic() + args.stats_interval
 
-    # Controls fixed-rate output.
+    # Controls fixed-rate output (advanced only when a frame is actually emitted,
+    # so the first packet after an idle period goes out immediately).
     next_emit = time.time()
 
     # NEW: prevents re-emitting cached frames that did not update.
     last_seen_frame_ts = None       # ts of the latest observed frame
     last_emitted_frame_ts = None    # ts of the last emitted frame
-    rpm_tracker.reset()
+    last_packet_id = None           # pull plugins: raw packet counter of the latest observed frame
+
+    # stdout and NDJSON take every signal; WS clients and serial devices only what they subscribed.
+    full_sinks = args.stdout == "on" or nd is not None
+
+    def sinks_want(key: str) -> bool:
+        return (ws is not None and ws.wants(key)) or (serial_out is not None and serial_out.wants(key))
+
+    demand_version = None  # ws.demand_version the derivations were compiled for
 
     try:
         while True:
@@ -203,62 +362,116 @@ async def main():
 
                     try:
                         if plugin:
+                            plugin.set_notify(None)
                             plugin.close()
                     except Exception:
                         pass
                     plugin = None
 
-                    # Dynamic re-detection loop.
+                    # Dynamic re-detection loop. Warm UDP ports answer at once, and packets
+                    # on an idle port cut the wait short.
+                    INGEST.on_activity = waker.notify
                     while True:
                         try:
-                            if game == "auto":
-                                plugin = auto_detect_plugin()
-                            else:
-                                plugin = create_plugin(game)
-                                plugin.open()
+                            plugin = await detect()
 
                             print(f"{plugin.name} detected, resuming telemetry.")
                             await emit_status("active", plugin.id)
                             await emit_capabilities(plugin.id, plugin)
                             break
                         except Exception:
-                            await asyncio.sleep(max(args.wait_interval, 0.5))
+                            await waker.wait(max(args.wait_interval, 0.5))
+                    INGEST.on_activity = None
 
+                    attach(plugin)
                     latest_frame = None
                     last_seen_frame_ts = None
                     last_emitted_frame_ts = None
+                    last_packet_id = None
                     next_emit = time.time()
                     continue
                 else:
                     raise
 
-            if frame is not None:
+            # Pull plugins re-stamp every read; only count a frame as new when packetId moved.
+            pkt = plugin.packet_id()
+            if frame is not None and (pkt is None or pkt != last_packet_id):
                 latest_frame = frame
+                if latency:
+                    latest_read = time.perf_counter()
+                    latest_timing = plugin.timing()
 
                 # Track newest observed frame timestamp (used for dedup).
                 ts = frame.get("ts")
                 if ts is not None:
                     last_seen_frame_ts = ts
+            last_packet_id = pkt
 
             # --- Emit at fixed rate (ONLY when a NEW frame exists) ---
+            # Only emit if we observed a newer frame since the last emit.
+            # This stops NDJSON/WS from being filled with identical frames.
             now = time.time()
-            if latest_frame is not None and now >= next_emit:
-                # Only emit if we observed a newer frame since the last emit.
-                # This stops NDJSON/WS from being filled with identical frames.
-                if last_seen_frame_ts is not None and last_seen_frame_ts != last_emitted_frame_ts:
-                    try:
-                        sig = latest_frame.get("signals", {})
-                        add_engine_rpm_pct(sig, rpm_tracker)
-                    except Exception:
-                        pass
-
-                    await emit_async(latest_frame)
-
-                    last_emitted_frame_ts = last_seen_frame_ts
-
+            pending = (
+                latest_frame is not None
+                and last_seen_frame_ts is not None
+                and last_seen_frame_ts != last_emitted_frame_ts
+            )
+            if pending and now >= next_emit:
+                clock = latency.start(latest_timing, latest_read, time.perf_counter()) if latency else None
+                samples = None
+                if history is not None:
+                    samples = history.samples(history_cursor)
+                    history_cursor = samples.end
+                window = samples.window() if samples is not None else None
+                if not full_sinks:
+                    version = ws.demand_version if ws else 0
+                    if version != demand_version:
+                        derived.compile(sinks_want)
+                        demand_version = version
+                sig = latest_frame.get("signals")
+                if sig is not None and filters:
+                    filters.apply(sig, latest_frame.get("ts"), samples)
+                    if clock:
+                        clock.mark("filter")
+                if sig is not None:
+                    derived.run(sig, window)
+                if window is not None and args.frame_window == "on":
+                    latest_frame["window"] = window.as_dict()
+                if clock:
+                    clock.mark("derive")
+
+                await emit_async(latest_frame, clock)
+
+                last_emitted_frame_ts = last_seen_frame_ts
                 next_emit = now + emit_period
-
-            await asyncio.sleep(poll_sleep)
+                pending = False
+
+            if latency and time.monotonic() >= next_stats:
+                next_stats = time.monotonic() + args.stats_interval
+                await emit_async(make_stats_event(
+                    plugin.id,
+                    latency.snapshot(),
+                    plugin.stats(),
+                    ws.stats() if ws else None,
+                    serial_out.stats() if serial_out else None,
+                ))
+
+            if not pending and frame is None and plugin.finished():
+                print(f"{plugin.name} finished.")
+                await emit_status("lost", plugin.id)
+                break
+
+            # --- Wait for the next thing worth doing ---
+            if pending:
+                # A fresh frame is held back by the rate limit: sleep until it is due,
+                # then re-read so the newest sample is the one that goes out.
+                await asyncio.sleep(next_emit - now)
+            elif plugin.push:
+                await waker.wait(min(idle_wait, args.stats_interval) if latency else idle_wait)
+            else:
+                marker = pkt if pkt is not None else (last_seen_frame_ts if frame is not None else None)
+                # Pull plugins only notify on simulator exit (ProcessWatch.on_exit).
+                await waker.wait(poller.update(marker))
 
     except (asyncio.CancelledError, KeyboardInterrupt):
         pass
@@ -268,11 +481,14 @@ async def main():
             await server.wait_closed()
         if nd:
             nd.close()
+        if serial_out:
+            serial_out.close()
         try:
             if plugin:
                 plugin.close()
         except Exception:
             pass
+        INGEST.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,102 @@
+"""Per-packet decode cost of the UDP receivers.
+
+Compares the compiled layouts (core/layout.py) with the previous per-field
+struct.unpack_from calls on synthetic AMS2 / OutGauge packets.
+
+    python benchmarks/bench_decode.py [iterations]
+"""
+import struct
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ssp_bridge.plugins.ams2 import receiver as ams2  # noqa: E402
+from ssp_bridge.plugins.beamng import receiver as beamng  # noqa: E402
+
+
+def _ams2_packet() -> bytes:
+    buf = bytearray(559)
+    struct.pack_into("<II4B", buf, 0, 1, 1, 0, 1, 0, 2)
+    struct.pack_into("<B", buf, 29, 12)
+    struct.pack_into("<B", buf, 30, 240)
+    struct.pack_into("<f", buf, 36, 41.5)
+    struct.pack_into("<HH", buf, 40, 6500, 8000)
+    struct.pack_into("<B", buf, 45, 0x63)
+    return bytes(buf)
+
+
+def _outgauge_packet() -> bytes:
+    return struct.pack(
+        beamng._OG_FMT, 0, b"beam", 0, b"\x03", b"\x00", 20.0, 3000.0,
+        0, 90, 0.5, 0, 90, 0, 0, 0.4, 0.0, 0, b"", b"", 0,
+    )
+
+
+def _decode_gear_legacy(gear_num_gears: int) -> tuple[int, int]:
+    # The previous receiver's gear decode (low nibble = gear, 15 = R; high nibble = num gears).
+    gear_raw = gear_num_gears & 0x0F
+    num_gears = (gear_num_gears >> 4) & 0x0F
+    if gear_raw == 0:
+        gear = 0
+    elif gear_raw == 15:
+        gear = -1
+    else:
+        gear = int(gear_raw)
+    return gear, int(num_gears)
+
+
+def _ams2_legacy(data: bytes):
+    brake_u8 = struct.unpack_from("<B", data, 29)[0]
+    throttle_u8 = struct.unpack_from("<B", data, 30)[0]
+    speed_ms = struct.unpack_from("<f", data, 36)[0]
+    rpm = struct.unpack_from("<H", data, 40)[0]
+    gear_num_gears = struct.unpack_from("<B", data, 45)[0]
+    max_rpm = struct.unpack_from("<H", data, 42)[0]
+    tyre_temp_c = struct.unpack_from("<4B", data, 176)
+    gear, num_gears = _decode_gear_legacy(gear_num_gears)
+    return ams2.AMS2Telemetry(
+        ts=time.time(), rpm=int(rpm), max_rpm=int(max_rpm), speed_ms=float(speed_ms),
+        throttle_pct=ams2._u8_to_pct(int(throttle_u8)), brake_pct=ams2._u8_to_pct(int(brake_u8)),
+        gear=int(gear), num_gears=int(num_gears), tyre_temp_c=tyre_temp_c,
+    )
+
+
+def _outgauge_legacy(data: bytes):
+    # The previous receiver unpacked the full packet and built the dataclass twice.
+    for _ in range(2):
+        v = struct.unpack_from(beamng._OG_FMT, data, 0)
+        gear_raw = int.from_bytes(v[3], byteorder="little", signed=True)
+        tel = beamng.BeamNGTelemetry(
+            ts=time.time(), rpm=int(v[6]) if v[6] >= 0 else 0, speed_ms=float(v[5]),
+            throttle_pct=beamng._ratio_to_pct(float(v[14])), brake_pct=beamng._ratio_to_pct(float(v[15])),
+            gear=beamng._gear_to_ssp(max(gear_raw, 0)),
+        )
+    return tel
+
+
+def _bench(fn, *args, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn(*args)
+    return (time.perf_counter() - t0) / n * 1e9
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    a, o = _ams2_packet(), _outgauge_packet()
+    assert _ams2_legacy(a)[1:] == ams2._decode_car_physics(a, 0.0)[1:]
+
+    rows = [
+        ("ams2 legacy", _bench(_ams2_legacy, a, n=n)),
+        ("ams2 layout", _bench(lambda d: ams2._decode_car_physics(d, time.time()), a, n=n)),
+        ("outgauge legacy", _bench(_outgauge_legacy, o, n=n)),
+        ("outgauge layout", _bench(lambda d: beamng._decode_outgauge(d, time.time()), o, n=n)),
+    ]
+    for name, ns in rows:
+        print(f"{name:<16} {ns:8.0f} ns/packet")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""AC/ACC shared memory read path against a file-backed page (Linux/macOS).
+
+A writer thread stands in for the sim and rewrites the physics page at `hz`; the reader polls
+it through the file backend (core/shm.py) like the runtime does, then measures the hot read
+cost (back-to-back reads of the live page).
+
+    python benchmarks/bench_shm.py [seconds] [hz]
+"""
+import ctypes
+import mmap
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ssp_bridge.core.shm import FileMapping, SharedMapping  # noqa: E402
+from ssp_bridge.plugins.ac.shared_memory import ACSharedMemory  # noqa: E402
+from ssp_bridge.plugins.acc.shared_memory import ACCSharedMemory, SPageFilePhysicsACC  # noqa: E402
+
+
+def _writer(directory: Path, hz: float, stop: threading.Event, written: list) -> None:
+    path = directory / "acpmf_physics"
+    path.write_bytes(b"\x00" * ctypes.sizeof(SPageFilePhysicsACC))
+    with open(path, "r+b") as f, mmap.mmap(f.fileno(), 0) as mm:
+        page = SPageFilePhysicsACC.from_buffer(mm)
+        period = 1.0 / hz
+        pkt = 0
+        next_ts = time.perf_counter()
+        while not stop.is_set():
+            pkt += 1
+            page.gas, page.gear, page.rpms, page.speedKmh = 0.5, 3, 3000 + pkt % 5000, 120.0
+            page.packetId = pkt
+            written[0] = pkt
+            next_ts += period
+            time.sleep(max(0.0, next_ts - time.perf_counter()))
+        del page
+
+
+def bench(reader_cls, seconds: float, hz: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        FileMapping.directory = tmp
+        SharedMapping.default_backend = "file"
+        stop = threading.Event()
+        written = [0]
+        t = threading.Thread(target=_writer, args=(Path(tmp), hz, stop, written), daemon=True)
+        t.start()
+        while not written[0]:
+            time.sleep(0.001)
+
+        sm = reader_cls()
+        sm.open()
+        seen = set()
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            frame = sm.read()
+            if frame is not None:
+                seen.add(sm.last_packet_id)
+            time.sleep(0.0005)
+        first = min(seen)
+
+        n = 20000
+        t0 = time.perf_counter()
+        for _ in range(n):
+            sm.read()
+        cost = (time.perf_counter() - t0) / n
+        sm.close()
+        stop.set()
+        t.join()
+
+    span = max(seen) - first + 1
+    print(
+        f"{reader_cls.__name__:16s} {cost * 1e6:5.2f} us/read  "
+        f"pages seen {len(seen)}/{span} ({len(seen) / span * 100:.1f}%) at {hz:.0f} Hz"
+    )
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    hz = float(sys.argv[2]) if len(sys.argv) > 2 else 333.0
+    bench(ACSharedMemory, seconds, hz)
+    bench(ACCSharedMemory, seconds, hz)
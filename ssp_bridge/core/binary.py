@@ -0,0 +1,303 @@
+"""Compact binary frame encoding for microcontroller links.
+
+Wire format (all integers little-endian):
+
+    packet  = COBS(payload + crc16) + 0x00
+    crc16   = CRC-16/CCITT-FALSE over payload (poly 0x1021, init 0xFFFF)
+
+Payloads (first byte = message kind):
+
+    'L' layout descriptor: u8 layout_id, u8 count,
+        count x (u8 type_char, i8 scale_exp, u8 name_len, name utf-8)
+    'F' frame:  u8 layout_id, u8 seq, u32 presence mask (bit i = signal i present),
+        values of the present signals in layout order (struct type of each signal)
+    'S' status: u8 state (0 waiting, 1 active, 2 lost)
+
+The layout is derived from the capabilities map: numeric signals only (strings are skipped),
+integers use the smallest struct type covering their min/max, numbers with a declared
+precision are sent as scaled integers (value * 10^precision) when the range fits in 16 bits,
+otherwise float32. Devices drop frames whose layout_id does not match their last descriptor."""
+# ssp_bridge/core/binary.py
+from __future__ import annotations
+
+import math
+import struct
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+MSG_LAYOUT = ord("L")
+MSG_FRAME = ord("F")
+MSG_STATUS = ord("S")
+
+STATUS_CODES = {"waiting": 0, "active": 1, "lost": 2}
+STATUS_NAMES = {v: k for k, v in STATUS_CODES.items()}
+
+MAX_SIGNALS = 32
+
+_INT_RANGES = (
+    ("b", -(1 << 7), (1 << 7) - 1),
+    ("B", 0, (1 << 8) - 1),
+    ("h", -(1 << 15), (1 << 15) - 1),
+    ("H", 0, (1 << 16) - 1),
+    ("i", -(1 << 31), (1 << 31) - 1),
+)
+_RANGE_BY_CODE = {code: (lo, hi) for code, lo, hi in _INT_RANGES}
+
+
+# --- CRC / COBS ---
+
+def _crc16_table() -> List[int]:
+    table = []
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if (crc & 0x8000) else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return table
+
+
+_CRC16_TABLE = _crc16_table()
+
+
+def crc16_ccitt(data: bytes, crc: int = 0xFFFF) -> int:
+    table = _CRC16_TABLE
+    for b in data:
+        crc = ((crc << 8) & 0xFFFF) ^ table[((crc >> 8) ^ b) & 0xFF]
+    return crc
+
+
+def cobs_encode(data: bytes) -> bytes:
+    out = bytearray()
+    block = bytearray()
+    for b in data:
+        if b == 0:
+            out.append(len(block) + 1)
+            out += block
+            block.clear()
+        else:
+            block.append(b)
+            if len(block) == 254:
+                out.append(255)
+                out += block
+                block.clear()
+    out.append(len(block) + 1)
+    out += block
+    return bytes(out)
+
+
+def cobs_decode(data: bytes) -> bytes:
+    out = bytearray()
+    i = 0
+    n = len(data)
+    while i < n:
+        code = data[i]
+        if code == 0:
+            raise ValueError("COBS: zero byte inside packet")
+        end = i + code
+        if end > n:
+            raise ValueError("COBS: truncated block")
+        out += data[i + 1:end]
+        i = end
+        if code < 255 and i < n:
+            out.append(0)
+    return bytes(out)
+
+
+def frame_packet(payload: bytes) -> bytes:
+    """Append CRC, COBS-encode and terminate with 0x00."""
+    body = payload + struct.pack("<H", crc16_ccitt(payload))
+    return cobs_encode(body) + b"\x00"
+
+
+# --- Layout ---
+
+@dataclass(frozen=True)
+class BinarySignal:
+    name: str
+    code: str       # struct format char
+    scale_exp: int  # wire = round(value * 10**scale_exp)
+
+
+def _pick_int_code(lo: float, hi: float) -> str:
+    for code, c_lo, c_hi in _INT_RANGES:
+        if lo >= c_lo and hi <= c_hi:
+            return code
+    return "i"
+
+
+def layout_from_capabilities(
+    caps: Optional[Dict[str, Any]],
+    signals: Optional[List[str]] = None,
+    precision: Optional[int] = None,
+) -> List[BinarySignal]:
+    """
+    Derive the binary layout (capabilities order, numeric signals only, max 32).
+
+    `signals` restricts/orders the layout; `precision` overrides the declared precision of numbers.
+    """
+    out: List[BinarySignal] = []
+    declared = (caps or {}).get("signals") or {}
+    names = signals if signals is not None else list(declared)
+    for name in names:
+        meta = declared.get(name)
+        if not meta:
+            continue
+        t = meta.get("type")
+        lo = meta.get("min")
+        hi = meta.get("max")
+        if t == "integer":
+            code = _pick_int_code(lo, hi) if lo is not None and hi is not None else "i"
+            out.append(BinarySignal(name, code, 0))
+        elif t == "number":
+            p = precision if precision is not None else meta.get("precision")
+            if p is not None and lo is not None and hi is not None:
+                scale = 10 ** int(p)
+                code = _pick_int_code(lo * scale, hi * scale)
+                if code in ("b", "B", "h", "H"):
+                    out.append(BinarySignal(name, code, int(p)))
+                    continue
+            out.append(BinarySignal(name, "f", 0))
+        if len(out) >= MAX_SIGNALS:
+            break
+    return out
+
+
+class BinaryEncoder:
+    """Stateful encoder (layout id + frame sequence) for one link or group of links."""
+
+    def __init__(self, signals: Optional[List[str]] = None, precision: Optional[int] = None) -> None:
+        self.signals = signals  # optional whitelist (in order)
+        self.precision = precision
+        self.layout: List[BinarySignal] = []
+        self.layout_id = 0
+        self._seq = 0
+        self._descriptor: Optional[bytes] = None
+
+    def set_capabilities(self, caps: Optional[Dict[str, Any]]) -> bytes:
+        """Rebuild the layout and return the (framed) descriptor packet to send."""
+        self.layout = layout_from_capabilities(caps, self.signals, self.precision)
+        self.layout_id = (self.layout_id + 1) & 0xFF
+
+        payload = bytearray((MSG_LAYOUT, self.layout_id, len(self.layout)))
+        for s in self.layout:
+            name = s.name.encode("utf-8")[:255]
+            payload += struct.pack("<cbB", s.code.encode("ascii"), s.scale_exp, len(name)) + name
+        self._descriptor = frame_packet(bytes(payload))
+        return self._descriptor
+
+    def descriptor(self) -> Optional[bytes]:
+        return self._descriptor
+
+    def encode_status(self, state: str) -> bytes:
+        return frame_packet(bytes((MSG_STATUS, STATUS_CODES.get(state, 0))))
+
+    def encode_frame(self, frame: Dict[str, Any]) -> Optional[bytes]:
+        if self._descriptor is None:
+            return None
+
+        sig = frame.get("signals") or {}
+        mask = 0
+        fmt = ["<BBBI"]
+        values: List[Any] = []
+        for i, s in enumerate(self.layout):
+            v = sig.get(s.name)
+            if v is None or isinstance(v, (str, bool)):
+                continue
+            f = float(v)
+            if not math.isfinite(f):
+                continue  # NaN/inf: sent as absent
+            mask |= 1 << i
+            fmt.append(s.code)
+            if s.code == "f":
+                values.append(f)
+            else:
+                wire = int(round(f * (10 ** s.scale_exp)))
+                lo, hi = _RANGE_BY_CODE[s.code]
+                values.append(lo if wire < lo else hi if wire > hi else wire)
+
+        self._seq = (self._seq + 1) & 0xFF
+        payload = struct.pack("".join(fmt), MSG_FRAME, self.layout_id, self._seq, mask, *values)
+        return frame_packet(payload)
+
+
+# --- Reference decoder (host-side tests / port to C on the device) ---
+
+class BinaryDecoder:
+    """
+    Stream decoder: feed() raw serial bytes, get decoded messages.
+
+    Yields dicts:
+      {"kind": "layout", "layout_id": int, "signals": [(name, code, scale_exp), ...]}
+      {"kind": "frame", "layout_id": int, "seq": int, "signals": {name: value}}
+      {"kind": "status", "state": str}
+    Packets with a bad CRC/COBS or an unknown layout are counted in `errors` and skipped.
+    """
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self.layout_id: Optional[int] = None
+        self.layout: List[Tuple[str, str, int]] = []
+        self.errors = 0
+
+    def feed(self, data: bytes) -> Iterator[Dict[str, Any]]:
+        self._buf += data
+        while True:
+            end = self._buf.find(0)
+            if end < 0:
+                return
+            packet = bytes(self._buf[:end])
+            del self._buf[:end + 1]
+            if not packet:
+                continue
+            msg = self._decode_packet(packet)
+            if msg is None:
+                self.errors += 1
+                continue
+            yield msg
+
+    def _decode_packet(self, packet: bytes) -> Optional[Dict[str, Any]]:
+        try:
+            body = cobs_decode(packet)
+        except ValueError:
+            return None
+        if len(body) < 3:
+            return None
+        payload, crc = body[:-2], struct.unpack("<H", body[-2:])[0]
+        if crc16_ccitt(payload) != crc:
+            return None
+
+        kind = payload[0]
+        try:
+            if kind == MSG_LAYOUT:
+                layout_id, count = payload[1], payload[2]
+                off = 3
+                layout = []
+                for _ in range(count):
+                    code, scale_exp, n = struct.unpack_from("<cbB", payload, off)
+                    off += 3
+                    name = payload[off:off + n].decode("utf-8")
+                    off += n
+                    layout.append((name, code.decode("ascii"), scale_exp))
+                self.layout_id = layout_id
+                self.layout = layout
+                return {"kind": "layout", "layout_id": layout_id, "signals": layout}
+
+            if kind == MSG_STATUS:
+                return {"kind": "status", "state": STATUS_NAMES.get(payload[1], "waiting")}
+
+            if kind == MSG_FRAME:
+                _, layout_id, seq, mask = struct.unpack_from("<BBBI", payload, 0)
+                if layout_id != self.layout_id:
+                    return None
+                off = struct.calcsize("<BBBI")
+                signals = {}
+                for i, (name, code, scale_exp) in enumerate(self.layout):
+                    if not mask & (1 << i):
+                        continue
+                    (v,) = struct.unpack_from("<" + code, payload, off)
+                    off += struct.calcsize("<" + code)
+                    signals[name] = v / (10 ** scale_exp) if scale_exp else v
+                return {"kind": "frame", "layout_id": layout_id, "seq": seq, "signals": signals}
+        except (struct.error, UnicodeDecodeError, IndexError):
+            return None
+        return None
@@ -94,10 +94,75 @@ CAPABILITIES_ACC = {
     "signals": dict(_BASE_SIGNALS),
 }
 
+# AMS2-only signals from the extra SMS UDP packets (timings, time stats) and tyre data.
+_AMS2_SIGNALS = {
+    "race.position": {
+        "type": "integer",
+        "unit": "",
+        "hz": 10,
+        "min": 1,
+        "max": 64,
+        "precision": 0,
+        "description": "Race position of the local participant.",
+    },
+    "race.lap": {
+        "type": "integer",
+        "unit": "lap",
+        "hz": 10,
+        "min": 0,
+        "max": 255,
+        "precision": 0,
+        "description": "Current lap of the local participant.",
+    },
+    "race.lap_time_s": {
+        "type": "number",
+        "unit": "s",
+        "hz": 10,
+        "min": 0,
+        "precision": 3,
+        "description": "Current lap time.",
+    },
+    "race.last_lap_s": {
+        "type": "number",
+        "unit": "s",
+        "hz": 1,
+        "min": 0,
+        "precision": 3,
+        "description": "Last lap time (present once a lap is completed).",
+    },
+    "race.best_lap_s": {
+        "type": "number",
+        "unit": "s",
+        "hz": 1,
+        "min": 0,
+        "precision": 3,
+        "description": "Fastest lap time of the session (present once set).",
+    },
+    "race.participants": {
+        "type": "integer",
+        "unit": "",
+        "hz": 1,
+        "min": 0,
+        "max": 64,
+        "precision": 0,
+        "description": "Number of participants in the session.",
+    },
+}
+for _wheel in ("fl", "fr", "rl", "rr"):
+    _AMS2_SIGNALS[f"tyres.{_wheel}.temp_c"] = {
+        "type": "integer",
+        "unit": "C",
+        "hz": 10,
+        "min": 0,
+        "max": 255,
+        "precision": 0,
+        "description": f"Tyre temperature ({_wheel.upper()}).",
+    }
+
 CAPABILITIES_AMS2 = {
     "plugin": "ams2",
     "schema": "ssp/0.2",
-    "signals": dict(_BASE_SIGNALS),
+    "signals": {**_BASE_SIGNALS, **_AMS2_SIGNALS},
 }
 
 CAPABILITIES_BEAMNG = {
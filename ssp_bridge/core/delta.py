@@ -0,0 +1,129 @@
+"""Delta frame encoding.
+
+Optional wire mode that replaces full frames with a periodic keyframe plus small deltas.
+
+- keyframe: full (quantized) signal map, tagged `"delta": "key"` and a keyframe `seq`
+- delta:    only the signals that differ from that keyframe, tagged `"delta": "diff"`
+            and `"base": <keyframe seq>`; signals that disappeared are listed in `removed`
+
+Deltas are computed against the last keyframe (not the previous delta), so any delta can be
+dropped by a latest-wins transport without corrupting client state. Values are quantized to
+each signal's declared `precision` so float noise does not count as a change."""
+# ssp_bridge/core/delta.py
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Optional, Tuple
+
+DELTA_KEY = "key"
+DELTA_DIFF = "diff"
+
+
+class DeltaEncoder:
+    def __init__(self, keyframe_interval: float = 2.0, precision: Optional[int] = None) -> None:
+        self.keyframe_interval = max(float(keyframe_interval), 0.0)
+        self.precision = precision  # overrides the declared precision of number signals
+
+        self._precision: Dict[str, int] = {}
+        self._integer: set = set()
+
+        self._seq = 0
+        self._key: Optional[Dict[str, Any]] = None  # last keyframe message
+        self._key_signals: Dict[str, Any] = {}
+        self._key_ts = 0.0
+
+    def set_capabilities(self, caps: Optional[Dict[str, Any]]) -> None:
+        """Load per-signal precision from a capabilities map and force a new keyframe."""
+        self._precision = {}
+        self._integer = set()
+        for key, meta in ((caps or {}).get("signals") or {}).items():
+            if meta.get("type") == "integer":
+                self._integer.add(key)
+            elif self.precision is not None and meta.get("type") == "number":
+                self._precision[key] = int(self.precision)
+            elif "precision" in meta:
+                try:
+                    self._precision[key] = int(meta["precision"])
+                except (TypeError, ValueError):
+                    pass
+        self.reset()
+
+    def reset(self) -> None:
+        """Force the next encode() to produce a keyframe."""
+        self._key = None
+        self._key_signals = {}
+
+    def keyframe(self) -> Optional[Dict[str, Any]]:
+        """Latest keyframe (what new clients need before applying deltas)."""
+        return self._key
+
+    def quantize(self, key: str, value: Any) -> Any:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return value
+        if key in self._integer:
+            return int(round(value))
+        p = self._precision.get(key)
+        if p is None:
+            return value
+        q = round(float(value), p)
+        return int(q) if p <= 0 else q
+
+    def encode(self, frame: Dict[str, Any], now: Optional[float] = None) -> Tuple[Dict[str, Any], bool]:
+        """Encode one SSP frame. Returns (message, is_keyframe)."""
+        now = time.monotonic() if now is None else now
+        q = self.quantize
+        signals = {k: q(k, v) for k, v in (frame.get("signals") or {}).items()}
+
+        key = self._key
+        if (
+            key is None
+            or key.get("source") != frame.get("source")
+            or (now - self._key_ts) >= self.keyframe_interval
+        ):
+            self._seq += 1
+            msg = {k: v for k, v in frame.items() if k != "signals"}
+            msg["delta"] = DELTA_KEY
+            msg["seq"] = self._seq
+            msg["signals"] = signals
+            self._key = msg
+            self._key_signals = signals
+            self._key_ts = now
+            return msg, True
+
+        base = self._key_signals
+        changed = {k: v for k, v in signals.items() if base.get(k, _MISSING) != v}
+
+        msg = {k: v for k, v in frame.items() if k != "signals"}
+        msg["delta"] = DELTA_DIFF
+        msg["base"] = self._seq
+        msg["signals"] = changed
+        removed = [k for k in base if k not in signals]
+        if removed:
+            msg["removed"] = removed
+        return msg, False
+
+
+_MISSING = object()
+
+
+def apply_delta(state: Dict[str, Any], msg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Reference client-side decoder.
+
+    `state` holds {"seq": int, "signals": dict} of the last keyframe (updated in place on
+    keyframes). Returns the reconstructed full signal map, or None if the delta refers to a
+    keyframe this client never received (wait for the next keyframe).
+    """
+    if msg.get("delta") == DELTA_KEY:
+        state["seq"] = msg.get("seq")
+        state["signals"] = dict(msg.get("signals") or {})
+        return dict(state["signals"])
+
+    if msg.get("delta") != DELTA_DIFF or msg.get("base") != state.get("seq"):
+        return None
+
+    out = dict(state.get("signals") or {})
+    for k in msg.get("removed") or ():
+        out.pop(k, None)
+    out.update(msg.get("signals") or {})
+    return out
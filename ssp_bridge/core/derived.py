@@ -1,6 +1,30 @@
+"""Derived signals.
+
+A derivation computes signals from other signals (engine.rpm_pct from engine.rpm and
+engine.rpm_max, ...). Each one is a small Derivation subclass declaring its `inputs` and
+`outputs`, registered once with @derivation. DerivedSignals compiles the registered set into a
+flat stage list:
+
+- stages are ordered so every derivation runs after the ones producing its inputs
+- stages whose outputs no sink consumes (compile(wants)) are left out, unless a kept stage
+  needs them
+- a stage calls derive() only when its input values changed since the previous frame; otherwise
+  it re-applies its previous outputs
+
+Source signals win: a stage whose outputs the frame already carries is skipped (engine.rpm_max
+straight from the simulator is never replaced by the observed peak).
+
+An input key may name an aggregate of the sample window instead of the frame value:
+`engine.rpm@max` is the highest engine.rpm received since the previous frame (core/history.py)."""
 # ssp_bridge/core/derived.py
 from __future__ import annotations
 
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from ssp_bridge.core.history import Window
+
+
 def clamp(x: float, lo: float, hi: float) -> float:
     return lo if x < lo else hi if x > hi else x
 
@@ -36,31 +60,203 @@ class RpmMaxTracker:
         return self.max_rpm >= self.publish_min_rpm
 
 
-def add_engine_rpm_pct(signals: dict, tracker: RpmMaxTracker) -> None:
-    # --- car id handling ---
-    car_id = signals.get("vehicle.car_id")
-    tracker.update_car(car_id)
+# --- Derivations ---
+
+class Derivation(ABC):
+    inputs: Tuple[str, ...] = ()    # required: the stage is skipped while one is missing
+    optional: Tuple[str, ...] = ()  # passed as None while missing
+    outputs: Tuple[str, ...] = ()
+    # Run every frame even when the inputs did not change (time-based state).
+    volatile = False
+
+    def reset(self) -> None:
+        """Drop per-session state (simulator switch)."""
+
+    def capabilities(self, declared: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Capability entries of outputs the plugins do not declare, given the plugin's signals."""
+        return {}
+
+    @abstractmethod
+    def derive(self, *values: Any) -> Optional[Dict[str, Any]]:
+        """`values` in inputs + optional order. Returns the outputs it could compute."""
+
+
+# Built-in derivations, always available. Opt-in ones (core/leds.py) are passed as `extra`.
+# Registration order is the tie-break between independent stages.
+DERIVATIONS: List[Type[Derivation]] = []
+
 
-    # --- rpm handling ---
-    rpm = signals.get("engine.rpm")
-    if rpm is None:
-        return
+def derivation(cls: Type[Derivation]) -> Type[Derivation]:
+    if cls not in DERIVATIONS:
+        DERIVATIONS.append(cls)
+    return cls
 
-    try:
-        rpm_i = int(rpm)
-    except Exception:
-        return
 
-    tracker.update(rpm_i)
+@derivation
+class EngineRpmMax(Derivation):
+    """engine.rpm_max from the observed peak, for simulators that do not publish it."""
+
+    inputs = ("engine.rpm",)
+    # Peaks between two frames count too (sample history of push plugins).
+    optional = ("engine.rpm@max", "vehicle.car_id")
+    outputs = ("engine.rpm_max",)
+
+    def __init__(self) -> None:
+        self.tracker = RpmMaxTracker(publish_min_rpm=3000)
+
+    def reset(self) -> None:
+        self.tracker = RpmMaxTracker(publish_min_rpm=self.tracker.publish_min_rpm)
+
+    def derive(self, rpm: Any, peak: Optional[float], car_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        self.tracker.update_car(car_id)
+        try:
+            rpm_i = int(rpm)
+        except (TypeError, ValueError):
+            return None
+        self.tracker.update(rpm_i if peak is None else max(rpm_i, int(peak)))
+        if not self.tracker.ready():
+            return None
+        return {"engine.rpm_max": int(self.tracker.max_rpm)}
 
-    if not tracker.ready():
-        return
 
-    rpm_max = tracker.max_rpm
-    if rpm_max <= 0:
-        return
+@derivation
+class EngineRpmPct(Derivation):
+    """engine.rpm_pct: engine.rpm / engine.rpm_max as a 0..1 ratio."""
+
+    inputs = ("engine.rpm", "engine.rpm_max")
+    outputs = ("engine.rpm_pct",)
+
+    def derive(self, rpm: Any, rpm_max: Any) -> Optional[Dict[str, Any]]:
+        try:
+            rpm_f, max_f = float(rpm), float(rpm_max)
+        except (TypeError, ValueError):
+            return None
+        if max_f <= 0.0:
+            return None
+        return {"engine.rpm_pct": round(clamp(rpm_f / max_f, 0.0, 1.0), 3)}
+
+
+# --- Engine ---
+
+class _Stage:
+    __slots__ = ("derivation", "outputs", "keys", "required", "last", "cached")
+
+    def __init__(self, d: Derivation) -> None:
+        self.derivation = d
+        self.outputs = tuple(d.outputs)
+        # (signal, window aggregate or None) per input, required ones first.
+        self.keys = tuple(k.partition("@")[::2] for k in (*d.inputs, *d.optional))
+        self.required = len(d.inputs)
+        self.last: Optional[Tuple[Any, ...]] = None
+        self.cached: Dict[str, Any] = {}
+
+
+def _base(key: str) -> str:
+    return key.partition("@")[0]
+
+
+class DerivedSignals:
+    def __init__(self, derivations: Optional[List[Derivation]] = None, extra: Optional[List[Derivation]] = None) -> None:
+        if derivations is None:
+            derivations = [cls() for cls in DERIVATIONS]
+        self.derivations = self._sort([*derivations, *(extra or [])])
+        self._stages: List[_Stage] = []
+        self.compile()
+
+    @staticmethod
+    def _sort(derivations: List[Derivation]) -> List[Derivation]:
+        producer: Dict[str, int] = {}
+        for i, d in enumerate(derivations):
+            for key in d.outputs:
+                if key in producer:
+                    other = type(derivations[producer[key]]).__name__
+                    raise ValueError(f"{key} is derived by both {other} and {type(d).__name__}.")
+                producer[key] = i
+
+        deps = [
+            {producer[_base(k)] for k in (*d.inputs, *d.optional) if _base(k) in producer} - {i}
+            for i, d in enumerate(derivations)
+        ]
+        order: List[int] = []
+        done: set = set()
+        while len(order) < len(derivations):
+            ready = [i for i in range(len(derivations)) if i not in done and deps[i] <= done]
+            if not ready:
+                stuck = ", ".join(type(derivations[i]).__name__ for i in range(len(derivations)) if i not in done)
+                raise ValueError(f"Derivation cycle between: {stuck}.")
+            # Lowest index first keeps registration order among independent stages.
+            order.append(ready[0])
+            done.add(ready[0])
+        return [derivations[i] for i in order]
+
+    def compile(self, wants: Optional[Callable[[str], bool]] = None) -> None:
+        """
+        Keep the stages some sink needs: those with an output `wants` accepts, and the stages
+        producing their inputs. `wants=None` keeps everything.
+        """
+        producer = {key: d for d in self.derivations for key in d.outputs}
+        needed = {
+            id(d) for d in self.derivations
+            if wants is None or any(wants(key) for key in d.outputs)
+        }
+        # Reverse topological order: consumers come before the stages they pull in.
+        for d in reversed(self.derivations):
+            if id(d) in needed:
+                for key in (*d.inputs, *d.optional):
+                    p = producer.get(_base(key))
+                    if p is not None:
+                        needed.add(id(p))
+
+        previous = {id(st.derivation): st for st in self._stages}
+        self._stages = [
+            previous.get(id(d)) or _Stage(d) for d in self.derivations if id(d) in needed
+        ]
+
+    @property
+    def active(self) -> Tuple[str, ...]:
+        """Names of the compiled stages, in run order."""
+        return tuple(type(st.derivation).__name__ for st in self._stages)
+
+    def capabilities(self, caps: Dict[str, Any]) -> Dict[str, Any]:
+        """`caps` plus the entries of derived outputs it does not declare (a new dict)."""
+        declared = caps.get("signals") or {}
+        signals = dict(declared)
+        for d in self.derivations:
+            for key, meta in d.capabilities(declared).items():
+                signals.setdefault(key, meta)
+        return {**caps, "signals": signals}
+
+    def reset(self) -> None:
+        for st in self._stages:
+            st.last = None
+            st.cached = {}
+        for d in self.derivations:
+            d.reset()
+
+    def run(self, signals: Dict[str, Any], window: Optional[Window] = None) -> None:
+        """Add the derived signals to `signals` in place."""
+        columns = window.columns if window is not None else None
+        for st in self._stages:
+            if all(key in signals for key in st.outputs):
+                continue  # the source publishes them
 
-    rpm_ratio = clamp(float(rpm_i) / float(rpm_max), 0.0, 1.0)
+            values = []
+            for name, agg in st.keys:
+                if agg:
+                    column = columns.get(name) if columns is not None else None
+                    values.append(getattr(column, agg) if column is not None else None)
+                else:
+                    values.append(signals.get(name))
+            current = tuple(values)
+            if any(v is None for v in current[:st.required]):
+                st.last, st.cached = None, {}
+                continue
 
-    signals["engine.rpm_max"] = int(rpm_max)
-    signals["engine.rpm_pct"] = round(rpm_ratio, 3)
+            if current != st.last or st.derivation.volatile:
+                st.last = current
+                try:
+                    st.cached = st.derivation.derive(*current) or {}
+                except Exception:
+                    st.cached = {}
+            if st.cached:
+                signals.update(st.cached)
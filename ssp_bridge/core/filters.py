@@ -0,0 +1,328 @@
+"""Per-signal filters.
+
+Smoothing applied by the bridge before derived signals are computed, so dashboards and devices
+get clean traces without filtering on their own:
+
+    ema       alpha=0.3                             exponential moving average
+    one_euro  min_cutoff=1.0, beta=0.007, d_cutoff=1.0
+                                                    speed-adaptive low-pass (Casiez et al., CHI 2012)
+    median    n=5                                   median of the last n samples
+    rate      max_per_s                             slew limit (units per second)
+
+A signal may chain several filters, applied in order. Specs (CLI, repeatable `--filter`):
+
+    SIGNAL=KIND[:key=value...][+KIND...]     e.g. engine.rpm=median:n=3+ema:alpha=0.5
+
+or a JSON object (`--filter-config`) mapping signal names to a filter or a list of filters:
+`{"controls.throttle_pct": [{"kind": "ema", "alpha": 0.3}]}`.
+
+Signals are keyed by the names of the capabilities map; bind() keeps the numeric ones the
+active plugin declares and rounds outputs to their declared precision.
+
+Filters see every sample: signals kept in the plugin's sample history (core/history.py) are
+filtered over all samples received since the previous frame, so the response does not depend
+on --hz. Other signals are filtered once per frame. Each sample's interval is the frame
+interval split evenly across the samples. With NumPy installed, EMA and median blocks of
+`NUMPY_MIN_BLOCK` samples or more are vectorized; otherwise (and for the inherently sequential
+one-euro and rate filters) the pure-Python path runs."""
+# ssp_bridge/core/filters.py
+from __future__ import annotations
+
+import json
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple, Type
+
+from ssp_bridge.core.history import Samples
+
+try:
+    import numpy as np
+except ImportError:  # optional
+    np = None
+
+NUMPY_SUPPORTED = np is not None
+# Below this many samples the NumPy call overhead costs more than the Python loop.
+NUMPY_MIN_BLOCK = 16
+
+# Sample interval assumed until two frame timestamps are known.
+_DEFAULT_DT = 1.0 / 60.0
+
+
+class SignalFilter(ABC):
+    kind = ""
+
+    def reset(self) -> None:
+        """Forget the filter state (plugin switch)."""
+
+    @abstractmethod
+    def block(self, xs: Sequence[float], dt: float) -> Sequence[float]:
+        """Filter consecutive samples `dt` seconds apart; returns as many outputs."""
+
+
+class Ema(SignalFilter):
+    kind = "ema"
+
+    def __init__(self, alpha: float = 0.3) -> None:
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("ema alpha must be in (0, 1].")
+        self.alpha = float(alpha)
+        self.reset()
+
+    def reset(self) -> None:
+        self.y: Optional[float] = None
+
+    def block(self, xs: Sequence[float], dt: float) -> Sequence[float]:
+        if not len(xs):
+            return xs
+        y = self.y
+        if y is None:
+            y = float(xs[0])
+        a = self.alpha
+        if np is not None and len(xs) >= NUMPY_MIN_BLOCK:
+            # y[k] = d^(k+1) * y0 + a * sum_j d^(k-j) * x[j], with d = 1 - a
+            x = np.asarray(xs, dtype=float)
+            powers = (1.0 - a) ** np.arange(len(x) + 1)
+            out = a * np.convolve(x, powers[:-1])[: len(x)] + powers[1:] * y
+            self.y = float(out[-1])
+            return out
+        out = []
+        for x in xs:
+            y += a * (x - y)
+            out.append(y)
+        self.y = y
+        return out
+
+
+class OneEuro(SignalFilter):
+    kind = "one_euro"
+
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 0.007, d_cutoff: float = 1.0) -> None:
+        if min_cutoff <= 0.0 or d_cutoff <= 0.0 or beta < 0.0:
+            raise ValueError("one_euro cutoffs must be > 0 and beta >= 0.")
+        self.min_cutoff = float(min_cutoff)
+        self.beta = float(beta)
+        self.d_cutoff = float(d_cutoff)
+        self.reset()
+
+    def reset(self) -> None:
+        self.y: Optional[float] = None
+        self.dy = 0.0
+
+    @staticmethod
+    def _alpha(cutoff: float, dt: float) -> float:
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def block(self, xs: Sequence[float], dt: float) -> Sequence[float]:
+        y, dy = self.y, self.dy
+        a_d = self._alpha(self.d_cutoff, dt)
+        out = []
+        for x in (xs.tolist() if hasattr(xs, "tolist") else xs):
+            if y is None:
+                y = float(x)
+            else:
+                dy += a_d * ((x - y) / dt - dy)
+                cutoff = self.min_cutoff + self.beta * abs(dy)
+                y += self._alpha(cutoff, dt) * (x - y)
+            out.append(y)
+        self.y, self.dy = y, dy
+        return out
+
+
+class Median(SignalFilter):
+    kind = "median"
+
+    def __init__(self, n: int = 5) -> None:
+        n = int(n)
+        if n < 1:
+            raise ValueError("median n must be >= 1.")
+        self.n = n
+        self.reset()
+
+    def reset(self) -> None:
+        self.tail: Deque[float] = deque(maxlen=self.n - 1)
+
+    def block(self, xs: Sequence[float], dt: float) -> Sequence[float]:
+        n, tail = self.n, self.tail
+        if n == 1 or not len(xs):
+            return xs
+        if np is not None and len(xs) >= NUMPY_MIN_BLOCK and len(tail) == n - 1:
+            x = np.asarray(xs, dtype=float)
+            # One full window ending at each new sample.
+            windows = np.lib.stride_tricks.sliding_window_view(np.concatenate((np.asarray(tail), x)), n)
+            tail.extend(x[-(n - 1):].tolist())
+            return np.median(windows, axis=1)
+        out = []
+        for x in xs:
+            values = sorted((*tail, x))
+            m = len(values)
+            out.append(values[m // 2] if m % 2 else (values[m // 2 - 1] + values[m // 2]) / 2.0)
+            tail.append(x)
+        return out
+
+
+class RateLimit(SignalFilter):
+    kind = "rate"
+
+    def __init__(self, max_per_s: float) -> None:
+        if max_per_s <= 0.0:
+            raise ValueError("rate max_per_s must be > 0.")
+        self.max_per_s = float(max_per_s)
+        self.reset()
+
+    def reset(self) -> None:
+        self.y: Optional[float] = None
+
+    def block(self, xs: Sequence[float], dt: float) -> Sequence[float]:
+        y = self.y
+        step = self.max_per_s * dt
+        out = []
+        for x in (xs.tolist() if hasattr(xs, "tolist") else xs):
+            if y is None:
+                y = float(x)
+            elif x > y + step:
+                y += step
+            elif x < y - step:
+                y -= step
+            else:
+                y = float(x)
+            out.append(y)
+        self.y = y
+        return out
+
+
+FILTERS: Dict[str, Type[SignalFilter]] = {f.kind: f for f in (Ema, OneEuro, Median, RateLimit)}
+
+
+def make_filter(kind: str, **params: Any) -> SignalFilter:
+    cls = FILTERS.get(kind)
+    if cls is None:
+        raise ValueError(f"Unknown filter '{kind}' (expected one of: {', '.join(FILTERS)}).")
+    try:
+        return cls(**params)
+    except TypeError as e:
+        raise ValueError(f"Invalid parameters for filter '{kind}': {e}") from e
+
+
+def _number(value: str) -> float | int:
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def parse_filter_spec(spec: str) -> Tuple[str, List[SignalFilter]]:
+    """`SIGNAL=KIND[:key=value...][+KIND...]` -> (signal, filters)."""
+    signal, sep, chain = spec.partition("=")
+    signal = signal.strip()
+    if not sep or not signal or not chain.strip():
+        raise ValueError(f"Invalid filter spec '{spec}' (expected SIGNAL=KIND[:key=value...]).")
+    filters = []
+    for part in chain.split("+"):
+        kind, *params = part.strip().split(":")
+        kwargs = {}
+        for item in params:
+            key, sep, value = item.partition("=")
+            if not sep:
+                raise ValueError(f"Invalid filter parameter '{item}' in '{spec}'.")
+            kwargs[key.strip()] = _number(value.strip())
+        filters.append(make_filter(kind.strip(), **kwargs))
+    return signal, filters
+
+
+def load_filter_config(path: str | Path) -> Dict[str, List[SignalFilter]]:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(data, dict):
+        raise ValueError("Filter config must be a JSON object of signal -> filter(s).")
+    out: Dict[str, List[SignalFilter]] = {}
+    for signal, items in data.items():
+        if isinstance(items, dict):
+            items = [items]
+        filters = []
+        for item in items:
+            params = dict(item)
+            filters.append(make_filter(params.pop("kind", ""), **params))
+        out[signal] = filters
+    return out
+
+
+class SignalFilters:
+    def __init__(self, config: Dict[str, List[SignalFilter]]) -> None:
+        self.config = {key: list(chain) for key, chain in config.items() if chain}
+        # signal -> (filters, precision, is_integer) for the active plugin
+        self._active: Dict[str, Tuple[List[SignalFilter], Optional[int], bool]] = {}
+        self._last_ts: Optional[float] = None
+        self._frame_dt = _DEFAULT_DT
+        self._failed: set = set()  # signals whose filter error was already reported
+
+    def __bool__(self) -> bool:
+        return bool(self.config)
+
+    def bind(self, caps: Optional[Dict[str, Any]]) -> List[str]:
+        """Select the configured signals the plugin declares as numeric; returns the others."""
+        declared = (caps or {}).get("signals") or {}
+        self._active = {}
+        ignored = []
+        for key, chain in self.config.items():
+            meta = declared.get(key)
+            if meta is None or meta.get("type") not in ("integer", "number"):
+                ignored.append(key)
+                continue
+            self._active[key] = (chain, meta.get("precision"), meta.get("type") == "integer")
+        self.reset()
+        return ignored
+
+    def reset(self) -> None:
+        for chain, _, _ in self._active.values():
+            for f in chain:
+                f.reset()
+        self._last_ts = None
+        self._frame_dt = _DEFAULT_DT
+
+    def _filter(self, chain: List[SignalFilter], x: Any, block: Optional[Sequence[float]]) -> Optional[float]:
+        """Filtered value of one signal; None (raw value kept) when there is no finite sample."""
+        if block and not all(math.isfinite(v) for v in block):
+            block = [v for v in block if math.isfinite(v)]
+        if not block:
+            x = float(x)
+            if not math.isfinite(x):
+                return None
+            block = (x,)
+        dt = self._frame_dt / len(block)
+        for f in chain:
+            block = f.block(block, dt)
+        y = float(block[-1])
+        return y if math.isfinite(y) else None
+
+    def apply(self, signals: Dict[str, Any], ts: Optional[float] = None, samples: Optional[Samples] = None) -> None:
+        """Replace the configured signals in `signals` with their filtered value."""
+        if not self._active:
+            return
+        if isinstance(ts, (int, float)):
+            if self._last_ts is not None and ts > self._last_ts:
+                self._frame_dt = ts - self._last_ts
+            self._last_ts = ts
+        columns = samples.columns if samples is not None else None
+
+        for key, (chain, precision, is_int) in self._active.items():
+            x = signals.get(key)
+            if x is None or isinstance(x, bool):
+                continue
+            try:
+                y = self._filter(chain, x, columns.get(key) if columns is not None else None)
+            except Exception as e:
+                # Keep the raw value; the chain restarts from the next good sample.
+                for f in chain:
+                    f.reset()
+                if key not in self._failed:
+                    self._failed.add(key)
+                    print(f"Filter on {key} failed ({e!r}); publishing the raw value.")
+                continue
+            if y is None:
+                continue
+            if is_int:
+                signals[key] = int(round(y))
+            else:
+                signals[key] = round(y, precision) if isinstance(precision, int) else y
@@ -0,0 +1,124 @@
+"""Fixed-capacity sample history.
+
+SampleRing keeps the last `capacity` samples of a source as parallel typed arrays (one
+preallocated array.array per column), so a receiver can record every decoded sample, not only
+the newest one, without allocating per sample.
+
+One producer appends (a receiver thread or the event loop); readers never lock. The producer
+fills a slot before advancing `head`, and window() drops the samples the producer may have
+overwritten while they were being copied (same idea as the shared memory torn-read guard).
+
+The emit stage keeps a cursor (`head` at its last emit) and aggregates everything that arrived
+since: min/max/mean/last per column, so peaks between two emitted frames are not lost. The
+filter stage (core/filters.py) runs over the same samples (samples())."""
+# ssp_bridge/core/history.py
+from __future__ import annotations
+
+from array import array
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Sequence
+
+
+class Aggregate(NamedTuple):
+    min: float
+    max: float
+    mean: float
+    last: float
+
+
+class Window(NamedTuple):
+    end: int        # cursor for the next window
+    count: int      # samples aggregated
+    dropped: int    # samples overwritten before they were read (capacity too small for the gap)
+    columns: Dict[str, Aggregate]
+
+    def as_dict(self, ndigits: int = 3) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "dropped": self.dropped,
+            "signals": {
+                name: {k: round(v, ndigits) for k, v in agg._asdict().items()}
+                for name, agg in self.columns.items()
+            },
+        }
+
+
+class Samples(NamedTuple):
+    end: int        # cursor for the next read
+    dropped: int    # samples overwritten before they were read
+    columns: Dict[str, array]
+
+    @property
+    def count(self) -> int:
+        for values in self.columns.values():
+            return len(values)
+        return 0
+
+    def window(self) -> Window:
+        count = self.count
+        columns: Dict[str, Aggregate] = {}
+        if count:
+            for name, values in self.columns.items():
+                columns[name] = Aggregate(min(values), max(values), sum(values) / count, values[-1])
+        return Window(self.end, count, self.dropped, columns)
+
+
+class SampleRing:
+    # Process-wide capacity (app.py: --history; 0 disables histories).
+    default_capacity = 256
+
+    def __init__(
+        self,
+        names: Iterable[str],
+        capacity: Optional[int] = None,
+        getter: Optional[Callable[[Any], Sequence[float]]] = None,
+        typecode: str = "d",
+    ) -> None:
+        capacity = self.default_capacity if capacity is None else int(capacity)
+        if capacity <= 0:
+            raise ValueError("SampleRing capacity must be positive.")
+        self.names = tuple(names)
+        self.capacity = capacity
+        self._getter = getter
+        self._columns = [array(typecode, [0]) * capacity for _ in self.names]
+        # Total samples appended; the slot of sample n is n % capacity.
+        self.head = 0
+
+    def append(self, values: Sequence[float]) -> None:
+        """Producer only. `values` in `names` order."""
+        i = self.head % self.capacity
+        for column, value in zip(self._columns, values):
+            column[i] = value
+        self.head += 1  # publish only once the slot is complete
+
+    def add(self, value: Any) -> None:
+        """Append a decoded value through the ring's getter."""
+        self.append(self._getter(value) if self._getter is not None else value)
+
+    def _span(self, column: array, start: int, end: int) -> array:
+        cap = self.capacity
+        a, b = start % cap, end % cap
+        if a < b:
+            return column[a:b]
+        return column[a:] + column[:b]
+
+    def samples(self, since: int) -> Samples:
+        """Copies of the samples appended since cursor `since` (a previous end, or head)."""
+        end = self.head
+        # The oldest slot is the next one the producer writes: capacity - 1 samples are readable.
+        start = max(since, end - self.capacity + 1)
+        if end <= start:
+            return Samples(end, start - since if start > since else 0, {})
+
+        copies = [self._span(column, start, end) for column in self._columns]
+        # Slots the producer started reusing while we copied are not trustworthy.
+        valid = max(start, self.head - self.capacity + 1)
+        skip = valid - start
+        columns: Dict[str, array] = {}
+        if end > valid:
+            for name, values in zip(self.names, copies):
+                columns[name] = values[skip:] if skip else values
+        return Samples(end, valid - since, columns)
+
+    def window(self, since: int) -> Window:
+        """Aggregate the samples appended since cursor `since` (a previous Window.end or head)."""
+        return self.samples(since).window()
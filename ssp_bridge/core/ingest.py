@@ -0,0 +1,102 @@
+"""Process-wide UDP ingest.
+
+UDP plugins do not bind their own sockets: they acquire a receiver from INGEST, keyed by
+(host, port), and release it on close(). The receiver keeps listening after release, so:
+
+- re-detection needs no rebind: a plugin reopening a warm port sees at once whether packets
+  are live, instead of waiting for the first one
+- packets that arrive while no plugin is active still update the receiver (and wake the
+  detection loop through `on_activity`)
+- auto-detect probes of several plugins never fight over a port
+
+Receivers are started on the bound event loop (asyncio transport) even when acquire() is called
+from a probe thread. close() stops them all at shutdown."""
+# ssp_bridge/core/ingest.py
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+from ssp_bridge.core.udp import BatchUDPReceiver
+
+R = TypeVar("R", bound=BatchUDPReceiver)
+
+
+class UDPIngest:
+    def __init__(self) -> None:
+        self._receivers: Dict[Tuple[str, int], BatchUDPReceiver] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        # Called when a released (idle) receiver gets a packet; any thread.
+        self.on_activity: Optional[Callable[[], None]] = None
+
+    def bind_loop(self, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Event loop that owns the receivers' asyncio transports (app.py: the main loop)."""
+        self._loop = loop
+        self._loop_thread = threading.get_ident() if loop is not None else None
+
+    def _activity(self) -> None:
+        cb = self.on_activity
+        if cb is not None:
+            cb()
+
+    def acquire(self, cls: Type[R], host: str, port: int, **kwargs: Any) -> R:
+        """
+        Listening receiver of type `cls` on (host, port): the warm one if the port is already
+        owned, else a new one (`kwargs` go to its constructor). Raises RuntimeError if another
+        receiver type owns the port, or if binding fails.
+        """
+        key = (host, int(port))
+        with self._lock:
+            rx = self._receivers.get(key)
+            if rx is not None:
+                if type(rx) is not cls:
+                    raise RuntimeError(f"UDP port {port} is already used by {rx.name}.")
+                return rx
+
+            rx = cls(host=host, port=port, **kwargs)
+            if rx.on_packet is None:
+                rx.on_packet = self._activity
+            self._start(rx)
+            if not rx.listening:
+                raise RuntimeError(f"Failed to bind UDP {host}:{port}.")
+            self._receivers[(host, rx.port)] = rx
+            return rx
+
+    def release(self, rx: Optional[BatchUDPReceiver]) -> None:
+        """Detach the closing plugin; the receiver keeps listening."""
+        if rx is None:
+            return
+        rx.on_packet = self._activity
+        rx.history = None
+
+    def _start(self, rx: BatchUDPReceiver) -> None:
+        loop = self._loop
+        if loop is None or not loop.is_running() or threading.get_ident() == self._loop_thread:
+            rx.start()
+            return
+
+        async def start() -> None:
+            rx.start()
+
+        # Probe thread: start on the loop so the receiver gets the asyncio transport.
+        asyncio.run_coroutine_threadsafe(start(), loop).result(timeout=5.0)
+
+    def receivers(self) -> Dict[Tuple[str, int], BatchUDPReceiver]:
+        with self._lock:
+            return dict(self._receivers)
+
+    def close(self) -> None:
+        with self._lock:
+            receivers, self._receivers = list(self._receivers.values()), {}
+        for rx in receivers:
+            try:
+                rx.stop()
+            except Exception:
+                pass
+
+
+# The process-wide instance used by the UDP plugins.
+INGEST = UDPIngest()
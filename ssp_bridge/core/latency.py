@@ -0,0 +1,149 @@
+"""Per-stage latency tracking.
+
+Each emitted frame carries monotonic (`time.perf_counter`) stage stamps from the receiver to
+the last sink. The durations between consecutive stamps feed rolling log-bucket histograms:
+
+    queue   kernel receive timestamp -> read by the receiver (SO_TIMESTAMPNS only)
+    decode  read by the receiver     -> decoded value published
+    pickup  published                -> read by the main loop
+    hold    read                     -> emit started (the --hz rate limit)
+    filter  emit started             -> filtered signals (--filter only)
+    derive  emit started / filtered  -> derived signals computed
+    encode  derived                  -> JSON serialized
+    <sink>  previous stamp           -> handed to that sink (stdout, ndjson, serial, ws)
+    total   first stamp              -> last sink done
+
+Histograms cover the last one to two `window`s (two rotating halves), so percentiles follow
+the current load instead of the whole session."""
+# ssp_bridge/core/latency.py
+from __future__ import annotations
+
+import math
+import time
+from typing import Any, Dict, Optional, Tuple
+
+# Bucket upper edges: 1 us .. ~8.4 s in quarter-octave steps (<= 19% quantile error).
+_BUCKET_EDGES = [1e-6 * 2 ** (i / 4) for i in range(93)]
+_LOG_BASE = math.log(2) / 4
+
+
+def _bucket(seconds: float) -> int:
+    if seconds <= 1e-6:
+        return 0
+    i = int(math.ceil(math.log(seconds / 1e-6) / _LOG_BASE - 1e-9))
+    return i if i < len(_BUCKET_EDGES) else len(_BUCKET_EDGES) - 1
+
+
+class LatencyHistogram:
+    """Rolling log-bucket histogram (two half-windows)."""
+
+    def __init__(self, window: float = 10.0) -> None:
+        self.window = float(window)
+        n = len(_BUCKET_EDGES)
+        self._cur = [0] * n
+        self._prev = [0] * n
+        self._cur_max = 0.0
+        self._prev_max = 0.0
+        self._rotate_at = time.monotonic() + self.window / 2
+
+    def _maybe_rotate(self, now: float) -> None:
+        if now < self._rotate_at:
+            return
+        if now - self._rotate_at >= self.window / 2:
+            # Idle for a whole window: nothing recent to keep.
+            self._prev = [0] * len(self._cur)
+            self._prev_max = 0.0
+        else:
+            self._prev, self._prev_max = self._cur, self._cur_max
+        self._cur = [0] * len(self._prev)
+        self._cur_max = 0.0
+        self._rotate_at = now + self.window / 2
+
+    def record(self, seconds: float, now: Optional[float] = None) -> None:
+        self._maybe_rotate(time.monotonic() if now is None else now)
+        if seconds < 0.0:
+            seconds = 0.0
+        self._cur[_bucket(seconds)] += 1
+        if seconds > self._cur_max:
+            self._cur_max = seconds
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        self._maybe_rotate(time.monotonic() if now is None else now)
+        counts = [a + b for a, b in zip(self._cur, self._prev)]
+        total = sum(counts)
+        out: Dict[str, Any] = {"count": total}
+        if not total:
+            return out
+
+        def quantile(q: float) -> float:
+            target = q * total
+            acc = 0
+            for i, c in enumerate(counts):
+                acc += c
+                if acc >= target:
+                    return _BUCKET_EDGES[i]
+            return _BUCKET_EDGES[-1]
+
+        mx = max(self._cur_max, self._prev_max)
+        for name, q in (("p50_ms", 0.5), ("p90_ms", 0.9), ("p99_ms", 0.99)):
+            out[name] = round(min(quantile(q), mx) * 1000.0, 3)
+        out["max_ms"] = round(mx * 1000.0, 3)
+        return out
+
+
+class FrameClock:
+    """Stage stamps of one frame (see LatencyTracker.start)."""
+
+    __slots__ = ("_tracker", "_first", "_last")
+
+    def __init__(self, tracker: "LatencyTracker", first: float) -> None:
+        self._tracker = tracker
+        self._first = first
+        self._last = first
+
+    def mark(self, stage: str, now: Optional[float] = None) -> None:
+        now = time.perf_counter() if now is None else now
+        self._tracker.record(stage, now - self._last)
+        self._last = now
+
+    def done(self) -> None:
+        self._tracker.record("total", self._last - self._first)
+
+
+class LatencyTracker:
+    def __init__(self, window: float = 10.0) -> None:
+        self.window = window
+        self._stages: Dict[str, LatencyHistogram] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        h = self._stages.get(stage)
+        if h is None:
+            h = self._stages[stage] = LatencyHistogram(self.window)
+        h.record(seconds)
+
+    def start(
+        self,
+        timing: Optional[Tuple[Optional[float], float, float]],
+        read: float,
+        emit: Optional[float] = None,
+    ) -> FrameClock:
+        """
+        Begin a frame from the plugin's receive timing (kernel, recv, decode), the perf_counter
+        time it was read by the main loop and the time its emit started (default: now).
+        Without timing, stages start at `read`.
+        """
+        if timing is None:
+            clock = FrameClock(self, read)
+        else:
+            kernel, recv, decoded = timing
+            clock = FrameClock(self, kernel if kernel is not None else recv)
+            if kernel is not None:
+                clock.mark("queue", recv)
+            clock.mark("decode", decoded)
+            clock.mark("pickup", read)
+        clock.mark("hold", emit)
+        return clock
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {stage: h.snapshot() for stage, h in self._stages.items()}
+
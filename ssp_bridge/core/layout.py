@@ -0,0 +1,107 @@
+"""Declarative binary packet layouts.
+
+Receivers declare the fields they need (offset, struct type, optional transform); the layout
+is compiled once into a single `struct.Struct` (gaps become pad bytes) plus a generated
+extractor function, so decoding a packet costs one C-level unpack and one Python call.
+
+    CAR_PHYSICS = PacketLayout(
+        [
+            Field("rpm", 40, "H", int),
+            Field("speed_ms", 36, "f"),
+            Field("gear", 45, "B", decode_gear),
+            Field("num_gears", 45, "B", lambda b: b >> 4),  # same byte, second view
+        ],
+        size=559,
+    )
+    decode = CAR_PHYSICS.compile(AMS2Telemetry, extra=("ts",))
+    tel = decode(data, time.time())
+
+Fields may share a slot (same offset and type): the value is unpacked once and fed to each
+transform. Array fields use a repeat count (`"4f"`, `"3h"`) and decode to a tuple; `"64s"` stays
+one bytes value. Adding a field is one line; offsets are validated at import time."""
+# ssp_bridge/core/layout.py
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Field:
+    name: str
+    offset: int
+    fmt: str  # struct code without byte order, e.g. "H", "f", "4s", "b", "4f" (tuple)
+    transform: Optional[Callable[[Any], Any]] = None
+
+
+class PacketLayout:
+    """A fixed-offset packet layout compiled into one struct.Struct."""
+
+    def __init__(self, fields: Sequence[Field], *, size: int = 0, byteorder: str = "<", name: str = "packet") -> None:
+        if not fields:
+            raise ValueError(f"{name}: layout needs at least one field")
+        self.name = name
+        self.fields: Tuple[Field, ...] = tuple(fields)
+
+        # Distinct (offset, fmt) slots in offset order; fields sharing a slot reuse its value.
+        slots: List[Tuple[int, str]] = sorted({(f.offset, f.fmt) for f in self.fields})
+        fmt = [byteorder]
+        pos = 0
+        index = 0
+        # slot -> (first value index, value count); count > 1 for arrays such as "4f".
+        self._slot_index: Dict[Tuple[int, str], Tuple[int, int]] = {}
+        for offset, code in slots:
+            if offset < pos:
+                raise ValueError(f"{name}: field at offset {offset} ({code}) overlaps the previous field")
+            if offset > pos:
+                fmt.append(f"{offset - pos}x")
+            fmt.append(code)
+            item = struct.Struct(byteorder + code)
+            count = len(item.unpack(bytes(item.size)))
+            self._slot_index[(offset, code)] = (index, count)
+            index += count
+            pos = offset + item.size
+
+        self.struct = struct.Struct("".join(fmt))
+        # Minimum packet length accepted by callers (declared packet size or last field end).
+        self.size = max(int(size), self.struct.size)
+
+    def unpack(self, buf, offset: int = 0) -> Dict[str, Any]:
+        """Slow path (tests/debugging): decode every field into a dict."""
+        raw = self.struct.unpack_from(buf, offset)
+        out = {}
+        for f in self.fields:
+            i, count = self._slot_index[(f.offset, f.fmt)]
+            v = raw[i] if count == 1 else raw[i:i + count]
+            out[f.name] = f.transform(v) if f.transform is not None else v
+        return out
+
+    def compile(self, factory: Callable[..., Any] = dict, extra: Sequence[str] = ()) -> Callable[..., Any]:
+        """
+        Generate `extract(buf, *extra, offset=0)` returning factory(**fields, **extra).
+
+        The extractor is straight-line code: one unpack_from, then one (optionally
+        transformed) keyword argument per field. Raises struct.error on short buffers.
+        """
+        env: Dict[str, Any] = {"_unpack": self.struct.unpack_from, "_factory": factory}
+        args = [f"{name}={name}" for name in extra]
+        for i, f in enumerate(self.fields):
+            start, count = self._slot_index[(f.offset, f.fmt)]
+            v = f"_v[{start}]" if count == 1 else f"_v[{start}:{start + count}]"
+            if f.transform is not None:
+                env[f"_t{i}"] = f.transform
+                v = f"_t{i}({v})"
+            args.append(f"{f.name}={v}")
+
+        params = "".join(f"{name}, " for name in extra)
+        src = (
+            f"def extract(buf, {params}offset=0):\n"
+            f"    _v = _unpack(buf, offset)\n"
+            f"    return _factory({', '.join(args)})\n"
+        )
+        code = compile(src, f"<layout {self.name}>", "exec")
+        exec(code, env)
+        extract = env["extract"]
+        extract.__doc__ = f"Compiled extractor for {self.name} ({self.struct.format})."
+        return extract
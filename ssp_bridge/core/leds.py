@@ -0,0 +1,196 @@
+"""Shift lights.
+
+ShiftLights is an opt-in derivation (core/derived.py) that turns engine RPM into an LED bitmask,
+`hw.leds` (bit i = LED i lit), so a device only has to shift the bits out. Blinking is computed
+here too: above the blink point the mask alternates between all LEDs and none at `blink_hz`,
+sampled at the output rate.
+
+Profiles (`--shift-lights <json>`) are keyed by vehicle.car_id, with a default for other cars:
+
+    {
+      "default": {"leds": 8, "start": 0.80, "shift": 0.97, "blink_hz": 8},
+      "cars": {
+        "ks_mazda_mx5_cup": {"leds": 8, "rpm": [5200, 5500, 5800, 6000, 6200, 6400, 6600, 6800],
+                             "blink_rpm": 7000}
+      }
+    }
+
+A profile either lists absolute RPM thresholds (`rpm`, one per step) or places its steps
+between the `start` and `shift` fractions of engine.rpm_max. The blink point defaults to the last
+step (`blink_rpm`, or the `blink` fraction). Patterns:
+
+    fill      one LED per step, left to right (steps = leds)
+    converge  one LED per step from each end towards the centre (steps = ceil(leds / 2))
+
+Thresholds are computed once per (profile, rpm_max); each frame is a bisect and a table lookup."""
+# ssp_bridge/core/leds.py
+from __future__ import annotations
+
+import json
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ssp_bridge.core.derived import Derivation
+
+PATTERNS = ("fill", "converge")
+# hw.leds must stay a non-negative int32 (binary serial layout).
+MAX_LEDS = 31
+
+
+@dataclass
+class ShiftProfile:
+    leds: int = 8
+    pattern: str = "fill"
+    start: float = 0.80     # first step, fraction of engine.rpm_max
+    shift: float = 0.97     # last step, fraction of engine.rpm_max
+    blink: Optional[float] = None       # blink point, fraction of engine.rpm_max (default: shift)
+    rpm: Optional[List[int]] = None     # absolute thresholds, one per step (overrides start/shift)
+    blink_rpm: Optional[int] = None     # absolute blink point (default: last threshold)
+    blink_hz: float = 8.0               # 0 = solid
+
+    def __post_init__(self) -> None:
+        if not 1 <= self.leds <= MAX_LEDS:
+            raise ValueError(f"Shift light leds must be 1..{MAX_LEDS}.")
+        if self.pattern not in PATTERNS:
+            raise ValueError(f"Shift light pattern must be one of {', '.join(PATTERNS)}.")
+        if self.rpm is not None:
+            self.rpm = [int(x) for x in self.rpm]
+            if len(self.rpm) != self.steps or self.rpm != sorted(self.rpm):
+                raise ValueError(f"Shift light rpm must list {self.steps} ascending thresholds.")
+        elif not 0.0 < self.start <= self.shift:
+            raise ValueError("Shift light fractions need 0 < start <= shift.")
+        if self.blink_hz < 0:
+            raise ValueError("Shift light blink_hz must be >= 0.")
+
+    @property
+    def steps(self) -> int:
+        return self.leds if self.pattern == "fill" else (self.leds + 1) // 2
+
+    @property
+    def absolute(self) -> bool:
+        return self.rpm is not None
+
+    def masks(self) -> List[int]:
+        """LED mask per number of thresholds passed (0..steps)."""
+        out = [0]
+        mask = 0
+        for i in range(self.steps):
+            mask |= 1 << i
+            if self.pattern == "converge":
+                mask |= 1 << (self.leds - 1 - i)
+            out.append(mask)
+        return out
+
+    def thresholds(self, rpm_max: Optional[float]) -> Optional[Tuple[List[float], Optional[float]]]:
+        """(step thresholds, blink point) in RPM, or None while rpm_max is needed but unknown."""
+        if self.rpm is not None:
+            steps: List[float] = list(self.rpm)
+            blink = self.blink_rpm if self.blink_rpm is not None else steps[-1]
+        else:
+            if not rpm_max or rpm_max <= 0:
+                return None
+            n = self.steps
+            span = self.shift - self.start
+            steps = [rpm_max * (self.start + (span * i / (n - 1) if n > 1 else span)) for i in range(n)]
+            blink = rpm_max * (self.blink if self.blink is not None else self.shift)
+        return steps, (blink if self.blink_hz > 0 else None)
+
+
+@dataclass
+class ShiftProfiles:
+    default: ShiftProfile = field(default_factory=ShiftProfile)
+    cars: Dict[str, ShiftProfile] = field(default_factory=dict)
+
+    def get(self, car_id: Optional[str]) -> ShiftProfile:
+        return self.cars.get(car_id, self.default) if car_id else self.default
+
+    @property
+    def max_leds(self) -> int:
+        return max([self.default.leds] + [p.leds for p in self.cars.values()])
+
+
+def _profile(data: Any) -> ShiftProfile:
+    if not isinstance(data, dict):
+        raise ValueError("Shift light profile must be a JSON object.")
+    try:
+        return ShiftProfile(**data)
+    except TypeError as e:
+        raise ValueError(f"Invalid shift light profile: {e}") from e
+
+
+def load_shift_profiles(path: str | Path) -> ShiftProfiles:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(data, dict):
+        raise ValueError("Shift light config must be a JSON object.")
+    return ShiftProfiles(
+        default=_profile(data.get("default", {})),
+        cars={car: _profile(p) for car, p in (data.get("cars") or {}).items()},
+    )
+
+
+class ShiftLights(Derivation):
+    inputs = ("engine.rpm",)
+    optional = ("engine.rpm_max", "vehicle.car_id")
+    outputs = ("hw.leds",)
+    # The blink phase moves with time, not with the inputs.
+    volatile = True
+
+    def __init__(
+        self,
+        profiles: Optional[ShiftProfiles] = None,
+        clock: Callable[[], float] = time.monotonic,
+        max_hz: Optional[float] = None,
+    ) -> None:
+        self.profiles = profiles or ShiftProfiles()
+        self.clock = clock
+        # Output rate cap (app.py: --hz); hw.leds is computed once per emitted frame.
+        self.max_hz = max_hz
+        self.reset()
+
+    def capabilities(self, declared: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        # Updates with engine.rpm (and the blink phase with every frame), at most at the emit rate.
+        hz = (declared.get("engine.rpm") or {}).get("hz") or self.max_hz or 0
+        if self.max_hz:
+            hz = min(hz, self.max_hz)
+        return {
+            "hw.leds": {
+                "type": "integer",
+                "unit": "bitmask",
+                "hz": hz,
+                "min": 0,
+                "max": (1 << self.profiles.max_leds) - 1,
+                "precision": 0,
+                "description": "Shift light LEDs (bit i = LED i lit), blink phase included.",
+            },
+        }
+
+    def reset(self) -> None:
+        self._key: Optional[Tuple[int, Optional[float]]] = None
+        self._compiled: Optional[Tuple[List[float], Optional[float], List[int], float]] = None
+
+    def _compile(self, profile: ShiftProfile, rpm_max: Optional[float]):
+        key = (id(profile), None if profile.absolute else rpm_max)
+        if key != self._key:
+            self._key = key
+            limits = profile.thresholds(rpm_max)
+            masks = profile.masks()
+            self._compiled = (limits[0], limits[1], masks, profile.blink_hz) if limits else None
+        return self._compiled
+
+    def derive(self, rpm: Any, rpm_max: Any, car_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        try:
+            rpm_f = float(rpm)
+            max_f = float(rpm_max) if rpm_max is not None else None
+        except (TypeError, ValueError):
+            return None
+        compiled = self._compile(self.profiles.get(car_id), max_f)
+        if compiled is None:
+            return None
+        steps, blink, masks, blink_hz = compiled
+        if blink is not None and rpm_f >= blink:
+            on = int(self.clock() * blink_hz * 2.0) % 2 == 0
+            return {"hw.leds": masks[-1] if on else 0}
+        return {"hw.leds": masks[bisect_right(steps, rpm_f)]}
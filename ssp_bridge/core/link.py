@@ -0,0 +1,138 @@
+"""Link quality from datagram sequence numbers.
+
+LinkStats follows one sender's packet counter (e.g. AMS2 mPacketNumber) and classifies every
+datagram before it is decoded:
+
+    in order   newer than anything seen; a forward jump counts the skipped numbers as lost
+    late       older than the newest and not seen yet (fills a loss gap: lost -1, reordered +1)
+    duplicate  already seen
+
+Late and duplicate datagrams are rejected, so an old datagram never replaces newer data.
+Counters are compared modulo 2**bits. A jump backwards past the tracking window, or forwards by
+more than `max_gap`, is taken as a sender restart and resynchronizes instead of counting loss.
+
+Arrival timing (rate, mean interval, jitter) is fed separately through arrival(), usually for
+the packet kind that drives frames only. Jitter is the smoothed deviation (gain 1/16, as in
+RFC 3550) of each inter-arrival interval from the running mean interval. Without sender
+timestamps it also includes the sender's own timing noise."""
+# ssp_bridge/core/link.py
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Optional
+
+# Recent sequence numbers remembered for late/duplicate detection.
+WINDOW = 64
+_WINDOW_MASK = (1 << WINDOW) - 1
+
+
+class LinkStats:
+    def __init__(self, bits: int = 32, max_gap: int = 1 << 16) -> None:
+        self._mod = 1 << int(bits)
+        self._half = self._mod >> 1
+        self.max_gap = int(max_gap)
+        self.reset()
+
+    def reset(self) -> None:
+        self._newest: Optional[int] = None
+        self._seen = 0  # bit i set: sequence number (newest - i) was received
+        self.received = 0    # accepted (in order)
+        self.lost = 0        # skipped and never arrived (late arrivals are taken back)
+        self.reordered = 0   # late, rejected
+        self.duplicates = 0  # already seen, rejected
+        self.resyncs = 0     # sender restarts / huge jumps
+
+        self.arrivals = 0
+        self._last_arrival: Optional[float] = None
+        self._interval = 0.0
+        self._jitter = 0.0
+        self._rate = 0.0
+        self._rate_ts = time.perf_counter()
+        self._rate_arrivals = 0
+
+    @property
+    def sequenced(self) -> bool:
+        return self._newest is not None
+
+    def _sync(self, seq: int) -> None:
+        self._newest = seq
+        # Unknown history: anything older inside the window counts as a duplicate, not as
+        # reordering of packets that were never counted lost.
+        self._seen = _WINDOW_MASK
+        self.received += 1
+
+    def check(self, seq: int) -> bool:
+        """Account for one datagram's sequence number. False: reject it (late or duplicate)."""
+        newest = self._newest
+        if newest is None:
+            self._sync(seq)
+            return True
+
+        diff = (seq - newest) % self._mod
+        if diff == 0:
+            self.duplicates += 1
+            return False
+
+        if diff < self._half:
+            if diff > self.max_gap:
+                self.resyncs += 1
+                self._sync(seq)
+                return True
+            self.lost += diff - 1
+            self._seen = ((self._seen << diff) | 1) & _WINDOW_MASK if diff < WINDOW else 1
+            self._newest = seq
+            self.received += 1
+            return True
+
+        back = self._mod - diff
+        if back >= WINDOW:
+            # Far older than anything in flight: the sender restarted its counter.
+            self.resyncs += 1
+            self._sync(seq)
+            return True
+        bit = 1 << back
+        if self._seen & bit:
+            self.duplicates += 1
+        else:
+            self._seen |= bit
+            self.lost -= 1
+            self.reordered += 1
+        return False
+
+    def arrival(self, now: float) -> None:
+        """Record an arrival time (time.perf_counter based) for rate and jitter."""
+        self.arrivals += 1
+        last = self._last_arrival
+        self._last_arrival = now
+        if last is None:
+            return
+        interval = now - last
+        if not self._interval:
+            self._interval = interval
+            return
+        self._jitter += (abs(interval - self._interval) - self._jitter) / 16.0
+        self._interval += (interval - self._interval) / 16.0
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.perf_counter() if now is None else now
+        dt = now - self._rate_ts
+        if dt >= 1.0:
+            self._rate = (self.arrivals - self._rate_arrivals) / dt
+            self._rate_ts, self._rate_arrivals = now, self.arrivals
+
+        out: Dict[str, Any] = {
+            "rate_hz": round(self._rate, 1),
+            "interval_ms": round(self._interval * 1000.0, 3),
+            "jitter_ms": round(self._jitter * 1000.0, 3),
+        }
+        if self.sequenced:
+            expected = self.received + self.lost
+            out.update(
+                received=self.received,
+                lost=self.lost,
+                loss_pct=round(100.0 * self.lost / expected, 3) if expected else 0.0,
+                reordered=self.reordered,
+                duplicates=self.duplicates,
+                resyncs=self.resyncs,
+            )
+        return out
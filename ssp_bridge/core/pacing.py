@@ -0,0 +1,87 @@
+"""Ingest pacing helpers.
+
+Push-based plugins (UDP) wake the main loop through a FrameWaker.
+Pull-based plugins (shared memory) are paced by an AdaptivePoller that backs off while idle."""
+# ssp_bridge/core/pacing.py
+from __future__ import annotations
+
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+class FrameWaker:
+    """
+    Thread-safe wake-up signal for the asyncio main loop.
+
+    Receiver threads (or asyncio datagram transports) call notify() whenever a packet lands;
+    the main loop awaits wait(). Repeated notifications before the loop wakes up are
+    coalesced into one.
+    """
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        self._loop = loop or asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._event = asyncio.Event()
+        self._pending = False
+
+    def notify(self) -> None:
+        """Wake the loop (safe to call from any thread)."""
+        if threading.get_ident() == self._loop_thread:
+            # Already on the loop (asyncio transport): no self-pipe round trip.
+            self._event.set()
+            return
+        if self._pending:
+            return
+        self._pending = True
+        try:
+            self._loop.call_soon_threadsafe(self._fire)
+        except RuntimeError:
+            # Loop already closed (shutdown in progress).
+            self._pending = False
+
+    def _fire(self) -> None:
+        self._pending = False
+        self._event.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait until notified or `timeout` elapses. Returns True if notified."""
+        if not self._event.is_set() and timeout > 0:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        fired = self._event.is_set()
+        self._event.clear()
+        return fired
+
+
+@dataclass
+class AdaptivePoller:
+    """
+    Poll interval controller for pull-based plugins.
+
+    - While the activity marker (packetId) keeps advancing, poll at `min_interval`.
+    - While it is stuck (pause, menus, sim closed), back off geometrically up to `max_interval`.
+    """
+
+    min_interval: float = 0.005
+    max_interval: float = 0.2
+    backoff: float = 1.5
+    _interval: float = 0.0
+    _last_marker: Any = None
+
+    def reset(self) -> None:
+        self._interval = self.min_interval
+        self._last_marker = None
+
+    def update(self, marker: Any) -> float:
+        """Feed the latest activity marker and return the next sleep interval."""
+        if marker is not None and marker != self._last_marker:
+            self._last_marker = marker
+            self._interval = self.min_interval
+        else:
+            self._interval = min(self.max_interval, max(self._interval, self.min_interval) * self.backoff)
+        return self._interval
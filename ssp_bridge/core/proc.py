@@ -1,13 +1,337 @@
 """Process detection utilities.
 
-Used by auto-detect to prioritize running simulators without expensive per-frame calls."""
+Used by auto-detect to prioritize running simulators without expensive per-frame calls.
+
+One background service (PROCESSES) snapshots the running processes at a fixed interval with
+native enumeration: Toolhelp32 on Windows, a /proc scan on Linux (Proton/Wine games show up
+under their Windows image name, e.g. `ac2-win64-shipping.exe`). Every ProcessWatch and the
+registry read that snapshot, so N watchers cost one cheap scan per interval instead of a
+`tasklist` subprocess each. The service thread starts on first use and stops once nobody has
+read a snapshot for `idle_timeout` seconds.
+
+Once a ProcessWatch finds its process, an ExitWatcher waits on a handle to that pid
+(OpenProcess + WaitForMultipleObjects on Windows, pidfd on Linux) and reports the exit the
+moment it happens, instead of after `miss_threshold` missed snapshots."""
 # ssp_bridge/core/proc.py
 from __future__ import annotations
 
+import ctypes
+import os
+import re
+import select
 import sys
+import threading
 import time
-import subprocess
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+
+# Lowercase image name -> pids.
+ProcessTable = Dict[str, Tuple[int, ...]]
+
+if sys.platform == "win32":
+    from ctypes import wintypes
+
+    TH32CS_SNAPPROCESS = 0x00000002
+    INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
+
+    class PROCESSENTRY32W(ctypes.Structure):
+        _fields_ = [
+            ("dwSize", wintypes.DWORD),
+            ("cntUsage", wintypes.DWORD),
+            ("th32ProcessID", wintypes.DWORD),
+            ("th32DefaultHeapID", ctypes.c_size_t),  # ULONG_PTR
+            ("th32ModuleID", wintypes.DWORD),
+            ("cntThreads", wintypes.DWORD),
+            ("th32ParentProcessID", wintypes.DWORD),
+            ("pcPriClassBase", ctypes.c_long),
+            ("dwFlags", wintypes.DWORD),
+            ("szExeFile", ctypes.c_wchar * 260),
+        ]
+
+    k32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+    CreateToolhelp32Snapshot = k32.CreateToolhelp32Snapshot
+    CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+    CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+
+    Process32FirstW = k32.Process32FirstW
+    Process32FirstW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+    Process32FirstW.restype = wintypes.BOOL
+
+    Process32NextW = k32.Process32NextW
+    Process32NextW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+    Process32NextW.restype = wintypes.BOOL
+
+    CloseHandle = k32.CloseHandle
+    CloseHandle.argtypes = [wintypes.HANDLE]
+    CloseHandle.restype = wintypes.BOOL
+
+    SYNCHRONIZE = 0x00100000
+    INFINITE = 0xFFFFFFFF
+    WAIT_OBJECT_0 = 0
+    ERROR_INVALID_PARAMETER = 87  # OpenProcess: no such pid
+
+    OpenProcess = k32.OpenProcess
+    OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+    OpenProcess.restype = wintypes.HANDLE
+
+    CreateEventW = k32.CreateEventW
+    CreateEventW.argtypes = [wintypes.LPVOID, wintypes.BOOL, wintypes.BOOL, wintypes.LPCWSTR]
+    CreateEventW.restype = wintypes.HANDLE
+
+    SetEvent = k32.SetEvent
+    SetEvent.argtypes = [wintypes.HANDLE]
+    SetEvent.restype = wintypes.BOOL
+
+    WaitForMultipleObjects = k32.WaitForMultipleObjects
+    WaitForMultipleObjects.argtypes = [wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE), wintypes.BOOL, wintypes.DWORD]
+    WaitForMultipleObjects.restype = wintypes.DWORD
+
+
+def _add(table: Dict[str, list], name: str, pid: int) -> None:
+    name = name.strip().lower()
+    if name:
+        pids = table.setdefault(name, [])
+        if pid not in pids:
+            pids.append(pid)
+
+
+def scan_toolhelp() -> Optional[ProcessTable]:
+    """Windows: one Toolhelp32 snapshot of every process."""
+    snap = CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+    if not snap or snap == INVALID_HANDLE_VALUE:
+        return None
+    table: Dict[str, list] = {}
+    try:
+        entry = PROCESSENTRY32W()
+        entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+        ok = Process32FirstW(snap, ctypes.byref(entry))
+        while ok:
+            _add(table, entry.szExeFile, int(entry.th32ProcessID))
+            ok = Process32NextW(snap, ctypes.byref(entry))
+    finally:
+        CloseHandle(snap)
+    return {k: tuple(v) for k, v in table.items()}
+
+
+def scan_proc(root: str = "/proc") -> Optional[ProcessTable]:
+    """
+    Linux: every process under `root`, by `comm` (15 chars max) and by the base name of argv[0]
+    (Wine/Proton processes carry their Windows path there, e.g. `C:\\...\\acs.exe`).
+    """
+    table: Dict[str, list] = {}
+    try:
+        entries = os.scandir(root)
+    except OSError:
+        return None
+    with entries:
+        for entry in entries:
+            if not entry.name.isdigit():
+                continue
+            pid = int(entry.name)
+            try:
+                with open(os.path.join(entry.path, "comm"), "rb") as f:
+                    _add(table, f.read().decode("utf-8", "ignore"), pid)
+                with open(os.path.join(entry.path, "cmdline"), "rb") as f:
+                    argv0 = f.read().split(b"\0", 1)[0].decode("utf-8", "ignore")
+            except OSError:
+                continue  # exited while scanning, or not ours to read
+            if argv0:
+                _add(table, re.split(r"[\\/]", argv0)[-1], pid)
+    return {k: tuple(v) for k, v in table.items()}
+
+
+def _default_scanner() -> Optional[Callable[[], Optional[ProcessTable]]]:
+    if sys.platform == "win32":
+        return scan_toolhelp
+    if os.path.isdir("/proc/self"):
+        return scan_proc
+    return None
+
+
+class ProcessSnapshots:
+    def __init__(
+        self,
+        interval: float = 0.5,
+        idle_timeout: float = 10.0,
+        scanner: Optional[Callable[[], Optional[ProcessTable]]] = None,
+    ) -> None:
+        self.interval = float(interval)
+        self.idle_timeout = float(idle_timeout)
+        self._scanner = scanner if scanner is not None else _default_scanner()
+        self._lock = threading.Lock()
+        self._table: Optional[ProcessTable] = None
+        self._thread: Optional[threading.Thread] = None
+        self._last_read = 0.0
+        self.generation = 0  # bumped on every snapshot
+        self.taken_at = 0.0  # time.monotonic() of the latest snapshot
+
+    @property
+    def supported(self) -> bool:
+        return self._scanner is not None
+
+    def refresh(self) -> None:
+        try:
+            table = self._scanner()
+        except Exception:
+            table = None
+        if table is None:
+            return  # keep the previous snapshot
+        with self._lock:
+            self._table = table
+            self.generation += 1
+            self.taken_at = time.monotonic()
+
+    def table(self) -> Optional[ProcessTable]:
+        """Latest snapshot (lowercase image name -> pids); None if enumeration is unavailable."""
+        if self._scanner is None:
+            return None
+        if self._table is None:
+            self.refresh()  # first reader: one synchronous scan
+        with self._lock:
+            self._last_read = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="process-snapshots", daemon=True)
+                self._thread.start()
+            return self._table
+
+    def names(self) -> FrozenSet[str]:
+        return frozenset(self.table() or ())
+
+    def pids(self, image_name: str) -> Tuple[int, ...]:
+        return (self.table() or {}).get(image_name.lower(), ())
+
+    def running(self, image_name: str) -> Optional[bool]:
+        """True/False from the latest snapshot; None when processes cannot be enumerated."""
+        table = self.table()
+        if table is None:
+            return None
+        return image_name.lower() in table
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if time.monotonic() - self._last_read >= self.idle_timeout:
+                    self._thread = None
+                    return
+            self.refresh()
+
+
+# The process-wide snapshot service.
+PROCESSES = ProcessSnapshots()
+
+# Platforms where ExitWatcher can wait on a pid (elsewhere ProcessWatch keeps counting misses).
+EXIT_WATCH_SUPPORTED = sys.platform == "win32" or hasattr(os, "pidfd_open")
+
+
+class ExitWatcher:
+    """
+    Waits on a process handle in a daemon thread and calls `on_exit` once when the process
+    ends (from that thread). Use start(); close() stops waiting without calling back.
+    """
+
+    def __init__(self, pid: int, on_exit: Optional[Callable[[], None]] = None) -> None:
+        self.pid = int(pid)
+        self.exited = threading.Event()
+        self._on_exit = on_exit
+        self._closed = False
+        # Guards the handles: the wait thread releases them when it ends, and close() must never
+        # signal the cancel pipe/event afterwards (its fd or handle number may be reused).
+        self._lock = threading.Lock()
+        self._released = False
+        self._handle: Any = None
+        self._cancel: Any = None
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def start(cls, pid: int, on_exit: Optional[Callable[[], None]] = None) -> Optional["ExitWatcher"]:
+        """
+        Watcher for `pid`; already `exited` if the process is gone. None when the pid cannot be
+        waited on (unsupported platform, access denied): callers fall back to snapshots.
+        """
+        w = cls(pid, on_exit)
+        try:
+            if not w._open():
+                return None
+        except ProcessLookupError:
+            w.exited.set()
+            return w
+        w._thread = threading.Thread(target=w._run, name=f"exit-watch-{pid}", daemon=True)
+        w._thread.start()
+        return w
+
+    def _open(self) -> bool:
+        if sys.platform == "win32":
+            handle = OpenProcess(SYNCHRONIZE, False, self.pid)
+            if not handle:
+                if ctypes.get_last_error() == ERROR_INVALID_PARAMETER:
+                    raise ProcessLookupError(self.pid)
+                return False
+            self._handle = handle
+            self._cancel = CreateEventW(None, True, False, None)
+            return True
+        if not hasattr(os, "pidfd_open"):
+            return False
+        try:
+            self._handle = os.pidfd_open(self.pid)
+        except ProcessLookupError:
+            raise
+        except OSError:
+            return False  # kernel without pidfd, seccomp...
+        self._cancel = os.pipe()
+        return True
+
+    def _run(self) -> None:
+        try:
+            if sys.platform == "win32":
+                handles = (wintypes.HANDLE * 2)(self._handle, self._cancel)
+                exited = WaitForMultipleObjects(2, handles, False, INFINITE) == WAIT_OBJECT_0
+            else:
+                ready, _, _ = select.select((self._handle, self._cancel[0]), (), ())
+                exited = self._handle in ready
+        except (OSError, ValueError):
+            exited = False
+        finally:
+            self._release()
+        if exited and not self._closed:
+            self.exited.set()
+            cb = self._on_exit
+            if cb is not None:
+                cb()
+
+    def _release(self) -> None:
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+            self._close_handles()
+
+    def _close_handles(self) -> None:
+        if sys.platform == "win32":
+            CloseHandle(self._handle)
+            CloseHandle(self._cancel)
+        else:
+            os.close(self._handle)
+            os.close(self._cancel[0])
+            os.close(self._cancel[1])
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is None:
+            return
+        with self._lock:
+            if not self._released:
+                if sys.platform == "win32":
+                    SetEvent(self._cancel)
+                else:
+                    try:
+                        os.write(self._cancel[1], b"x")
+                    except OSError:
+                        pass
+        self._thread.join(timeout=1.0)
 
 
 @dataclass
@@ -15,18 +339,42 @@ class ProcessWatch:
     image_name: str
     cache_ttl: float = 0.75       # check at most once per 750ms
     miss_threshold: int = 3       # require 3 consecutive misses to report "not running"
+    snapshots: Optional[ProcessSnapshots] = None  # default: PROCESSES
+    # Called (from the watcher thread) the moment a watched process exits.
+    on_exit: Optional[Callable[[], None]] = None
     _last_check_ts: float = 0.0
     _cached_running: bool = True
     _misses: int = 0
+    _seen: bool = False
+    _watcher: Optional[ExitWatcher] = field(default=None, repr=False)
+
+    # Off Windows the simulator may run on another host (mirrored shared memory pages), so a
+    # watch only reports "not running" once it has seen the process on this one.
+    assume_running_until_seen = sys.platform != "win32"
 
     def reset(self) -> None:
+        self.close()
         self._last_check_ts = 0.0
         self._cached_running = True
         self._misses = 0
 
+    def close(self) -> None:
+        """Stop waiting on the process (a later running() re-attaches to the current pid)."""
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
+
+    def _fire(self) -> None:
+        cb = self.on_exit
+        if cb is not None:
+            cb()
+
     def running(self) -> bool:
-        if sys.platform != "win32":
-            return True
+        w = self._watcher
+        if w is not None and w.exited.is_set():
+            # Exit reported by the process handle: no need to wait for missed snapshots.
+            self._cached_running = False
+            return False
 
         now = time.time()
         if (now - self._last_check_ts) < self.cache_ttl:
@@ -34,24 +382,24 @@ class ProcessWatch:
 
         self._last_check_ts = now
 
-        # If tasklist fails, assume "running" (do not crash due to system instability).
-        try:
-            out = subprocess.check_output(
-                ["tasklist", "/FI", f"IMAGENAME eq {self.image_name}", "/FO", "CSV", "/NH"],
-                text=True,
-                encoding="utf-8",
-                errors="ignore",
-            ).strip().lower()
-        except Exception:
+        # If processes cannot be enumerated, assume "running" (do not crash due to system instability).
+        found = (self.snapshots or PROCESSES).running(self.image_name)
+        if found is None or (not found and not self._seen and self.assume_running_until_seen):
             self._cached_running = True
             self._misses = 0
             return True
 
-        found = (self.image_name.lower() in out) and ("no tasks" not in out)
-
         if found:
+            self._seen = True
             self._cached_running = True
             self._misses = 0
+            if self._watcher is None and EXIT_WATCH_SUPPORTED:
+                pids = (self.snapshots or PROCESSES).pids(self.image_name)
+                if pids:
+                    self._watcher = ExitWatcher.start(pids[0], self._fire)
+                    if self._watcher is not None and self._watcher.exited.is_set():
+                        self._cached_running = False
+                        return False
             return True
 
         # Not found this time: count a miss.
@@ -62,4 +410,4 @@ class ProcessWatch:
 
         # Below miss threshold: keep "running" to avoid status flapping.
         self._cached_running = True
-        return True
\ No newline at end of file
+        return True
@@ -0,0 +1,64 @@
+"""Encode-once frame serialization.
+
+Every event/frame is JSON-encoded exactly once; all sinks (stdout, NDJSON, WebSocket, Serial)
+share the resulting text/bytes instead of calling json.dumps themselves."""
+# ssp_bridge/core/serialize.py
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, Optional
+
+
+def dumps_compact(obj: Any) -> str:
+    """Canonical SSP wire form: compact separators, UTF-8 kept as-is."""
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+class SerializedFrame:
+    """
+    A frame/event serialized once and shared between sinks.
+
+    - obj:  the original dict (read-only by convention once serialized)
+    - text: compact JSON string
+    - data: UTF-8 bytes of `text`
+    - line: `data` + b"\\n" (NDJSON / serial line form)
+
+    Additional encodings (projections, deltas, binary layouts...) are built lazily by the
+    sinks that need them via encoding(), and cached so each is also computed only once.
+    """
+
+    __slots__ = ("obj", "text", "data", "_line", "_encodings")
+
+    def __init__(self, obj: Dict[str, Any]) -> None:
+        self.obj = obj
+        self.text = dumps_compact(obj)
+        self.data = self.text.encode("utf-8")
+        self._line: Optional[bytes] = None
+        self._encodings: Dict[Any, Any] = {}
+
+    @property
+    def type(self) -> Optional[str]:
+        """Event type (`status`, `capabilities`...) or None for telemetry frames."""
+        return self.obj.get("type")
+
+    @property
+    def line(self) -> bytes:
+        if self._line is None:
+            self._line = self.data + b"\n"
+        return self._line
+
+    def encoding(self, key: Any, build: Callable[[Dict[str, Any]], Any]) -> Any:
+        """Return the cached encoding for `key`, building it from `obj` on first use."""
+        try:
+            return self._encodings[key]
+        except KeyError:
+            value = build(self.obj)
+            self._encodings[key] = value
+            return value
+
+
+def serialize(obj: Any) -> SerializedFrame:
+    """Wrap `obj` in a SerializedFrame (no-op if it already is one)."""
+    if isinstance(obj, SerializedFrame):
+        return obj
+    return SerializedFrame(obj)
@@ -0,0 +1,194 @@
+"""Shared memory page mappings.
+
+Simulators publish telemetry as named shared memory pages (`Local\\acpmf_physics`...).
+open_mapping() returns a read-only mapping with a raw `address` for ctypes `from_address`
+views, from one of two backends:
+
+- winapi (default on Windows): the named file mapping (OpenFileMappingW / MapViewOfFile)
+- file (default elsewhere): a file named after the page (`acpmf_physics`) under
+  `FileMapping.directory` (default /dev/shm), mapped with mmap(2). Anything that mirrors the page
+  into that file works: a helper inside the Proton/Wine prefix on the same host, or a sync tool
+  copying the page from a Windows box. Writers must keep the file at its full size.
+
+Pages are Windows layouts: text fields use WCHAR (2-byte UTF-16) and are read with wstr()."""
+# ssp_bridge/core/shm.py
+from __future__ import annotations
+
+import ctypes
+import mmap
+import os
+import sys
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+SHM_BACKENDS = ("winapi", "file")
+
+FILE_MAP_READ = 0x0004
+
+# Windows wchar_t; ctypes.c_wchar is 4 bytes on Linux/macOS.
+WCHAR = ctypes.c_wchar if ctypes.sizeof(ctypes.c_wchar) == 2 else ctypes.c_uint16
+
+
+def wstr(value: Any) -> str:
+    """Text of a WCHAR array field, up to the first NUL."""
+    if not isinstance(value, str):
+        value = bytes(value).decode("utf-16-le", "ignore")
+    return value.split("\x00", 1)[0]
+
+
+def page_basename(name: str) -> str:
+    """`Local\\acpmf_physics` -> `acpmf_physics` (file name used by the file backend)."""
+    return name.rsplit("\\", 1)[-1]
+
+
+if sys.platform == "win32":
+    from ctypes import wintypes
+
+    k32 = ctypes.windll.kernel32
+
+    OpenFileMappingW = k32.OpenFileMappingW
+    OpenFileMappingW.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.LPCWSTR]
+    OpenFileMappingW.restype = wintypes.HANDLE
+
+    MapViewOfFile = k32.MapViewOfFile
+    MapViewOfFile.argtypes = [wintypes.HANDLE, wintypes.DWORD, wintypes.DWORD, wintypes.DWORD, ctypes.c_size_t]
+    MapViewOfFile.restype = wintypes.LPVOID
+
+    UnmapViewOfFile = k32.UnmapViewOfFile
+    UnmapViewOfFile.argtypes = [wintypes.LPCVOID]
+    UnmapViewOfFile.restype = wintypes.BOOL
+
+    CloseHandle = k32.CloseHandle
+    CloseHandle.argtypes = [wintypes.HANDLE]
+    CloseHandle.restype = wintypes.BOOL
+else:
+    def _win_only(*_args, **_kwargs):
+        raise RuntimeError("WinAPI shared memory is only available on Windows (use the file backend).")
+
+    OpenFileMappingW = _win_only
+    MapViewOfFile = _win_only
+    UnmapViewOfFile = _win_only
+    CloseHandle = _win_only
+
+if sys.platform != "win32":
+    _libc = ctypes.CDLL(None, use_errno=True)
+
+    _mmap = _libc.mmap
+    _mmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_long]
+    _mmap.restype = ctypes.c_void_p
+
+    _munmap = _libc.munmap
+    _munmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+    _munmap.restype = ctypes.c_int
+
+    _MAP_FAILED = ctypes.c_void_p(-1).value
+
+
+class SharedMapping(ABC):
+    """A read-only mapped page. `address` stays valid until close()."""
+
+    # Process-wide backend (app.py: --shm-dir selects "file").
+    default_backend = "winapi" if sys.platform == "win32" else "file"
+
+    name: str = ""
+    address: int = 0
+    size: int = 0
+
+    @abstractmethod
+    def close(self) -> None:
+        """Unmap the page; `address` is 0 afterwards."""
+
+
+class WinMapping(SharedMapping):
+    def __init__(self, name: str, hmap: int, view: int, size: int) -> None:
+        self.name = name
+        self._hmap: Optional[int] = hmap
+        self.address = view
+        self.size = size
+
+    @classmethod
+    def open(cls, names: Sequence[str], size: int) -> Optional["WinMapping"]:
+        for name in names:
+            hmap = OpenFileMappingW(FILE_MAP_READ, False, name)
+            if not hmap:
+                continue
+            view = MapViewOfFile(hmap, FILE_MAP_READ, 0, 0, 0)
+            if not view:
+                CloseHandle(hmap)
+                raise RuntimeError(f"MapViewOfFile failed for {name}.")
+            return cls(name, int(hmap), int(view), size)
+        return None
+
+    def close(self) -> None:
+        if self.address:
+            try:
+                UnmapViewOfFile(self.address)
+            finally:
+                self.address = 0
+        if self._hmap is not None:
+            try:
+                CloseHandle(self._hmap)
+            finally:
+                self._hmap = None
+
+
+class FileMapping(SharedMapping):
+    # Where page files are looked up (app.py: --shm-dir).
+    directory = "/dev/shm"
+
+    def __init__(self, name: str, address: int, size: int) -> None:
+        self.name = name
+        self.address = address
+        self.size = size
+
+    @classmethod
+    def open(cls, names: Sequence[str], size: int) -> Optional["FileMapping"]:
+        seen = set()
+        for name in names:
+            path = Path(cls.directory) / page_basename(name)
+            if path in seen:
+                continue
+            seen.add(path)
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                length = os.fstat(fd).st_size
+                if length < size:
+                    # Writer has not sized the page yet; reading past EOF would SIGBUS.
+                    return None
+                address = cls._map(fd, length)
+            finally:
+                os.close(fd)  # the mapping keeps the file referenced
+            return cls(str(path), address, length)
+        return None
+
+    @staticmethod
+    def _map(fd: int, length: int) -> int:
+        if sys.platform == "win32":
+            raise RuntimeError("File-backed pages use mmap(2); not available on Windows.")
+        address = _mmap(None, length, mmap.PROT_READ, mmap.MAP_SHARED, fd, 0)
+        if address in (None, _MAP_FAILED):
+            err = ctypes.get_errno()
+            raise RuntimeError(f"mmap failed ({os.strerror(err)}).")
+        return int(address)
+
+    def close(self) -> None:
+        if self.address:
+            _munmap(self.address, self.size)
+            self.address = 0
+
+
+def open_mapping(names: Sequence[str], size: int, backend: Optional[str] = None) -> Optional[SharedMapping]:
+    """
+    Map the first available page among `names` (at least `size` bytes), read-only.
+    Returns None when the page does not exist yet; raises RuntimeError on mapping failures.
+    """
+    backend = backend or SharedMapping.default_backend
+    if backend == "winapi":
+        return WinMapping.open(names, size)
+    if backend == "file":
+        return FileMapping.open(names, size)
+    raise ValueError(f"Unknown shared memory backend: {backend}. Available: {', '.join(SHM_BACKENDS)}")
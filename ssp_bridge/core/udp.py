@@ -0,0 +1,437 @@
+"""UDP receiver base (asyncio transport or batched thread).
+
+Two interchangeable transports share the same classify/decode/publish hooks:
+
+- asyncio (default when an event loop is running): the socket is handed to
+  `loop.create_datagram_endpoint`; datagrams are classified and decoded on arrival, inside the
+  main loop, and published without locks or cross-thread wake-ups. Shutdown closes the
+  transport synchronously.
+- thread (blocking decoders, or no running loop, e.g. probing from a worker thread): a receiver
+  thread drains every queued datagram per wakeup into a preallocated buffer pool (`recv_into`
+  on memoryviews), decodes only the newest datagram of each kind and publishes once per batch.
+
+Every published value keeps perf_counter stage stamps (kernel receive, user-space receive,
+decoded) for latency tracking. Kernel receive timestamps (SO_TIMESTAMPNS, Linux) need
+`recvmsg`, so enabling them selects the thread transport.
+
+Senders with a packet counter (sequence() hook) get link statistics (loss, reordering,
+duplicates, see core/link.py); late and duplicate datagrams are dropped before classify(), so
+they never replace newer data. Rate and jitter follow the datagrams of `link_kind`.
+
+With a `history` ring (core/history.py), every decoded datagram of `history_kind` is also
+recorded there, including the ones a newer datagram supersedes within a batch.
+
+Until the asyncio transport is attached (the loop has not run yet, e.g. while a plugin blocks
+in open() on the loop thread), get_latest() on the loop thread drains the socket synchronously
+instead. Other threads (auto-detect probes) just read the latest value.
+
+Subclasses implement:
+- sequence(view) -> sender packet counter, or None (no link loss/order tracking)
+- classify(view) -> kind key to keep (e.g. the packet-type byte), or None to discard
+- decode(kind, view, ts) -> decoded value, or None if the datagram turns out invalid
+and may override publish() to keep more than the newest value."""
+# ssp_bridge/core/udp.py
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import select
+import socket
+import struct
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from ssp_bridge.core.history import SampleRing
+from ssp_bridge.core.link import LinkStats
+
+RECEIVER_MODES = ("asyncio", "thread")
+
+# Not exported by every Python build; 35 is the asm-generic value (x86, ARM).
+_SO_TIMESTAMPNS = getattr(socket, "SO_TIMESTAMPNS", 35 if sys.platform.startswith("linux") else None)
+KERNEL_TIMESTAMPS_SUPPORTED = _SO_TIMESTAMPNS is not None and hasattr(socket.socket, "recvmsg_into")
+_TIMESPEC = struct.Struct("@qq")
+
+# (kernel receive or None, user-space receive, decoded), all time.perf_counter() based.
+Timing = Tuple[Optional[float], float, float]
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, receiver: "BatchUDPReceiver") -> None:
+        self._rx = receiver
+
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        self._rx._on_datagram(data)
+
+    def error_received(self, exc: Exception) -> None:
+        # Windows reports ICMP port-unreachable here; not fatal for a listener.
+        pass
+
+
+class BatchUDPReceiver:
+    name = "udp"
+    # Process-wide defaults (app.py: --udp-transport, --udp-timestamps).
+    default_mode = "asyncio"
+    kernel_timestamps = False
+    # Kind whose arrivals feed link rate/jitter (None: every accepted datagram).
+    link_kind: Optional[Hashable] = None
+    # Kind recorded in `history` (when set).
+    history_kind: Hashable = 0
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 0,
+        on_packet: Optional[Callable[[], None]] = None,
+        *,
+        mode: Optional[str] = None,
+        pool_size: int = 64,
+        buffer_size: int = 2048,
+        recv_buffer: int = 1 << 20,
+        history: Optional[SampleRing] = None,
+    ) -> None:
+        mode = mode or self.default_mode
+        if mode not in RECEIVER_MODES:
+            raise ValueError(f"Unknown receiver mode: {mode}. Available: {', '.join(RECEIVER_MODES)}")
+        self._host = host
+        self._port = int(port)
+        self.mode = mode
+
+        # Called after each batch/datagram with fresh data (wakes the main loop).
+        self.on_packet = on_packet
+
+        self._pool_size = max(int(pool_size), 1)
+        self._buffer_size = int(buffer_size)
+        self._recv_buffer = int(recv_buffer)
+        self._views: List[memoryview] = []
+
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._attach_task: Optional[asyncio.Task] = None
+        self._transport: Optional[asyncio.DatagramTransport] = None
+
+        self._lock: Any = threading.Lock()
+        self._latest: Any = None
+        self._timing: Dict[Hashable, Tuple[Any, Timing]] = {}
+        self._kernel_ts = False
+        self.started_at = 0.0  # time.monotonic() when the socket was bound
+
+        # Every decoded sample of history_kind (single producer: the receiving thread/loop).
+        self.history = history
+
+        self.reset_stats()
+
+    # --- Subclass hooks ---
+
+    def sequence(self, view: memoryview) -> Optional[int]:
+        return None
+
+    def classify(self, view: memoryview) -> Optional[Hashable]:
+        return 0
+
+    def decode(self, kind: Hashable, view: memoryview, ts: float) -> Any:
+        return bytes(view)
+
+    def publish(self, kind: Hashable, value: Any) -> None:
+        """Called (under the lock in thread mode) for each decoded value (newest per kind)."""
+        self._latest = value
+
+    # --- Lifecycle ---
+
+    @property
+    def port(self) -> int:
+        return self._port
+
+    @property
+    def transport(self) -> str:
+        """Transport actually in use: "asyncio", "thread" or "" when stopped."""
+        if self._loop is not None:
+            return "asyncio"
+        return "thread" if self._thread is not None else ""
+
+    @property
+    def listening(self) -> bool:
+        return self._sock is not None
+
+    def start(self) -> None:
+        if self._sock is not None:
+            return
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self._recv_buffer:
+                # Room for bursts while the receiver waits for the GIL / the loop.
+                try:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self._recv_buffer)
+                except OSError:
+                    pass
+            sock.bind((self._host, self._port))
+            sock.setblocking(False)
+        except Exception:
+            sock.close()
+            raise
+        self._sock = sock
+        self._port = sock.getsockname()[1]
+        self.started_at = time.monotonic()
+        self._stop.clear()
+
+        self._kernel_ts = False
+        if self.kernel_timestamps and KERNEL_TIMESTAMPS_SUPPORTED:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, _SO_TIMESTAMPNS, 1)
+                self._kernel_ts = True
+            except OSError:
+                pass
+
+        loop = None
+        if self.mode == "asyncio" and not self._kernel_ts:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None  # called from a worker thread: fall back to the thread transport
+
+        if loop is not None:
+            # Same thread as every reader: no lock needed.
+            self._lock = contextlib.nullcontext()
+            self._loop = loop
+            self._loop_thread = threading.get_ident()
+            self._attach_task = loop.create_task(self._attach())
+            return
+
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-udp-receiver", daemon=True)
+        self._thread.start()
+
+    async def _attach(self) -> None:
+        try:
+            self._transport, _ = await self._loop.create_datagram_endpoint(
+                lambda: _DatagramProtocol(self), sock=self._sock
+            )
+        finally:
+            self._attach_task = None
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+        if self._attach_task is not None:
+            self._attach_task.cancel()
+            self._attach_task = None
+        if self._transport is not None:
+            self._transport.abort()  # closes the socket now, no pending callbacks
+            self._transport = None
+        self._loop = None
+
+        if self._sock:
+            try:
+                self._sock.close()
+            except Exception:
+                pass
+        self._sock = None
+
+    def get_latest(self) -> Any:
+        if (
+            self._loop is not None
+            and self._transport is None
+            and self._sock is not None
+            and threading.get_ident() == self._loop_thread
+        ):
+            # asyncio transport not attached yet: the caller is blocking the loop.
+            self._drain(0.0)
+        with self._lock:
+            return self._latest
+
+    def timing_for(self, value: Any) -> Optional[Timing]:
+        """Stage stamps of a value returned by get_latest() (None if already superseded)."""
+        with self._lock:
+            for published, timing in self._timing.values():
+                if published is value:
+                    return timing
+        return None
+
+    # --- Stats ---
+
+    def reset_stats(self) -> None:
+        self.packets = 0      # datagrams received
+        self.bytes = 0
+        self.filtered = 0     # discarded by classify() (wrong type, too short, foreign)
+        self.superseded = 0   # accepted but replaced by a newer datagram of the same batch
+        self.errors = 0       # decode failures
+        self.batches = 0
+        self.max_batch = 0
+        self.link = LinkStats()
+        self._pps = 0.0
+        self._rate_ts = time.monotonic()
+        self._rate_packets = 0
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        dt = now - self._rate_ts
+        if dt >= 1.0:
+            self._pps = (self.packets - self._rate_packets) / dt
+            self._rate_ts, self._rate_packets = now, self.packets
+        return {
+            "port": self._port,
+            "transport": self.transport,
+            "kernel_timestamps": self._kernel_ts,
+            "packets": self.packets,
+            "bytes": self.bytes,
+            "pps": round(self._pps, 1),
+            "filtered": self.filtered,
+            "superseded": self.superseded,
+            "errors": self.errors,
+            "batches": self.batches,
+            "max_batch": self.max_batch,
+            "link": self.link.snapshot(),
+        }
+
+    # --- Shared processing ---
+
+    def _decode_and_publish(self, newest: Dict[Hashable, Tuple[memoryview, Optional[float], float]], ts: float) -> None:
+        decoded = []
+        perf = time.perf_counter
+        for kind, (data, kernel, recv) in newest.items():
+            try:
+                value = self.decode(kind, data, ts)
+            except Exception:
+                value = None
+            if value is None:
+                self.errors += 1
+                continue
+            decoded.append((kind, value, (kernel, recv, perf())))
+
+        if not decoded:
+            return
+        history = self.history
+        if history is not None:
+            for kind, value, _timing in decoded:
+                if kind == self.history_kind:
+                    history.add(value)
+        with self._lock:
+            for kind, value, timing in decoded:
+                self.publish(kind, value)
+                self._timing[kind] = (value, timing)
+
+        cb = self.on_packet
+        if cb is not None:
+            cb()
+
+    # --- asyncio transport ---
+
+    def _on_datagram(self, data: bytes) -> None:
+        recv = time.perf_counter()
+        self.packets += 1
+        self.bytes += len(data)
+        view = memoryview(data)
+        seq = self.sequence(view)
+        if seq is not None and not self.link.check(seq):
+            return
+        kind = self.classify(view)
+        if kind is None:
+            self.filtered += 1
+            return
+        if self.link_kind is None or kind == self.link_kind:
+            self.link.arrival(recv)
+        self._decode_and_publish({kind: (view, None, recv)}, time.time())
+
+    # --- Thread transport ---
+
+    def _drain(self, timeout: float) -> bool:
+        """Wait up to `timeout` for data, then drain one batch. Returns False once the socket is gone."""
+        sock = self._sock
+        if sock is None:
+            return False
+        try:
+            ready, _, _ = select.select((sock,), (), (), timeout)
+        except (OSError, ValueError):
+            return False
+        if not ready:
+            return True
+
+        if not self._views:
+            self._views = [memoryview(bytearray(self._buffer_size)) for _ in range(self._pool_size)]
+        views = self._views
+        recv_into = sock.recv_into
+        classify = self.classify
+        sequence = self.sequence
+        link = self.link
+        link_kind = self.link_kind
+        perf = time.perf_counter
+        kernel_ts = self._kernel_ts
+        # Kernel stamps are wall clock: map them onto perf_counter once per batch.
+        wall_to_perf = (time.time() - perf()) if kernel_ts else 0.0
+
+        # Drain everything queued (up to the pool size) before decoding anything.
+        newest: Dict[Hashable, Tuple[memoryview, Optional[float], float]] = {}
+        count = 0
+        alive = True
+        while count < self._pool_size:
+            view = views[count]
+            kernel = None
+            try:
+                if kernel_ts:
+                    n, anc, _flags, _addr = sock.recvmsg_into((view,), 64)
+                    for level, kind_, cdata in anc:
+                        if level == socket.SOL_SOCKET and kind_ == _SO_TIMESTAMPNS and len(cdata) >= _TIMESPEC.size:
+                            sec, nsec = _TIMESPEC.unpack_from(cdata)
+                            kernel = sec + nsec * 1e-9 - wall_to_perf
+                else:
+                    n = recv_into(view)
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionResetError:
+                continue  # Windows: ICMP port unreachable from a previous send
+            except OSError:
+                alive = False
+                break
+            recv = perf()
+            count += 1
+            self.bytes += n
+
+            data = view[:n]
+            seq = sequence(data)
+            if seq is not None and not link.check(seq):
+                continue
+            kind = classify(data)
+            if kind is None:
+                self.filtered += 1
+                continue
+            if link_kind is None or kind == link_kind:
+                link.arrival(recv if kernel is None else kernel)
+            if kind in newest:
+                self.superseded += 1
+                if kind == self.history_kind and self.history is not None:
+                    self._record(kind, newest[kind][0])
+            newest[kind] = (data, kernel, recv)
+
+        if count:
+            self.packets += count
+            self.batches += 1
+            if count > self.max_batch:
+                self.max_batch = count
+        if newest:
+            self._decode_and_publish(newest, time.time())
+        return alive
+
+    def _record(self, kind: Hashable, view: memoryview) -> None:
+        """History only: decode a datagram that a newer one of the same batch supersedes."""
+        ts = time.time()
+        try:
+            value = self.decode(kind, view, ts)
+        except Exception:
+            value = None
+        if value is not None:
+            self.history.add(value)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if not self._drain(0.2):
+                break
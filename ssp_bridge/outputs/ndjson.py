@@ -1,15 +1,207 @@
 """NDJSON output writer.
 
-Writes one JSON object per line for easy logging and replay."""
-import json
+Writes one JSON object per line for easy logging and replay.
+
+Flush policies:
+- line:  every line is written and flushed immediately (crash-safe, one syscall per frame)
+- batch: lines are buffered in memory and written by a background thread when
+         `flush_bytes` accumulate or `flush_interval` elapses (the caller never touches the disk)
+
+Optionally rotates segments by size and/or duration and gzips closed segments."""
+from __future__ import annotations
+
+import gzip
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from ssp_bridge.core.serialize import serialize
+
+FLUSH_POLICIES = ("line", "batch")
+
 
 class NdjsonWriter:
-    def __init__(self, path):
-        self.f = open(path, "a", encoding="utf-8")
+    def __init__(
+        self,
+        path,
+        *,
+        flush: str = "line",
+        flush_bytes: int = 64 * 1024,
+        flush_interval: float = 1.0,
+        fsync: bool = False,
+        rotate_bytes: int = 0,
+        rotate_seconds: float = 0.0,
+        compress: bool = False,
+    ):
+        if flush not in FLUSH_POLICIES:
+            raise ValueError(f"Unknown NDJSON flush policy: {flush}. Available: {', '.join(FLUSH_POLICIES)}")
+
+        self.path = Path(path)
+        self.flush = flush
+        self.flush_bytes = max(int(flush_bytes), 1)
+        self.flush_interval = max(float(flush_interval), 0.01)
+        self.fsync = bool(fsync)
+        self.rotate_bytes = max(int(rotate_bytes), 0)
+        self.rotate_seconds = max(float(rotate_seconds), 0.0)
+        self.compress = bool(compress)
+
+        self._segment = 0
+        self._seg_bytes = 0
+        self._seg_started = 0.0
+        self.f = None
+        self._open_segment()
+
+        # Gzip of closed segments never runs on the caller's thread.
+        self._compressor: Optional[ThreadPoolExecutor] = None
+        if self.compress:
+            self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ndjson-gzip")
+
+        # Batch mode state (guarded by _cond).
+        self._cond = threading.Condition()
+        self._pending: List[bytes] = []
+        self._pending_bytes = 0
+        self._closing = False
+        self._error_reported = False
+        self._thread: Optional[threading.Thread] = None
+
+        if self.flush == "batch":
+            self._thread = threading.Thread(target=self._run, name="ndjson-writer", daemon=True)
+            self._thread.start()
+
+    # --- Segments ---
+
+    @property
+    def rotating(self) -> bool:
+        return self.rotate_bytes > 0 or self.rotate_seconds > 0.0
+
+    def segment_path(self, index: int) -> Path:
+        """Path of segment `index` (the plain session path when rotation is off)."""
+        if not self.rotating:
+            return self.path
+        return self.path.with_name(f"{self.path.stem}.part{index:03d}{self.path.suffix}")
+
+    def _open_segment(self) -> None:
+        seg_path = self.segment_path(self._segment)
+        if self.compress and self.rotating:
+            # Continue past segments an earlier run with the same path already compressed.
+            while seg_path.with_name(seg_path.name + ".gz").exists():
+                self._segment += 1
+                seg_path = self.segment_path(self._segment)
+        self.f = open(seg_path, "ab")
+        self._seg_bytes = self.f.tell()
+        self._seg_started = time.monotonic()
+
+    def _close_segment(self) -> None:
+        if self.f is None:
+            return
+        seg_path = Path(self.f.name)
+        self.f.flush()
+        if self.fsync:
+            os.fsync(self.f.fileno())
+        self.f.close()
+        self.f = None
+
+        if self._compressor is not None:
+            self._compressor.submit(_gzip_and_remove, seg_path)
 
-    def write(self, frame: dict):
-        self.f.write(json.dumps(frame, ensure_ascii=False) + "\n")
+    def _maybe_rotate(self) -> None:
+        if not self.rotating:
+            return
+        if self._seg_bytes == 0:
+            # Never produce empty segments while idle; restart the clock instead.
+            self._seg_started = time.monotonic()
+            return
+        due = (self.rotate_bytes > 0 and self._seg_bytes >= self.rotate_bytes) or (
+            self.rotate_seconds > 0.0 and (time.monotonic() - self._seg_started) >= self.rotate_seconds
+        )
+        if not due:
+            return
+        self._close_segment()
+        self._segment += 1
+        self._open_segment()
+
+    def _write_raw(self, data: bytes) -> None:
+        self.f.write(data)
         self.f.flush()
+        if self.fsync:
+            os.fsync(self.f.fileno())
+        self._seg_bytes += len(data)
+        self._maybe_rotate()
+
+    # --- Public API ---
+
+    def write(self, frame):
+        """Append one frame (dict or pre-serialized SerializedFrame)."""
+        line = serialize(frame).line
+
+        if self._thread is None:
+            self._write_raw(line)
+            return
+
+        with self._cond:
+            self._pending.append(line)
+            self._pending_bytes += len(line)
+            if self._pending_bytes >= self.flush_bytes:
+                self._cond.notify()
 
     def close(self):
-        self.f.close()
\ No newline at end of file
+        if self._thread is not None:
+            with self._cond:
+                self._closing = True
+                self._cond.notify()
+            self._thread.join()
+            self._thread = None
+
+        self._close_segment()
+
+        if self._compressor is not None:
+            self._compressor.shutdown(wait=True)
+            self._compressor = None
+
+    # --- Batch mode ---
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closing and self._pending_bytes < self.flush_bytes:
+                    self._cond.wait(timeout=self._next_wait())
+                batch = self._pending
+                self._pending = []
+                self._pending_bytes = 0
+                closing = self._closing
+
+            if batch:
+                try:
+                    self._write_raw(b"".join(batch))
+                except Exception as exc:
+                    # Logging is best-effort: never crash the bridge because of disk errors.
+                    if not self._error_reported:
+                        self._error_reported = True
+                        print(f"[NdjsonWriter] Write failed for {self.path}: {exc}")
+            elif self.rotating:
+                # Time-based rotation must also happen while no frames arrive.
+                self._maybe_rotate()
+
+            if closing:
+                return
+
+    def _next_wait(self) -> float:
+        wait = self.flush_interval
+        if self.rotate_seconds > 0.0:
+            left = self.rotate_seconds - (time.monotonic() - self._seg_started)
+            wait = min(wait, max(left, 0.01))
+        return wait
+
+
+def _gzip_and_remove(path: Path) -> None:
+    try:
+        # "x": never replace an existing archive; the plain segment is kept instead.
+        with open(path, "rb") as src, gzip.open(str(path) + ".gz", "xb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        path.unlink()
+    except Exception as exc:
+        print(f"[NdjsonWriter] Failed to compress {path}: {exc}")
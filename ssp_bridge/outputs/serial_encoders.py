@@ -0,0 +1,209 @@
+"""Serial payload encoders.
+
+An encoder turns serialized events/frames into the bytes sent to a device. Encoders are
+stateful (keyframes, layout ids) but device-agnostic: devices with identical configs share
+one encoder, so each payload is built once per frame no matter how many ports receive it.
+
+Every encode() returns a list of (bytes, force) packets:
+- force=True  -> ordered, never-dropped delivery (events, keyframes, descriptors, headers)
+- force=False -> latest-wins frame slot of each device
+preamble() returns what a freshly (re)connected device needs before the stream makes sense."""
+# ssp_bridge/outputs/serial_encoders.py
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ssp_bridge.core.binary import BinaryEncoder
+from ssp_bridge.core.delta import DeltaEncoder
+from ssp_bridge.core.serialize import SerializedFrame
+
+Packet = Tuple[bytes, bool]
+
+SERIAL_ENCODINGS = ("json", "csv", "delta", "binary")
+
+
+def _quantize(value: Any, precision: Optional[int]) -> Any:
+    if precision is None or isinstance(value, bool) or not isinstance(value, float):
+        return value
+    return round(value, precision)
+
+
+class SerialEncoder:
+    """Base encoder: optional signal whitelist (in order) and precision override."""
+
+    name = "json"
+
+    def __init__(
+        self,
+        signals: Optional[List[str]] = None,
+        precision: Optional[int] = None,
+        keyframe_interval: float = 2.0,
+    ) -> None:
+        self.signals = list(signals) if signals else None
+        self.precision = precision
+        self.keyframe_interval = keyframe_interval
+        self._signal_set = set(self.signals) if self.signals else None
+
+    def project(self, frame: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply the whitelist and precision to a frame (returns a new dict)."""
+        sig = frame.get("signals") or {}
+        if self._signal_set is not None:
+            sig = {k: v for k, v in sig.items() if k in self._signal_set}
+        if self.precision is not None:
+            sig = {k: _quantize(v, self.precision) for k, v in sig.items()}
+        out = {k: v for k, v in frame.items() if k != "signals"}
+        out["signals"] = sig
+        return out
+
+    def encode(self, sf: SerializedFrame) -> List[Packet]:
+        if sf.type is not None:
+            return [(sf.line, True)]
+        if self._signal_set is None and self.precision is None:
+            # Unfiltered JSON: reuse the bytes every other sink already shares.
+            return [(sf.line, False)]
+        return [(SerializedFrame(self.project(sf.obj)).line, False)]
+
+    def preamble(self) -> List[bytes]:
+        return []
+
+
+class CsvSerialEncoder(SerialEncoder):
+    """
+    Plain CSV lines for the simplest sketches.
+
+    - `#ssp,<name>,<name>...` header on capabilities and reconnect (column order)
+    - `#status,<state>` for status events
+    - one `v1,v2,...` line per frame (empty field = signal unavailable)
+    """
+
+    name = "csv"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._columns: List[str] = list(self.signals or [])
+        self._decimals: Dict[str, int] = {}
+        self._header: Optional[bytes] = None
+
+    def _set_capabilities(self, caps: Optional[Dict[str, Any]]) -> None:
+        declared = (caps or {}).get("signals") or {}
+        if self.signals is None:
+            self._columns = list(declared)
+        self._decimals = {}
+        for k in self._columns:
+            meta = declared.get(k) or {}
+            if meta.get("type") == "number":
+                p = self.precision if self.precision is not None else meta.get("precision")
+                if p is not None:
+                    self._decimals[k] = int(p)
+        self._header = ("#ssp," + ",".join(self._columns) + "\n").encode("utf-8")
+
+    def _fmt(self, key: str, v: Any) -> str:
+        if v is None:
+            return ""
+        if isinstance(v, float):
+            d = self._decimals.get(key)
+            return f"{v:.{d}f}" if d is not None else repr(v)
+        return str(v).replace(",", " ")
+
+    def encode(self, sf: SerializedFrame) -> List[Packet]:
+        if sf.type == "capabilities":
+            self._set_capabilities(sf.obj.get("capabilities"))
+            return [(self._header, True)]
+        if sf.type == "status":
+            return [(f"#status,{sf.obj.get('state')}\n".encode("utf-8"), True)]
+        if sf.type is not None or self._header is None:
+            return []
+
+        sig = sf.obj.get("signals") or {}
+        line = ",".join(self._fmt(k, sig.get(k)) for k in self._columns) + "\n"
+        return [(line.encode("utf-8"), False)]
+
+    def preamble(self) -> List[bytes]:
+        return [self._header] if self._header is not None else []
+
+
+class DeltaSerialEncoder(SerialEncoder):
+    """Keyframe + delta NDJSON lines (see core/delta.py)."""
+
+    name = "delta"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._delta = DeltaEncoder(self.keyframe_interval, precision=self.precision)
+
+    def encode(self, sf: SerializedFrame) -> List[Packet]:
+        if sf.type is not None:
+            if sf.type == "capabilities":
+                self._delta.set_capabilities(sf.obj.get("capabilities"))
+            return [(sf.line, True)]
+
+        frame = sf.obj if self._signal_set is None else self.project(sf.obj)
+        msg, is_key = self._delta.encode(frame)
+        return [(SerializedFrame(msg).line, is_key)]
+
+    def preamble(self) -> List[bytes]:
+        key = self._delta.keyframe()
+        return [SerializedFrame(key).line] if key is not None else []
+
+
+class BinarySerialEncoder(SerialEncoder):
+    """Packed binary frames (see core/binary.py); layout descriptor repeated periodically."""
+
+    name = "binary"
+
+    def __init__(self, *args, descriptor_interval: float = 5.0, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.descriptor_interval = descriptor_interval
+        self._bin = BinaryEncoder(self.signals, self.precision)
+        self._descriptor_ts = 0.0
+
+    def encode(self, sf: SerializedFrame) -> List[Packet]:
+        enc = self._bin
+        if sf.type == "capabilities":
+            self._descriptor_ts = time.time()
+            return [(enc.set_capabilities(sf.obj.get("capabilities")), True)]
+        if sf.type == "status":
+            return [(enc.encode_status(sf.obj.get("state")), True)]
+        if sf.type is not None:
+            return []
+
+        out: List[Packet] = []
+        # Devices may reset (DTR) or attach mid-stream: repeat the layout periodically.
+        now = time.time()
+        desc = enc.descriptor()
+        if desc is not None and (now - self._descriptor_ts) >= self.descriptor_interval:
+            out.append((desc, True))
+            self._descriptor_ts = now
+
+        packet = enc.encode_frame(sf.obj)
+        if packet is not None:
+            out.append((packet, False))
+        return out
+
+    def preamble(self) -> List[bytes]:
+        desc = self._bin.descriptor()
+        return [desc] if desc is not None else []
+
+
+_ENCODERS = {
+    "json": SerialEncoder,
+    "csv": CsvSerialEncoder,
+    "delta": DeltaSerialEncoder,
+    "binary": BinarySerialEncoder,
+}
+
+
+def make_serial_encoder(
+    encoding: str = "json",
+    signals: Optional[List[str]] = None,
+    precision: Optional[int] = None,
+    keyframe_interval: float = 2.0,
+    descriptor_interval: float = 5.0,
+) -> SerialEncoder:
+    encoding = (encoding or "json").strip().lower()
+    if encoding not in _ENCODERS:
+        raise ValueError(f"Unknown serial encoding: {encoding}. Available: {', '.join(SERIAL_ENCODINGS)}")
+    if encoding == "binary":
+        return BinarySerialEncoder(signals, precision, keyframe_interval, descriptor_interval=descriptor_interval)
+    return _ENCODERS[encoding](signals, precision, keyframe_interval)
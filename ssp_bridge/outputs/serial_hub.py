@@ -0,0 +1,138 @@
+"""Several serial devices behind one sink.
+
+Each device gets its own SerialOut (own writer thread, rate and reconnect), so a slow port
+cannot hold back the others. Devices with the same (encoding, signals, precision) share one
+encoder: their payload is built once per frame and handed to every writer in the group.
+
+Device specs (CLI, repeatable `--serial-out`):
+
+    PORT[:BAUD][,enc=json|csv|delta|binary][,hz=30][,signals=a+b+c][,precision=1]
+
+Config file (`--serial-config devices.json`): a JSON list of objects with the same keys
+(`port`, `baud`, `encoding`, `hz`, `signals` as a list, `precision`)."""
+# ssp_bridge/outputs/serial_hub.py
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ssp_bridge.core.serialize import SerializedFrame
+from ssp_bridge.outputs.serial_encoders import SERIAL_ENCODINGS, SerialEncoder, make_serial_encoder
+from ssp_bridge.outputs.serial_out import SerialOut
+
+
+@dataclass
+class SerialConfig:
+    port: str
+    baud: int = 115200
+    hz: float = 60.0  # 0 = unlimited
+    encoding: str = "json"
+    signals: Optional[List[str]] = None
+    precision: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        self.encoding = (self.encoding or "json").strip().lower()
+        if self.encoding not in SERIAL_ENCODINGS:
+            raise ValueError(f"Unknown serial encoding: {self.encoding}. Available: {', '.join(SERIAL_ENCODINGS)}")
+        self.hz = float(self.hz)
+        if self.hz < 0:
+            raise ValueError(f"Invalid serial rate (hz must be >= 0): {self.hz:g}")
+        if self.signals is not None:
+            self.signals = [s.strip() for s in self.signals if s and s.strip()] or None
+
+    def encoder_key(self) -> Tuple[Any, ...]:
+        return (self.encoding, tuple(self.signals) if self.signals else None, self.precision)
+
+
+def parse_serial_spec(spec: str, default_encoding: str = "json") -> SerialConfig:
+    """Parse `PORT[:BAUD][,key=value...]` (see module docstring)."""
+    head, *opts = [p.strip() for p in spec.split(",")]
+
+    port, baud = head, 115200
+    # Split the baud from the right only: device paths may contain ':' on some systems.
+    if ":" in head:
+        name, _, tail = head.rpartition(":")
+        if tail.isdigit():
+            port, baud = name, int(tail)
+        elif not tail:
+            port = name
+    if not port:
+        raise ValueError(f"Invalid serial spec (missing port): {spec}")
+
+    cfg: Dict[str, Any] = {"port": port, "baud": baud, "encoding": default_encoding}
+    for opt in opts:
+        if not opt:
+            continue
+        key, sep, value = opt.partition("=")
+        key = key.strip().lower()
+        value = value.strip()
+        if not sep:
+            raise ValueError(f"Invalid serial option (expected key=value): {opt}")
+        if key in ("enc", "encoding"):
+            cfg["encoding"] = value
+        elif key == "hz":
+            cfg["hz"] = float(value)
+        elif key == "baud":
+            cfg["baud"] = int(value)
+        elif key == "signals":
+            cfg["signals"] = value.split("+")
+        elif key == "precision":
+            cfg["precision"] = int(value)
+        else:
+            raise ValueError(f"Unknown serial option: {key}")
+    return SerialConfig(**cfg)
+
+
+def load_serial_config(path: str | Path, default_encoding: str = "json") -> List[SerialConfig]:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if isinstance(data, dict):
+        data = data.get("devices") or []
+
+    out: List[SerialConfig] = []
+    for item in data:
+        item = dict(item)
+        if "enc" in item:
+            item["encoding"] = item.pop("enc")
+        item.setdefault("encoding", default_encoding)
+        out.append(SerialConfig(**item))
+    return out
+
+
+@dataclass
+class SerialHub:
+    configs: List[SerialConfig]
+    keyframe_interval: float = 2.0
+    devices: List[SerialOut] = field(default_factory=list, init=False)
+
+    def __post_init__(self) -> None:
+        # One encoder per distinct payload config; devices in a group share its bytes.
+        self._groups: Dict[Tuple[Any, ...], Tuple[SerialEncoder, List[SerialOut]]] = {}
+        for cfg in self.configs:
+            key = cfg.encoder_key()
+            group = self._groups.get(key)
+            if group is None:
+                enc = make_serial_encoder(cfg.encoding, cfg.signals, cfg.precision, self.keyframe_interval)
+                group = self._groups[key] = (enc, [])
+
+            dev = SerialOut(cfg.port, cfg.baud, rate_hz=cfg.hz, mode=cfg.encoding, encoder=group[0])
+            group[1].append(dev)
+            self.devices.append(dev)
+
+    def send(self, sf: SerializedFrame) -> None:
+        for enc, devices in self._groups.values():
+            packets = enc.encode(sf)
+            for dev in devices:
+                dev.deliver(packets)
+
+    def wants(self, key: str) -> bool:
+        """True if a device's payload carries signal `key`."""
+        return any(cfg.signals is None or key in cfg.signals for cfg in self.configs)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [dev.stats() for dev in self.devices]
+
+    def close(self) -> None:
+        for dev in self.devices:
+            dev.close()
@@ -1,12 +1,17 @@
 # ssp_bridge/outputs/serial_out.py
 from __future__ import annotations
 
+import threading
 import time
+from collections import deque
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
 
 import serial  # pyserial
 
+from ssp_bridge.core.serialize import SerializedFrame
+from ssp_bridge.outputs.serial_encoders import SerialEncoder, make_serial_encoder
+
 
 @dataclass
 class SerialOut:
@@ -18,50 +23,104 @@ class SerialOut:
 
     The class is intentionally simple:
     - no parsing
-    - no buffering logic
     - no simulator-specific behavior
+
+    All port I/O happens on a dedicated writer thread, so the asyncio loop never blocks on
+    a stalled USB CDC device:
+    - frames go into a one-slot mailbox (latest wins): when the device is slower than the
+      bridge, the frame that gets written is always the newest one
+    - events, keyframes and layout descriptors go into an ordered queue that is never dropped
+      (a write that times out is retried)
+    - `rate_hz` paces the writer; the port is reopened automatically if it disappears
+
+    Modes (see outputs/serial_encoders.py):
+    - json:   one NDJSON line per frame
+    - csv:    header line + one comma-separated values line per frame
+    - delta:  keyframe + delta lines (see core/delta.py)
+    - binary: COBS-framed packed structs (see core/binary.py); the layout descriptor is sent
+              when capabilities arrive, after every reconnect and every `descriptor_interval` seconds
+
+    `signals` (whitelist, in order) and `precision` tailor the payload to the device.
+    Several devices may share one `encoder` (SerialHub does this for identical configs):
+    the payload is then built once and handed to each device's writer via deliver().
     """
 
     port: str
     baud: int = 115200
     enabled: bool = True
-    rate_hz: int = 60  # Maximum lines per second (protects microcontrollers)
+    rate_hz: float = 60.0  # Maximum frames per second (protects microcontrollers); 0 = unlimited
+    mode: str = "json"
+    keyframe_interval: float = 2.0
+    descriptor_interval: float = 5.0
+    write_timeout: float = 0.5
+    reconnect_interval: float = 1.0
+    signals: Optional[List[str]] = None
+    precision: Optional[int] = None
+    encoder: Optional[SerialEncoder] = None
 
     def __post_init__(self) -> None:
         self._ser: Optional[serial.Serial] = None
-        self._next_send_ts: float = 0.0
+        if self.encoder is None:
+            self.encoder = make_serial_encoder(
+                self.mode, self.signals, self.precision, self.keyframe_interval, self.descriptor_interval
+            )
+
+        # Mailbox shared with the writer thread (guarded by _cond).
+        self._cond = threading.Condition()
+        self._frame: Optional[bytes] = None
+        # Bounded so a long disconnect cannot grow it forever (oldest entries go first).
+        self._control: Deque[bytes] = deque(maxlen=64)
+        self._stop = False
+        self._reconnected = False  # set by the writer, consumed by send() on the caller side
 
+        self.bytes_sent = 0
+        self.frames_sent = 0
+        self.frames_coalesced = 0
+        self.events_sent = 0
+        self.stalls = 0
+        self.reconnects = 0
+        self._open_error_reported = False
+
+        self._thread: Optional[threading.Thread] = None
         if not self.enabled:
             return
 
-        try:
-            # Non-blocking serial connection
-            self._ser = serial.Serial(
-                self.port,
-                self.baud,
-                timeout=0,
-                write_timeout=0.05,
-            )
-        except Exception as exc:
-            # Serial is optional: failure must not crash the bridge
-            print(f"[SerialOut] Failed to open serial port {self.port}: {exc}")
-            self.enabled = False
+        self._thread = threading.Thread(target=self._run, name=f"serial-writer-{self.port}", daemon=True)
+        self._thread.start()
 
-    def _rate_limit_ok(self) -> bool:
+    @property
+    def connected(self) -> bool:
+        return self._ser is not None
+
+    # --- Caller side (asyncio loop) ---
+
+    def send(self, sf: SerializedFrame) -> None:
         """
-        Simple rate limiter.
+        Sends one serialized event/frame according to the configured mode.
 
-        Prevents flooding slow devices like Arduino.
+        Events (status/capabilities) are always delivered, in order.
         """
-        if self.rate_hz <= 0:
-            return True
+        if not self.enabled:
+            return
+        self.deliver(self.encoder.encode(sf))
 
-        now = time.time()
-        if now < self._next_send_ts:
-            return False
+    def deliver(self, packets: Iterable[Tuple[bytes, bool]]) -> None:
+        """
+        Queues packets already built by the encoder (shared between identical devices).
 
-        self._next_send_ts = now + (1.0 / self.rate_hz)
-        return True
+        After a reconnect the encoder preamble (CSV header, delta keyframe, binary layout)
+        goes first: a (re)attached device has no state.
+        """
+        if not self.enabled:
+            return
+
+        if self._reconnected:
+            self._reconnected = False
+            for data in self.encoder.preamble():
+                self.send_bytes(data, force=True)
+
+        for data, force in packets:
+            self.send_bytes(data, force=force)
 
     def send_line(self, line: str) -> None:
         """
@@ -69,28 +128,143 @@ class SerialOut:
 
         The caller is responsible for formatting (NDJSON).
         """
-        if not self.enabled or not self._ser:
-            return
+        self.send_bytes((line + "\n").encode("utf-8", errors="ignore"))
+
+    def send_bytes(self, data: bytes, force: bool = False) -> None:
+        """
+        Hands pre-encoded bytes to the writer thread (never blocks).
 
-        if not self._rate_limit_ok():
+        `force` routes them through the ordered, never-dropped queue (events, keyframes,
+        descriptors); otherwise they replace any frame still waiting in the mailbox.
+        """
+        if not self.enabled:
             return
 
+        with self._cond:
+            if force:
+                self._control.append(data)
+            else:
+                if self._frame is not None:
+                    self.frames_coalesced += 1
+                self._frame = data
+            self._cond.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "port": self.port,
+            "mode": self.encoder.name,
+            "connected": self.connected,
+            "bytes": self.bytes_sent,
+            "frames": self.frames_sent,
+            "frames_coalesced": self.frames_coalesced,
+            "events": self.events_sent,
+            "stalls": self.stalls,
+            "reconnects": self.reconnects,
+        }
+
+    # --- Writer thread ---
+
+    def _open_port(self) -> bool:
+        try:
+            self._ser = serial.Serial(
+                self.port,
+                self.baud,
+                timeout=0,
+                write_timeout=self.write_timeout,
+            )
+        except Exception as exc:
+            # Serial is optional: failure must not crash the bridge
+            if not self._open_error_reported:
+                self._open_error_reported = True
+                print(f"[SerialOut] Failed to open serial port {self.port}: {exc} (retrying)")
+            self._ser = None
+            return False
+
+        if self._open_error_reported or self.reconnects or self.bytes_sent:
+            print(f"[SerialOut] Serial port {self.port} connected.")
+        self._open_error_reported = False
+        return True
+
+    def _drop_port(self) -> None:
+        ser, self._ser = self._ser, None
+        if ser is None:
+            return
         try:
-            self._ser.write((line + "\n").encode("utf-8", errors="ignore"))
+            ser.close()
         except Exception:
-            # Never crash the application because of serial errors
             pass
 
+    def _run(self) -> None:
+        min_gap = (1.0 / self.rate_hz) if self.rate_hz > 0 else 0.0
+        next_frame_ts = 0.0
+        first = True
+
+        while True:
+            if self._ser is None:
+                if self._stop:
+                    return
+                if self._open_port():
+                    if not first:
+                        self.reconnects += 1
+                        self._reconnected = True
+                    first = False
+                else:
+                    with self._cond:
+                        self._cond.wait(timeout=self.reconnect_interval)
+                    continue
+
+            with self._cond:
+                while True:
+                    if self._control:
+                        data, is_event = self._control.popleft(), True
+                        break
+                    now = time.monotonic()
+                    if self._frame is not None and now >= next_frame_ts:
+                        data, is_event = self._frame, False
+                        self._frame = None
+                        break
+                    if self._stop:
+                        data = None
+                        break
+                    timeout = (next_frame_ts - now) if self._frame is not None else None
+                    self._cond.wait(timeout=timeout)
+
+            if data is None:
+                self._drop_port()
+                return
+
+            try:
+                self._ser.write(data)
+            except serial.SerialTimeoutException:
+                # Device is not draining its buffer. A frame is superseded by the next one;
+                # events, keyframes and headers go back to the front of the queue and are retried.
+                self.stalls += 1
+                if is_event:
+                    with self._cond:
+                        if not self._stop:
+                            self._control.appendleft(data)
+                continue
+            except Exception:
+                # Port vanished (USB unplug, device reset): reopen in the background.
+                self._drop_port()
+                continue
+
+            self.bytes_sent += len(data)
+            if is_event:
+                self.events_sent += 1
+            else:
+                self.frames_sent += 1
+                next_frame_ts = time.monotonic() + min_gap
+
     def close(self) -> None:
         """
-        Closes the serial port safely.
+        Flushes queued events, stops the writer thread and closes the serial port safely.
         """
-        if not self._ser:
-            return
+        if self._thread is not None:
+            with self._cond:
+                self._stop = True
+                self._cond.notify()
+            self._thread.join(timeout=2.0)
+            self._thread = None
 
-        try:
-            self._ser.close()
-        except Exception:
-            pass
-        finally:
-            self._ser = None
+        self._drop_port()
@@ -1,45 +1,378 @@
 """WebSocket broadcaster output.
 
-Maintains an optional sticky event cache to replay the latest state to newly connected clients."""
+Maintains an optional sticky event cache to replay the latest state to newly connected clients.
+
+Each client gets its own bounded send queue and sender task, so a slow client never delays
+the others (or the telemetry loop):
+- telemetry frames use a latest-wins slot (older unsent frames are dropped and counted)
+- status/capabilities events are always delivered (queued separately, coalesced per type
+  only if the client falls far behind)
+
+Clients may narrow their stream with a subscribe message:
+
+    {"type": "subscribe", "signals": ["engine.rpm_pct", "controls.*"], "hz": 30}
+
+Clients with identical subscriptions share one group: the projection is built and encoded
+once per frame and the group's rate limit is applied once for all of its members.
+
+Adding `"mode": "delta"` switches the group to keyframe + delta messages (see core/delta.py).
+Keyframes travel on the always-delivered event queue; deltas use the latest-wins slot."""
+from __future__ import annotations
+
 import asyncio
 import json
-import websockets
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from ssp_bridge.core.delta import DeltaEncoder
+from ssp_bridge.core.serialize import SerializedFrame, serialize
+
+STICKY_TYPES = ("status", "capabilities")
+STREAM_MODES = ("full", "delta")
+
+_FULL_STREAM: Tuple[Optional[Tuple[str, ...]], float, str] = (None, 0.0, "full")
+
+
+def _signal_matcher(patterns: Tuple[str, ...]):
+    """Build a predicate for exact keys, `prefix.*` wildcards and `*`."""
+    exact = set()
+    prefixes = []
+    for p in patterns:
+        if p == "*":
+            return lambda key: True
+        if p.endswith(".*"):
+            prefixes.append(p[:-1])  # keep the trailing dot
+        else:
+            exact.add(p)
+    prefixes_t = tuple(prefixes)
+    return lambda key: key in exact or (bool(prefixes_t) and key.startswith(prefixes_t))
+
+
+class _Group:
+    """Clients sharing the same (signals, hz, mode) subscription."""
+
+    def __init__(
+        self,
+        patterns: Optional[Tuple[str, ...]],
+        hz: float,
+        mode: str = "full",
+        keyframe_interval: float = 2.0,
+    ) -> None:
+        self.patterns = patterns
+        self.requested_hz = hz
+        self.hz = hz  # effective rate (clamped by capabilities)
+        self.mode = mode
+        self.delta: Optional[DeltaEncoder] = DeltaEncoder(keyframe_interval) if mode == "delta" else None
+        self.clients: set = set()
+        self._next_due = 0.0
+        self._match = _signal_matcher(patterns) if patterns is not None else None
+        self._key_cache: Dict[str, bool] = {}
+
+    def matches(self, key: str) -> bool:
+        hit = self._key_cache.get(key)
+        if hit is None:
+            hit = self._key_cache[key] = self._match(key)
+        return hit
+
+    @property
+    def key(self) -> Tuple[Optional[Tuple[str, ...]], float, str]:
+        return (self.patterns, self.requested_hz, self.mode)
+
+    def set_capabilities(self, caps: Optional[Dict[str, Any]]) -> None:
+        if self.delta is not None:
+            self.delta.set_capabilities(caps)
+        self.resolve_rate(caps)
+
+    def resolve_rate(self, caps: Optional[Dict[str, Any]]) -> None:
+        """Clamp the requested rate to the fastest declared `hz` of the subscribed signals."""
+        self.hz = self.requested_hz
+        if self.patterns is None or not caps:
+            return
+        declared = [
+            float(meta.get("hz") or 0)
+            for key, meta in (caps.get("signals") or {}).items()
+            if self.matches(key)
+        ]
+        declared = [hz for hz in declared if hz > 0]
+        if not declared:
+            return
+        cap = max(declared)
+        self.hz = min(self.requested_hz, cap) if self.requested_hz > 0 else cap
+
+    def due(self, now: float) -> bool:
+        if self.hz <= 0:
+            return True
+        if now < self._next_due:
+            return False
+        self._next_due = now + 1.0 / self.hz
+        return True
+
+    def project(self, sf: SerializedFrame) -> Optional[SerializedFrame]:
+        if self.patterns is None:
+            return sf
+        return sf.encoding(("ws.proj", self.patterns), self._build_projection)
+
+    def _build_projection(self, frame: Dict[str, Any]) -> Optional[SerializedFrame]:
+        signals = {k: v for k, v in (frame.get("signals") or {}).items() if self.matches(k)}
+        if not signals:
+            return None
+        out = {k: v for k, v in frame.items() if k != "signals"}
+        out["signals"] = signals
+        return SerializedFrame(out)
+
+
+class _Client:
+    """Per-connection send state."""
+
+    def __init__(self, websocket, max_frames: int, max_events: int) -> None:
+        self.ws = websocket
+        self.frames: Deque[SerializedFrame] = deque(maxlen=max_frames)
+        self.events: Deque[SerializedFrame] = deque()
+        self.max_events = max_events
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.group: Optional[_Group] = None
+
+        self.sent_frames = 0
+        self.sent_events = 0
+        self.dropped_frames = 0
+        self.coalesced_events = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self.frames) + len(self.events)
+
+    def push_frame(self, sf: SerializedFrame) -> None:
+        if len(self.frames) == self.frames.maxlen:
+            self.dropped_frames += 1  # deque(maxlen) evicts the oldest
+        self.frames.append(sf)
+        self.wakeup.set()
+
+    def push_event(self, sf: SerializedFrame) -> None:
+        # Frames queued before a status/capabilities change are stale by definition; other
+        # events (stats, subscribed, error, keyframes) leave the live frame alone.
+        if sf.type in STICKY_TYPES:
+            self.dropped_frames += len(self.frames)
+            self.frames.clear()
+
+        if len(self.events) >= self.max_events:
+            # Client is far behind: keep only the newest event of this type.
+            for old in self.events:
+                if old.type == sf.type:
+                    self.events.remove(old)
+                    self.coalesced_events += 1
+                    break
+            else:
+                self.events.popleft()
+                self.coalesced_events += 1
+
+        self.events.append(sf)
+        self.wakeup.set()
+
+    def stats(self) -> Dict[str, Any]:
+        addr = getattr(self.ws, "remote_address", None)
+        return {
+            "remote": f"{addr[0]}:{addr[1]}" if addr else None,
+            "signals": list(self.group.patterns) if self.group and self.group.patterns else None,
+            "hz": self.group.hz if self.group else 0.0,
+            "mode": self.group.mode if self.group else "full",
+            "queue_depth": self.queue_depth,
+            "sent_frames": self.sent_frames,
+            "sent_events": self.sent_events,
+            "dropped_frames": self.dropped_frames,
+            "coalesced_events": self.coalesced_events,
+        }
+
 
 class WSBroadcaster:
-    def __init__(self):
-        self.clients = set()
+    def __init__(self, max_frames: int = 1, max_events: int = 32, keyframe_interval: float = 2.0):
+        self.clients: Dict[Any, _Client] = {}
+        self.max_frames = max(int(max_frames), 1)
+        self.max_events = max(int(max_events), len(STICKY_TYPES))
+        self.keyframe_interval = keyframe_interval
         # Cache the latest important events for newly connected clients.
-        self._sticky = {}  # key: type -> event dict
+        self._sticky = {}  # key: type -> SerializedFrame
+        # Subscription groups: (patterns, requested hz, mode) -> _Group
+        self._groups: Dict[Tuple[Optional[Tuple[str, ...]], float, str], _Group] = {}
+        # Bumped whenever a group appears or goes away (what wants() answers may change).
+        self.demand_version = 0
 
-    def update_sticky(self, event: dict):
-        t = event.get("type")
-        if t in ("status", "capabilities"):
-            self._sticky[t] = event
+    def update_sticky(self, event):
+        ev = serialize(event)
+        t = ev.type
+        if t in STICKY_TYPES:
+            self._sticky[t] = ev
+            if t == "capabilities":
+                caps = self._capabilities()
+                for group in self._groups.values():
+                    group.set_capabilities(caps)
 
-    async def handler(self, websocket):
-        self.clients.add(websocket)
+    def _capabilities(self) -> Optional[Dict[str, Any]]:
+        ev = self._sticky.get("capabilities")
+        return ev.obj.get("capabilities") if ev is not None else None
+
+    # --- Subscriptions ---
+
+    def _join(self, client: _Client, key) -> _Group:
+        self._leave(client)
+
+        group = self._groups.get(key)
+        if group is None:
+            group = _Group(*key, keyframe_interval=self.keyframe_interval)
+            group.set_capabilities(self._capabilities())
+            self._groups[key] = group
+            self.demand_version += 1
+        group.clients.add(client)
+        client.group = group
+
+        # Delta clients need the group's current keyframe before any delta makes sense
+        # (same idea as the sticky status/capabilities replay).
+        if group.delta is not None and group.delta.keyframe() is not None:
+            client.push_event(serialize(group.delta.keyframe()))
+        return group
+
+    def _leave(self, client: _Client) -> None:
+        group = client.group
+        if group is None:
+            return
+        group.clients.discard(client)
+        if not group.clients:
+            self._groups.pop(group.key, None)
+            self.demand_version += 1
+        client.group = None
+
+    def _handle_message(self, client: _Client, message) -> None:
         try:
-            # Send cached (sticky) events immediately after connect.
-            for t in ("status", "capabilities"):
-                ev = self._sticky.get(t)
-                if ev is not None:
-                    await websocket.send(json.dumps(ev, ensure_ascii=False))
+            msg = json.loads(message)
+        except (TypeError, ValueError):
+            client.push_event(serialize({"type": "error", "ts": time.time(), "error": "invalid JSON"}))
+            return
+        if not isinstance(msg, dict):
+            return
+
+        t = msg.get("type")
+        if t == "unsubscribe":
+            key = _FULL_STREAM
+        elif t == "subscribe":
+            signals = msg.get("signals")
+            hz = msg.get("hz", 0)
+            if signals is not None and (
+                not isinstance(signals, list) or not all(isinstance(x, str) and x for x in signals)
+            ):
+                client.push_event(serialize({"type": "error", "ts": time.time(), "error": "signals must be a list of strings"}))
+                return
+            if not isinstance(hz, (int, float)) or hz < 0:
+                client.push_event(serialize({"type": "error", "ts": time.time(), "error": "hz must be a number >= 0"}))
+                return
+            mode = msg.get("mode", "full")
+            if mode not in STREAM_MODES:
+                client.push_event(serialize({"type": "error", "ts": time.time(), "error": f"mode must be one of {', '.join(STREAM_MODES)}"}))
+                return
+            patterns = tuple(sorted(set(signals))) if signals and "*" not in signals else None
+            key = (patterns, float(hz), mode)
+        else:
+            # Unknown client messages are ignored (forward compatibility).
+            return
 
-            await websocket.wait_closed()
+        client.push_event(serialize({
+            "type": "subscribed",
+            "ts": time.time(),
+            "signals": list(key[0]) if key[0] is not None else ["*"],
+            "hz": self._resolved_hz(key),
+            "mode": key[2],
+        }))
+        self._join(client, key)
+
+    def _resolved_hz(self, key) -> float:
+        group = self._groups.get(key)
+        if group is None:
+            group = _Group(key[0], key[1])
+            group.resolve_rate(self._capabilities())
+        return group.hz
+
+    def wants(self, key: str) -> bool:
+        """True if a connected client receives signal `key`."""
+        return any(g.patterns is None or g.matches(key) for g in self._groups.values())
+
+    # --- Connection lifecycle ---
+
+    async def handler(self, websocket):
+        client = _Client(websocket, self.max_frames, self.max_events)
+
+        # Send cached (sticky) events immediately after connect.
+        for t in STICKY_TYPES:
+            ev = self._sticky.get(t)
+            if ev is not None:
+                client.push_event(ev)
+
+        self.clients[websocket] = client
+        self._join(client, _FULL_STREAM)
+        client.task = asyncio.create_task(self._sender(client))
+        try:
+            async for message in websocket:
+                self._handle_message(client, message)
+        except Exception:
+            pass
         finally:
-            self.clients.discard(websocket)
+            self.clients.pop(websocket, None)
+            self._leave(client)
+            client.task.cancel()
 
-    async def broadcast(self, event: dict):
+    async def _sender(self, client: _Client) -> None:
+        ws = client.ws
+        try:
+            while True:
+                await client.wakeup.wait()
+                client.wakeup.clear()
+
+                while client.events or client.frames:
+                    if client.events:
+                        sf = client.events.popleft()
+                        await ws.send(sf.data, text=True)
+                        client.sent_events += 1
+                    else:
+                        sf = client.frames.popleft()
+                        await ws.send(sf.data, text=True)
+                        client.sent_frames += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            # Connection closed/broken: handler() cleans up when the socket closes.
+            pass
+
+    def publish(self, event) -> None:
+        """Queue an event/frame for every client (never blocks)."""
         if not self.clients:
             return
-        msg = json.dumps(event, ensure_ascii=False)
+        sf = serialize(event)
+        if sf.type is not None:
+            for client in self.clients.values():
+                client.push_event(sf)
+            return
+
+        now = time.monotonic()
+        for group in self._groups.values():
+            if not group.due(now):
+                continue
+            out = group.project(sf)
+            if out is None:
+                continue
+
+            if group.delta is not None:
+                msg, is_key = group.delta.encode(out.obj, now)
+                out = SerializedFrame(msg)
+                if is_key:
+                    for client in group.clients:
+                        client.push_event(out)
+                    continue
+
+            for client in group.clients:
+                client.push_frame(out)
 
-        dead = []
-        for ws in list(self.clients):
-            try:
-                await ws.send(msg)
-            except Exception:
-                dead.append(ws)
+    async def broadcast(self, event):
+        self.publish(event)
 
-        for ws in dead:
-            self.clients.discard(ws)
\ No newline at end of file
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-client counters (queue depth, sent/dropped frames, subscription...)."""
+        return [c.stats() for c in self.clients.values()]
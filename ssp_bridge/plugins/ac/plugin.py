@@ -8,7 +8,7 @@ from .shared_memory import ACSharedMemory
 
 
 class ACPlugin(TelemetryPlugin):
-    """Assetto Corsa telemetry plugin (Windows shared memory)."""
+    """Assetto Corsa telemetry plugin (shared memory: WinAPI or mirrored page files)."""
 
     id = "ac"
     name = "Assetto Corsa"
@@ -25,6 +25,9 @@ class ACPlugin(TelemetryPlugin):
             raise RuntimeError("ACPlugin is not opened. Call open() first.")
         return self._sm.read()
 
+    def packet_id(self) -> Optional[int]:
+        return self._sm.last_packet_id if self._sm is not None else None
+
     def capabilities(self) -> Dict[str, Any]:
         return CAPABILITIES_AC
 
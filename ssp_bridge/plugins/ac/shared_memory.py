@@ -1,17 +1,15 @@
-"""AC shared memory reader (Windows).
+"""AC shared memory reader.
 
-Uses WinAPI file mapping to read Assetto Corsa shared memory.
+Reads the Assetto Corsa physics page through core.shm: the WinAPI mapping on Windows, or a
+mirrored page file (/dev/shm/acpmf_physics, see --shm-dir) elsewhere.
 """
 from __future__ import annotations
 
 import ctypes
-from ctypes import wintypes
-import struct
 import time
 from typing import Optional
-import sys
 
-FILE_MAP_READ = 0x0004
+from ssp_bridge.core.shm import WCHAR, SharedMapping, open_mapping
 
 # AC physics mapping names. Some systems expose without "Local\".
 AC_PHYSICS_MAP_CANDIDATES = [
@@ -19,118 +17,181 @@ AC_PHYSICS_MAP_CANDIDATES = [
     r"acpmf_physics",
 ]
 
-# Offsets based on common SPageFilePhysics layout:
-# int32 packetId
-# float gas
-# float brake
-# float fuel
-# int32 gear
-# int32 rpms
-# float steerAngle
-# float speedKmh
-OFF_PACKET = 0
-OFF_GAS = 4
-OFF_BRAKE = 8
-OFF_GEAR = 16
-OFF_RPM = 20
-OFF_SPEED = 28
-
-READ_PREFIX = 128
-
-
-if sys.platform == "win32":
-    k32 = ctypes.windll.kernel32
-
-    OpenFileMappingW = k32.OpenFileMappingW
-    OpenFileMappingW.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.LPCWSTR]
-    OpenFileMappingW.restype = wintypes.HANDLE
-
-    MapViewOfFile = k32.MapViewOfFile
-    MapViewOfFile.argtypes = [wintypes.HANDLE, wintypes.DWORD, wintypes.DWORD, wintypes.DWORD, ctypes.c_size_t]
-    MapViewOfFile.restype = wintypes.LPVOID
-
-    UnmapViewOfFile = k32.UnmapViewOfFile
-    UnmapViewOfFile.argtypes = [wintypes.LPCVOID]
-    UnmapViewOfFile.restype = wintypes.BOOL
-
-    CloseHandle = k32.CloseHandle
-    CloseHandle.argtypes = [wintypes.HANDLE]
-    CloseHandle.restype = wintypes.BOOL
-else:
-    def _win_only(*_args, **_kwargs):
-        raise RuntimeError("AC shared memory is only available on Windows.")
-
-    OpenFileMappingW = _win_only
-    MapViewOfFile = _win_only
-    UnmapViewOfFile = _win_only
-    CloseHandle = _win_only
+# Torn-read guard: re-read while packetId changes under us (the sim writes at up to 333 Hz).
+READ_RETRIES = 4
+
+
+class SPageFilePhysics(ctypes.Structure):
+    """AC physics page (acpmf_physics), shared memory layout v1.7."""
+
+    _pack_ = 4
+    _fields_ = [
+        ("packetId", ctypes.c_int),
+        ("gas", ctypes.c_float),
+        ("brake", ctypes.c_float),
+        ("fuel", ctypes.c_float),
+        ("gear", ctypes.c_int),
+        ("rpms", ctypes.c_int),
+        ("steerAngle", ctypes.c_float),
+        ("speedKmh", ctypes.c_float),
+        ("velocity", ctypes.c_float * 3),
+        ("accG", ctypes.c_float * 3),
+        ("wheelSlip", ctypes.c_float * 4),
+        ("wheelLoad", ctypes.c_float * 4),
+        ("wheelsPressure", ctypes.c_float * 4),
+        ("wheelAngularSpeed", ctypes.c_float * 4),
+        ("tyreWear", ctypes.c_float * 4),
+        ("tyreDirtyLevel", ctypes.c_float * 4),
+        ("tyreCoreTemperature", ctypes.c_float * 4),
+        ("camberRAD", ctypes.c_float * 4),
+        ("suspensionTravel", ctypes.c_float * 4),
+        ("drs", ctypes.c_float),
+        ("tc", ctypes.c_float),
+        ("heading", ctypes.c_float),
+        ("pitch", ctypes.c_float),
+        ("roll", ctypes.c_float),
+        ("cgHeight", ctypes.c_float),
+        ("carDamage", ctypes.c_float * 5),
+        ("numberOfTyresOut", ctypes.c_int),
+        ("pitLimiterOn", ctypes.c_int),
+        ("abs", ctypes.c_float),
+        ("kersCharge", ctypes.c_float),
+        ("kersInput", ctypes.c_float),
+        ("autoShifterOn", ctypes.c_int),
+        ("rideHeight", ctypes.c_float * 2),
+        ("turboBoost", ctypes.c_float),
+        ("ballast", ctypes.c_float),
+        ("airDensity", ctypes.c_float),
+        ("airTemp", ctypes.c_float),
+        ("roadTemp", ctypes.c_float),
+        ("localAngularVel", ctypes.c_float * 3),
+        ("finalFF", ctypes.c_float),
+        ("performanceMeter", ctypes.c_float),
+        ("engineBrake", ctypes.c_int),
+        ("ersRecoveryLevel", ctypes.c_int),
+        ("ersPowerLevel", ctypes.c_int),
+        ("ersHeatCharging", ctypes.c_int),
+        ("ersIsCharging", ctypes.c_int),
+        ("kersCurrentKJ", ctypes.c_float),
+        ("drsAvailable", ctypes.c_int),
+        ("drsEnabled", ctypes.c_int),
+        ("brakeTemp", ctypes.c_float * 4),
+        ("clutch", ctypes.c_float),
+        ("tyreTempI", ctypes.c_float * 4),
+        ("tyreTempM", ctypes.c_float * 4),
+        ("tyreTempO", ctypes.c_float * 4),
+        ("isAIControlled", ctypes.c_int),
+        ("tyreContactPoint", (ctypes.c_float * 3) * 4),
+        ("tyreContactNormal", (ctypes.c_float * 3) * 4),
+        ("tyreContactHeading", (ctypes.c_float * 3) * 4),
+        ("brakeBias", ctypes.c_float),
+        ("localVelocity", ctypes.c_float * 3),
+    ]
+
+
+# Fields shared by the AC and ACC graphics pages (they diverge after normalizedCarPosition).
+GRAPHICS_HEAD_FIELDS = [
+    ("packetId", ctypes.c_int),
+    ("status", ctypes.c_int),  # 0 off, 1 replay, 2 live, 3 pause
+    ("session", ctypes.c_int),
+    ("currentTime", WCHAR * 15),
+    ("lastTime", WCHAR * 15),
+    ("bestTime", WCHAR * 15),
+    ("split", WCHAR * 15),
+    ("completedLaps", ctypes.c_int),
+    ("position", ctypes.c_int),
+    ("iCurrentTime", ctypes.c_int),
+    ("iLastTime", ctypes.c_int),
+    ("iBestTime", ctypes.c_int),
+    ("sessionTimeLeft", ctypes.c_float),
+    ("distanceTraveled", ctypes.c_float),
+    ("isInPit", ctypes.c_int),
+    ("currentSectorIndex", ctypes.c_int),
+    ("lastSectorTime", ctypes.c_int),
+    ("numberOfLaps", ctypes.c_int),
+    ("tyreCompound", WCHAR * 33),
+    ("replayTimeMultiplier", ctypes.c_float),
+    ("normalizedCarPosition", ctypes.c_float),
+]
+
+
+class SPageFileGraphic(ctypes.Structure):
+    """AC graphics page (acpmf_graphics), shared memory layout v1.7."""
+
+    _pack_ = 4
+    _fields_ = GRAPHICS_HEAD_FIELDS + [
+        ("carCoordinates", ctypes.c_float * 3),
+        ("penaltyTime", ctypes.c_float),
+        ("flag", ctypes.c_int),
+        ("idealLineOn", ctypes.c_int),
+        ("isInPitLane", ctypes.c_int),
+        ("surfaceGrip", ctypes.c_float),
+        ("mandatoryPitDone", ctypes.c_int),
+        ("windSpeed", ctypes.c_float),
+        ("windDirection", ctypes.c_float),
+    ]
 
 
 class ACSharedMemory:
     """Read-only AC physics mapping reader."""
 
     def __init__(self) -> None:
-        self._hmap: Optional[int] = None
-        self._view: Optional[int] = None
+        self._mapping: Optional[SharedMapping] = None
+        self._phys: Optional[SPageFilePhysics] = None
+
+        # Last raw packetId seen (used by the runtime to pace polling).
+        self.last_packet_id: Optional[int] = None
 
         # Derived (bridge-estimated) rpm_max when sim doesn't provide it
         self._rpm_max_obs: int = 0
         self._low_rpm_since: float = 0.0
 
     def open(self) -> None:
-        hmap = None
-        for name in AC_PHYSICS_MAP_CANDIDATES:
-            hm = OpenFileMappingW(FILE_MAP_READ, False, name)
-            if hm:
-                hmap = hm
-                break
-
-        if not hmap:
+        mapping = open_mapping(AC_PHYSICS_MAP_CANDIDATES, ctypes.sizeof(SPageFilePhysics))
+        if mapping is None:
             raise RuntimeError("AC shared memory not available yet (mapping not created).")
 
-        view = MapViewOfFile(hmap, FILE_MAP_READ, 0, 0, 0)
-        if not view:
-            CloseHandle(hmap)
-            raise RuntimeError("MapViewOfFile failed for AC physics mapping.")
-
-        self._hmap = int(hmap)
-        self._view = int(view)
+        self._mapping = mapping
+        self._attach(mapping.address)
 
         self._rpm_max_obs = 0
         self._low_rpm_since = 0.0
 
-    def close(self) -> None:
-        if self._view is not None:
-            try:
-                UnmapViewOfFile(self._view)
-            finally:
-                self._view = None
+    def _attach(self, address: int) -> None:
+        # In-place view over the mapping: field reads hit shared memory directly, no copies.
+        self._phys = SPageFilePhysics.from_address(address)
 
-        if self._hmap is not None:
+    def close(self) -> None:
+        # Drop the struct view before unmapping so nothing can read freed memory.
+        self._phys = None
+        if self._mapping is not None:
             try:
-                CloseHandle(self._hmap)
+                self._mapping.close()
             finally:
-                self._hmap = None
+                self._mapping = None
 
         self._rpm_max_obs = 0
         self._low_rpm_since = 0.0
+        self.last_packet_id = None
 
     def read(self):
-        if self._view is None:
+        phys = self._phys
+        if phys is None:
             return None
 
-        raw = ctypes.string_at(self._view, READ_PREFIX)
-
-        try:
-            pkt = struct.unpack_from("<i", raw, OFF_PACKET)[0]
-            gas = struct.unpack_from("<f", raw, OFF_GAS)[0]
-            brake = struct.unpack_from("<f", raw, OFF_BRAKE)[0]
-            gear = struct.unpack_from("<i", raw, OFF_GEAR)[0]
-            rpm = struct.unpack_from("<i", raw, OFF_RPM)[0]
-            speed = struct.unpack_from("<f", raw, OFF_SPEED)[0]
-        except struct.error:
-            return None
+        for _ in range(READ_RETRIES):
+            pkt = phys.packetId
+            gas = phys.gas
+            brake = phys.brake
+            gear = phys.gear
+            rpm = phys.rpms
+            speed = phys.speedKmh
+            if phys.packetId == pkt:
+                break
+        else:
+            return None  # still being written: try again on the next poll
 
+        self.last_packet_id = int(pkt)
         now = time.time()
 
         if not self._plausible(pkt, rpm, speed, gear, gas, brake):
@@ -149,26 +210,21 @@ class ACSharedMemory:
                 self._rpm_max_obs = int(rpm)
 
         rpm_max = int(self._rpm_max_obs) if self._rpm_max_obs > 0 else 0
-        rpm_pct = 0.0
-        if rpm_max > 0:
-            rpm_pct = max(0.0, min(100.0, (float(rpm) / float(rpm_max)) * 100.0))
-
-        return {
-            "v": "0.2",
-            "ts": now,
-            "source": "ac",
-            "signals": {
-                "engine.rpm": int(rpm),
-                "vehicle.speed_kmh": float(speed),
-                "drivetrain.gear": int(gear),
-                "controls.throttle_pct": self._clamp01(gas) * 100.0,
-                "controls.brake_pct": self._clamp01(brake) * 100.0,
-                # unified extras
-                "engine.rpm_max": int(rpm_max),
-                "engine.rpm_pct": float(round(rpm_pct, 1)),
-                "vehicle.car_id": "",  # AC: not available (keep stable key)
-            },
+
+        sig = {
+            "engine.rpm": int(rpm),
+            "vehicle.speed_kmh": float(speed),
+            "drivetrain.gear": int(gear),
+            "controls.throttle_pct": self._clamp01(gas) * 100.0,
+            "controls.brake_pct": self._clamp01(brake) * 100.0,
+            # unified extras
+            "vehicle.car_id": "",  # AC: not available (keep stable key)
         }
+        # engine.rpm_pct is derived by the bridge (core/derived.py).
+        if rpm_max > 0:
+            sig["engine.rpm_max"] = int(rpm_max)
+
+        return {"v": "0.2", "ts": now, "source": "ac", "signals": sig}
 
     def _clamp01(self, x: float) -> float:
         if x < 0.0:
@@ -9,7 +9,7 @@ from .shared_memory import ACCSharedMemory
 
 
 class ACCPlugin(TelemetryPlugin):
-    """Assetto Corsa Competizione telemetry plugin (Windows shared memory)."""
+    """Assetto Corsa Competizione telemetry plugin (shared memory: WinAPI or mirrored page files)."""
 
     id = "acc"
     name = "Assetto Corsa Competizione"
@@ -17,7 +17,7 @@ class ACCPlugin(TelemetryPlugin):
     def __init__(self) -> None:
         self._sm: ACCSharedMemory | None = None
 
-        # Process-aware health check (cached). Using tasklist per frame is too expensive.
+        # Process-aware health check (reads the shared process snapshot, cached per 750ms).
         self._proc = ProcessWatch(
             "AC2-Win64-Shipping.exe",
             cache_ttl=0.75,
@@ -33,12 +33,15 @@ class ACCPlugin(TelemetryPlugin):
 
         # Reset ProcessWatch internal cache so it re-checks cleanly.
         # (Keeps behavior stable when switching sims in auto mode.)
-        self._proc._misses = 0
-        self._proc._cached_running = True
-        self._proc._last_check_ts = 0.0
+        self._proc.reset()
 
         self._opened_at = time.time()
 
+    def set_notify(self, notify) -> None:
+        """Wake the runtime the moment the ACC process exits (pull plugin: no data wake-ups)."""
+        self._notify = notify
+        self._proc.on_exit = notify
+
     def read_frame(self):
         """
         Read the latest ACC telemetry snapshot.
@@ -61,12 +64,17 @@ class ACCPlugin(TelemetryPlugin):
 
         return data
 
+    def packet_id(self):
+        """Latest raw ACC packetId (pacing hint only, not a liveness signal)."""
+        return self._sm.last_packet_id if self._sm is not None else None
+
     def capabilities(self):
         """Return SSP capabilities for ACC."""
         return CAPABILITIES_ACC
 
     def close(self) -> None:
-        """Close shared memory mapping."""
+        """Close shared memory mapping and stop watching the ACC process."""
+        self._proc.close()
         if self._sm:
             self._sm.close()
             self._sm = None
@@ -1,78 +1,101 @@
 """ACC shared memory reader.
 
-Wraps the ACC shared memory structures (Windows)."""
+Wraps the ACC shared memory structures, mapped through core.shm (WinAPI on Windows, mirrored
+page files such as /dev/shm/acpmf_physics elsewhere)."""
 import ctypes
-from ctypes import wintypes
-import struct
 import time
 from typing import Optional
 
+from ssp_bridge.core.shm import WCHAR, SharedMapping, open_mapping, wstr
+from ssp_bridge.plugins.ac.shared_memory import GRAPHICS_HEAD_FIELDS, READ_RETRIES, SPageFilePhysics
+
 
 ACC_PHYSICS_MAP = r"Local\acpmf_physics"
 ACC_STATIC_MAP = r"Local\acpmf_static"
 
-FILE_MAP_READ = 0x0004
-
-# ACC shared memory reader is Windows-only (uses WinAPI mappings).
-# Keep module importable on non-Windows so the package can still be imported/docs built.
-import sys
-
-if sys.platform == "win32":
-    k32 = ctypes.windll.kernel32
-
-    OpenFileMappingW = k32.OpenFileMappingW
-    OpenFileMappingW.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.LPCWSTR]
-    OpenFileMappingW.restype = wintypes.HANDLE
-
-    MapViewOfFile = k32.MapViewOfFile
-    MapViewOfFile.argtypes = [wintypes.HANDLE, wintypes.DWORD, wintypes.DWORD, wintypes.DWORD, ctypes.c_size_t]
-    MapViewOfFile.restype = wintypes.LPVOID
-
-    UnmapViewOfFile = k32.UnmapViewOfFile
-    UnmapViewOfFile.argtypes = [wintypes.LPCVOID]
-    UnmapViewOfFile.restype = wintypes.BOOL
 
-    CloseHandle = k32.CloseHandle
-    CloseHandle.argtypes = [wintypes.HANDLE]
-    CloseHandle.restype = wintypes.BOOL
-else:
-    k32 = None
-
-    def _win_only(*_args, **_kwargs):
-        raise RuntimeError("ACC shared memory is only available on Windows.")
-
-    OpenFileMappingW = _win_only
-    MapViewOfFile = _win_only
-    UnmapViewOfFile = _win_only
-    CloseHandle = _win_only
+class SPageFilePhysicsACC(SPageFilePhysics):
+    """ACC physics page: the AC layout followed by the ACC-only fields (shared memory v1.8)."""
 
+    _pack_ = 4
+    _fields_ = [
+        ("P2PActivations", ctypes.c_int),
+        ("P2PStatus", ctypes.c_int),
+        ("currentMaxRpm", ctypes.c_int),
+        ("mz", ctypes.c_float * 4),
+        ("fx", ctypes.c_float * 4),
+        ("fy", ctypes.c_float * 4),
+        ("slipRatio", ctypes.c_float * 4),
+        ("slipAngle", ctypes.c_float * 4),
+        ("tcinAction", ctypes.c_int),
+        ("absInAction", ctypes.c_int),
+        ("suspensionDamage", ctypes.c_float * 4),
+        ("tyreTemp", ctypes.c_float * 4),
+        ("waterTemp", ctypes.c_float),
+        ("brakePressure", ctypes.c_float * 4),
+        ("frontBrakeCompound", ctypes.c_int),
+        ("rearBrakeCompound", ctypes.c_int),
+        ("padLife", ctypes.c_float * 4),
+        ("discLife", ctypes.c_float * 4),
+        ("ignitionOn", ctypes.c_int),
+        ("starterEngineOn", ctypes.c_int),
+        ("isEngineRunning", ctypes.c_int),
+        ("kerbVibration", ctypes.c_float),
+        ("slipVibrations", ctypes.c_float),
+        ("gVibrations", ctypes.c_float),
+        ("absVibrations", ctypes.c_float),
+    ]
 
-# ---- Offsets (ACC PHYSICS) ----
-OFF_PACKET = 0
 
-# Pedals (your finder results)
-OFF_THROTTLE = 4   # float32 0..1
-OFF_BRAKE = 8      # float32 0..1
+class SPageFileGraphicACC(ctypes.Structure):
+    """ACC graphics page (leading fields up to rainTyres; later fields are not mapped)."""
 
-# Core signals
-OFF_GEAR = 16      # int32
-OFF_RPM = 20       # int32
-OFF_SPEED = 28     # float32 km/h (you confirmed)
+    _pack_ = 4
+    _fields_ = GRAPHICS_HEAD_FIELDS + [
+        ("activeCars", ctypes.c_int),
+        ("carCoordinates", (ctypes.c_float * 3) * 60),
+        ("carID", ctypes.c_int * 60),
+        ("playerCarID", ctypes.c_int),
+        ("penaltyTime", ctypes.c_float),
+        ("flag", ctypes.c_int),
+        ("penalty", ctypes.c_int),
+        ("idealLineOn", ctypes.c_int),
+        ("isInPitLane", ctypes.c_int),
+        ("surfaceGrip", ctypes.c_float),
+        ("mandatoryPitDone", ctypes.c_int),
+        ("windSpeed", ctypes.c_float),
+        ("windDirection", ctypes.c_float),
+        ("isSetupMenuVisible", ctypes.c_int),
+        ("mainDisplayIndex", ctypes.c_int),
+        ("secondaryDisplayIndex", ctypes.c_int),
+        ("TC", ctypes.c_int),
+        ("TCCut", ctypes.c_int),
+        ("EngineMap", ctypes.c_int),
+        ("ABS", ctypes.c_int),
+        ("fuelXLap", ctypes.c_float),
+        ("rainLights", ctypes.c_int),
+        ("flashingLights", ctypes.c_int),
+        ("lightsStage", ctypes.c_int),
+        ("exhaustTemperature", ctypes.c_float),
+        ("wiperLV", ctypes.c_int),
+        ("DriverStintTotalTimeLeft", ctypes.c_int),
+        ("DriverStintTimeLeft", ctypes.c_int),
+        ("rainTyres", ctypes.c_int),
+    ]
 
-READ_PREFIX = 256
 
 class SPageFileStatic(ctypes.Structure):
     _pack_ = 4
     _fields_ = [
-        ("smVersion", ctypes.c_wchar * 15),
-        ("acVersion", ctypes.c_wchar * 15),
+        ("smVersion", WCHAR * 15),
+        ("acVersion", WCHAR * 15),
         ("numberOfSessions", ctypes.c_int),
         ("numCars", ctypes.c_int),
-        ("carModel", ctypes.c_wchar * 33),
-        ("track", ctypes.c_wchar * 33),
-        ("playerName", ctypes.c_wchar * 33),
-        ("playerSurname", ctypes.c_wchar * 33),
-        ("playerNick", ctypes.c_wchar * 33),
+        ("carModel", WCHAR * 33),
+        ("track", WCHAR * 33),
+        ("playerName", WCHAR * 33),
+        ("playerSurname", WCHAR * 33),
+        ("playerNick", WCHAR * 33),
         ("sectorCount", ctypes.c_int),
         ("maxTorque", ctypes.c_float),
         ("maxPower", ctypes.c_float),
@@ -81,7 +104,7 @@ class SPageFileStatic(ctypes.Structure):
 
 class ACCSharedMemory:
     """
-    ACC telemetry reader using WinAPI mapping (read-only) + offset unpacking.
+    ACC telemetry reader using WinAPI mapping (read-only) + in-place ctypes page views.
 
     Outputs:
       - engine.rpm (int)
@@ -96,14 +119,14 @@ class ACCSharedMemory:
     """
 
     def __init__(self):
-        self._hmap: Optional[int] = None
-        self._hmap_static: Optional[int] = None
-        self._view_static: Optional[int] = None
+        self._mapping: Optional[SharedMapping] = None
+        self._mapping_static: Optional[SharedMapping] = None
+        self._static: Optional[SPageFileStatic] = None
 
         self._static_last_read_ts: float = 0.0
         self._car_model: str = ""
         self._max_rpm: int = 0
-        self._view: Optional[int] = None
+        self._phys: Optional[SPageFilePhysicsACC] = None
 
         self._last_pkt: Optional[int] = None
         self._last_pkt_change_ts: float = 0.0
@@ -113,60 +136,38 @@ class ACCSharedMemory:
 
 
     def open(self):
-        hmap = OpenFileMappingW(FILE_MAP_READ, False, ACC_PHYSICS_MAP)
-        if not hmap:
+        mapping = open_mapping([ACC_PHYSICS_MAP], ctypes.sizeof(SPageFilePhysicsACC))
+        if mapping is None:
             raise RuntimeError("ACC shared memory not available yet (mapping not created).")
-        
-        # Open STATIC mapping (carModel/maxRpm)
-        hmap_s = OpenFileMappingW(FILE_MAP_READ, False, ACC_STATIC_MAP)
-        if hmap_s:
-            view_s = MapViewOfFile(hmap_s, FILE_MAP_READ, 0, 0, 0)
-            if view_s:
-                self._hmap_static = int(hmap_s)
-                self._view_static = int(view_s)
-            else:
-                CloseHandle(hmap_s)
-                self._hmap_static = None
-                self._view_static = None
-        else:
-            self._hmap_static = None
-            self._view_static = None
 
-        view = MapViewOfFile(hmap, FILE_MAP_READ, 0, 0, 0)
-        if not view:
-            CloseHandle(hmap)
-            raise RuntimeError("MapViewOfFile failed for ACC physics mapping.")
+        # Open STATIC mapping (carModel/maxRpm); optional.
+        try:
+            static = open_mapping([ACC_STATIC_MAP], ctypes.sizeof(SPageFileStatic))
+        except RuntimeError:
+            static = None
 
-        self._hmap = int(hmap)
-        self._view = int(view)
+        self._mapping = mapping
+        self._mapping_static = static
+        self._attach(mapping.address, static.address if static is not None else None)
 
         now = time.time()
         self._last_pkt = None
         self._last_pkt_change_ts = now
 
+    def _attach(self, address: int, static_address: Optional[int] = None) -> None:
+        # In-place views over the mappings: field reads hit shared memory directly, no copies.
+        self._phys = SPageFilePhysicsACC.from_address(address)
+        self._static = SPageFileStatic.from_address(static_address) if static_address else None
+
     def close(self):
-        if self._view is not None:
-            try:
-                UnmapViewOfFile(self._view)
-            finally:
-                self._view = None
-
-        if self._hmap is not None:
-            try:
-                CloseHandle(self._hmap)
-            finally:
-                self._hmap = None
-        if self._view_static is not None:
-            try:
-                UnmapViewOfFile(self._view_static)
-            finally:
-                self._view_static = None
-
-        if self._hmap_static is not None:
-            try:
-                CloseHandle(self._hmap_static)
-            finally:
-                self._hmap_static = None
+        # Drop the struct view before unmapping so nothing can read freed memory.
+        self._phys = None
+        self._static = None
+        for mapping in (self._mapping, self._mapping_static):
+            if mapping is not None:
+                mapping.close()
+        self._mapping = None
+        self._mapping_static = None
 
         self._car_model = ""
         self._max_rpm = 0
@@ -176,18 +177,21 @@ class ACCSharedMemory:
         self._last_pkt_change_ts = 0.0
 
     def read(self):
-        if self._view is None:
+        phys = self._phys
+        if phys is None:
             return None
 
-        raw = ctypes.string_at(self._view, READ_PREFIX)
-
-        pkt = struct.unpack_from("<i", raw, OFF_PACKET)[0]
-        throttle = struct.unpack_from("<f", raw, OFF_THROTTLE)[0]
-        brake = struct.unpack_from("<f", raw, OFF_BRAKE)[0]
-
-        gear = struct.unpack_from("<i", raw, OFF_GEAR)[0]
-        rpm = struct.unpack_from("<i", raw, OFF_RPM)[0]
-        speed = struct.unpack_from("<f", raw, OFF_SPEED)[0]
+        for _ in range(READ_RETRIES):
+            pkt = phys.packetId
+            throttle = phys.gas
+            brake = phys.brake
+            gear = phys.gear
+            rpm = phys.rpms
+            speed = phys.speedKmh
+            if phys.packetId == pkt:
+                break
+        else:
+            return None  # still being written: try again on the next poll
 
         now = time.time()
 
@@ -215,9 +219,6 @@ class ACCSharedMemory:
             return None
 
         rpm_max = self._max_rpm or 0
-        rpm_pct = 0.0
-        if rpm_max > 0:
-            rpm_pct = max(0.0, min(100.0, (float(rpm) / float(rpm_max)) * 100.0))
 
         sig = {
             "engine.rpm": int(rpm),
@@ -231,12 +232,17 @@ class ACCSharedMemory:
         if car_id:
             sig["vehicle.car_id"] = car_id
 
+        # engine.rpm_pct is derived by the bridge (core/derived.py).
         if rpm_max > 0:
             sig["engine.rpm_max"] = int(rpm_max)
-            sig["engine.rpm_pct"] = float(round(rpm_pct, 1))
 
         return {"v": "0.2", "ts": now, "source": "acc", "signals": sig}
 
+    @property
+    def last_packet_id(self) -> Optional[int]:
+        """Last raw packetId seen (used by the runtime to pace polling)."""
+        return self._last_pkt
+
     def _clamp01(self, x: float) -> float:
         if x < 0.0:
             return 0.0
@@ -269,7 +275,7 @@ class ACCSharedMemory:
 
         return False
     def _read_static_cached(self, now: float) -> None:
-        if self._view_static is None:
+        if self._static is None:
             return
 
         # evita ler o tempo todo, mas acelera quando max_rpm está zerado (troca de carro)
@@ -280,8 +286,8 @@ class ACCSharedMemory:
         self._static_last_read_ts = now
 
         try:
-            s = SPageFileStatic.from_address(self._view_static)
-            car_model = (s.carModel or "").strip("\x00").strip()
+            s = self._static
+            car_model = wstr(s.carModel).strip()
             max_rpm = int(s.maxRpm)
 
             # Se trocar de carro, reseta max rpm imediatamente
@@ -1,15 +1,38 @@
 """AMS2 telemetry plugin (UDP/SMS).
 
-Receives SMS UDP packets and normalizes them into the SSP frame model."""
+Receives SMS UDP packets and normalizes them into the SSP frame model. Race signals come from
+the timings / time stats packets (decoded once per packet, only when a frame is built).
+The UDP port is owned by the process-wide ingest (core/ingest.py) and stays bound after close()."""
 # ssp_bridge/plugins/ams2/plugin.py
 from __future__ import annotations
 
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 from ssp_bridge.plugins.base import TelemetryPlugin
+from ssp_bridge.plugins.ams2 import sms
 from ssp_bridge.plugins.ams2.receiver import LatestUDPReceiver
 from ssp_bridge.core.capabilities import CAPABILITIES_AMS2
+from ssp_bridge.core.history import SampleRing
+from ssp_bridge.core.ingest import INGEST
+
+
+# A freshly bound port gets this long to see its first packet in open().
+_FIRST_PACKET_WAIT = 0.6
+# Car physics older than this is not live telemetry (read_frame() returns None).
+_LIVE_MAX_AGE = 0.5
+
+# Race data older than this is left out of frames (e.g. UDP packet types disabled in game).
+_RACE_DATA_MAX_AGE = 2.0
+
+_TYRE_SIGNALS = ("tyres.fl.temp_c", "tyres.fr.temp_c", "tyres.rl.temp_c", "tyres.rr.temp_c")
+
+# Kept for every car physics packet (not just the one a frame is built from).
+_HISTORY_SIGNALS = ("engine.rpm", "vehicle.speed_kmh", "controls.throttle_pct", "controls.brake_pct")
+
+
+def _history_sample(tel: Any) -> tuple:
+    return tel.rpm, abs(tel.speed_ms) * 3.6, tel.throttle_pct, tel.brake_pct
 
 
 def _clamp_pct(x: float) -> float:
@@ -23,23 +46,36 @@ def _clamp_pct(x: float) -> float:
 class AMS2Plugin(TelemetryPlugin):
     id = "ams2"
     name = "Automobilista 2 (UDP/SMS)"
+    push = True
 
     def __init__(self, udp_port: int = 5606) -> None:
         self._udp_port = int(udp_port)
         self._receiver: Optional[LatestUDPReceiver] = None
+        self._last_tel = None
+        self._history: Optional[SampleRing] = None
 
     def open(self) -> None:
-        # abre receiver UDP
-        self._receiver = LatestUDPReceiver(host="0.0.0.0", port=self._udp_port)
-        self._receiver.start()
+        # UDP receiver: warm if the port was bound by an earlier open() / probe.
+        if SampleRing.default_capacity > 0:
+            self._history = SampleRing(_HISTORY_SIGNALS, getter=_history_sample)
+        rx = INGEST.acquire(LatestUDPReceiver, "0.0.0.0", self._udp_port)
+        rx.subscribe(sms.PACKET_TIMINGS, sms.PACKET_TIME_STATS)
+        rx.history = self._history
+        if self._notify is not None:
+            rx.on_packet = self._notify
+        self._receiver = rx
 
         # IMPORTANT:
-        # Only consider the plugin "open" after at least one packet arrives.
+        # Only consider the plugin "open" once live packets arrive.
         # Isso faz o --game auto funcionar e o --wait funcionar bem.
-        deadline = time.time() + 0.6  # ~600ms
-        while time.time() < deadline:
-            if self._receiver.get_latest() is not None:
+        # A warm port answers at once; a fresh one waits for its first packet.
+        deadline = rx.started_at + _FIRST_PACKET_WAIT
+        while True:
+            tel = rx.get_latest()
+            if tel is not None and time.time() - tel.ts <= _LIVE_MAX_AGE:
                 return
+            if time.monotonic() >= deadline:
+                break
             time.sleep(0.02)
 
         # No packets: close and report "simulator not available yet".
@@ -49,11 +85,17 @@ class AMS2Plugin(TelemetryPlugin):
             f"Enable UDP telemetry in AMS2 and match the port."
         )
 
+    def set_notify(self, notify: Optional[Callable[[], None]]) -> None:
+        self._notify = notify
+        if self._receiver is not None:
+            self._receiver.on_packet = notify
+
     def read_frame(self) -> Optional[Dict[str, Any]]:
         if self._receiver is None:
             raise RuntimeError("AMS2Plugin is not opened. Call open() first.")
 
         tel = self._receiver.get_latest()
+        self._last_tel = tel
         if tel is None:
             return None
 
@@ -61,7 +103,7 @@ class AMS2Plugin(TelemetryPlugin):
         age = now - float(tel.ts)
 
         # No fresh packets recently -> treat as "no data"
-        if age > 0.50:
+        if age > _LIVE_MAX_AGE:
             # No packets for too long -> force reopen
             if age > 2.0:
                 raise RuntimeError("AMS2 telemetry stale (no UDP packets). Reopen needed.")
@@ -77,11 +119,14 @@ class AMS2Plugin(TelemetryPlugin):
             "controls.brake_pct": _clamp_pct(float(tel.brake_pct)),
         }
 
+        # engine.rpm_pct is derived by the bridge (core/derived.py).
         rpm_max = int(getattr(tel, "max_rpm", 0) or 0)
         if 1000 <= rpm_max <= 25000:
             signals["engine.rpm_max"] = rpm_max
-            pct = (float(tel.rpm) / float(rpm_max)) * 100.0 if rpm_max else 0.0
-            signals["engine.rpm_pct"] = round(max(0.0, min(100.0, pct)), 1)
+
+        for key, temp in zip(_TYRE_SIGNALS, tel.tyre_temp_c):
+            signals[key] = temp
+        self._add_race_signals(signals, now)
 
         return {
             "v": "0.2",
@@ -90,10 +135,49 @@ class AMS2Plugin(TelemetryPlugin):
             "signals": signals,
         }
 
+    def _add_race_signals(self, signals: Dict[str, Any], now: float) -> None:
+        timings = self._receiver.packet(sms.PACKET_TIMINGS)
+        if timings is None or now - timings.ts > _RACE_DATA_MAX_AGE:
+            return
+        t = timings.data
+        me = t["local_participant_index"]
+        participants = t["participants"]
+        signals["race.participants"] = len(participants)
+        if me >= len(participants):
+            return
+        info = participants[me]
+        signals["race.position"] = info["race_position"]
+        signals["race.lap"] = info["current_lap"]
+        signals["race.lap_time_s"] = round(max(0.0, info["current_time"]), 3)
+
+        stats = self._receiver.packet(sms.PACKET_TIME_STATS)
+        if stats is None or now - stats.ts > _RACE_DATA_MAX_AGE:
+            return
+        mine = stats.data["participants"][me] if me < 32 else None
+        if mine is None:
+            return
+        # The game sends -1 / 0 until a lap is set.
+        if mine["last_lap_time"] > 0:
+            signals["race.last_lap_s"] = round(mine["last_lap_time"], 3)
+        if mine["fastest_lap_time"] > 0:
+            signals["race.best_lap_s"] = round(mine["fastest_lap_time"], 3)
+
     def capabilities(self) -> Dict[str, Any]:
         return CAPABILITIES_AMS2
 
+    def stats(self) -> Optional[Dict[str, Any]]:
+        return self._receiver.stats() if self._receiver is not None else None
+
+    def history(self) -> Optional[SampleRing]:
+        return self._history
+
+    def timing(self):
+        if self._receiver is None or self._last_tel is None:
+            return None
+        return self._receiver.timing_for(self._last_tel)
+
     def close(self) -> None:
         if self._receiver is not None:
-            self._receiver.stop()
-            self._receiver = None
\ No newline at end of file
+            INGEST.release(self._receiver)
+            self._receiver = None
+        self._history = None
\ No newline at end of file
@@ -1,15 +1,18 @@
 """UDP receiver for SMS/AMS2 telemetry.
 
-Keeps the latest valid packet so callers can poll without blocking."""
+Keeps the latest valid car physics packet (decoded eagerly, it drives every frame) plus, for
+subscribed packet types, the latest complete packet of each type (decoded lazily, see sms.py)
+so callers can poll without blocking."""
 # ssp_bridge/plugins/ams2/receiver.py
 from __future__ import annotations
 
-import socket
 import struct
-import threading
-import time
-from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Callable, Dict, Hashable, Iterable, NamedTuple, Optional, Tuple
+
+from ssp_bridge.core.history import SampleRing
+from ssp_bridge.core.layout import Field, PacketLayout
+from ssp_bridge.core.udp import BatchUDPReceiver
+from ssp_bridge.plugins.ams2 import sms
 
 
 # PacketBase (12 bytes):
@@ -19,16 +22,13 @@ from typing import Optional
 # uint8  mPartialPacketNumber
 # uint8  mPacketType
 # uint8  mPacketVersion
-_PACKET_BASE_FMT = "<II4B"
 _PACKET_BASE_SIZE = 12
+_OFF_PACKET_TYPE = 10
+_packet_number = struct.Struct("<I").unpack_from
 
 # eCarPhysics (Telemetry) = packetType 0 (SMS UDP)
 _PACKET_TYPE_CAR_PHYSICS = 0
 
-# sTelemetryData size in the Patch5 header:
-# static const unsigned int sPacketSize = 559;
-_TELEMETRY_PACKET_SIZE = 559
-
 # Offsets (bytes) inside sTelemetryData (Patch5)
 # (ver SMS_UDP_Definitions.hpp)
 _OFF_BRAKE = 29          # uint8
@@ -37,10 +37,7 @@ _OFF_SPEED = 36          # float
 _OFF_RPM = 40            # uint16
 _OFF_GEAR_NUM_GEARS = 45 # uint8
 _OFF_MAX_RPM = 42        # uint16 # uint8
-
-
-def _now_ts() -> float:
-    return time.time()
+_OFF_TYRE_TEMP = 176     # uint8[4], Celsius
 
 
 def _u8_to_pct(x: int) -> float:
@@ -52,28 +49,8 @@ def _u8_to_pct(x: int) -> float:
     return (x / 255.0) * 100.0
 
 
-def _decode_gear(gear_num_gears: int) -> tuple[int, int]:
-    """
-    sGearNumGears is a uint8 that is typically bit-packed.
-    Common (SMS/PCARS) encoding: low nibble = gear, high nibble = num gears.
-    - gear 0 => N
-    - gear 15 => R (sentinela comum)
-    """
-    gear_raw = gear_num_gears & 0x0F
-    num_gears = (gear_num_gears >> 4) & 0x0F
-
-    if gear_raw == 0:
-        gear = 0
-    elif gear_raw == 15:
-        gear = -1
-    else:
-        gear = int(gear_raw)
-
-    return gear, int(num_gears)
-
-
-@dataclass(frozen=True)
-class AMS2Telemetry:
+class AMS2Telemetry(NamedTuple):
+    # Immutable like a frozen dataclass, but much cheaper to build once per packet.
     ts: float
     rpm: int
     max_rpm: int
@@ -82,108 +59,118 @@ class AMS2Telemetry:
     brake_pct: float
     gear: int
     num_gears: int
+    tyre_temp_c: Tuple[int, int, int, int]  # FL, FR, RL, RR
 
 
-class LatestUDPReceiver:
-    """
-    Simple receiver: always keeps the latest valid eCarPhysics packet.
-    """
+def _gear_from_packed(gear_num_gears: int) -> int:
+    # sGearNumGears packs the gear in the low nibble (0 = N, 15 = R) and the
+    # number of gears in the high nibble.
+    gear_raw = gear_num_gears & 0x0F
+    return -1 if gear_raw == 15 else gear_raw
 
-    def __init__(self, host: str = "0.0.0.0", port: int = 5606) -> None:
-        self._host = host
-        self._port = int(port)
 
-        self._sock: Optional[socket.socket] = None
-        self._thread: Optional[threading.Thread] = None
-        self._stop = threading.Event()
+def _num_gears_from_packed(gear_num_gears: int) -> int:
+    return (gear_num_gears >> 4) & 0x0F
 
-        self._lock = threading.Lock()
-        self._latest: Optional[AMS2Telemetry] = None
 
-    def start(self) -> None:
-        if self._thread and self._thread.is_alive():
-            return
+# sTelemetryData fields used by the bridge (offsets above, Patch5).
+_CAR_PHYSICS = PacketLayout(
+    [
+        Field("brake_pct", _OFF_BRAKE, "B", _u8_to_pct),
+        Field("throttle_pct", _OFF_THROTTLE, "B", _u8_to_pct),
+        Field("speed_ms", _OFF_SPEED, "f"),
+        Field("rpm", _OFF_RPM, "H"),
+        Field("max_rpm", _OFF_MAX_RPM, "H"),
+        Field("gear", _OFF_GEAR_NUM_GEARS, "B", _gear_from_packed),
+        Field("num_gears", _OFF_GEAR_NUM_GEARS, "B", _num_gears_from_packed),
+        Field("tyre_temp_c", _OFF_TYRE_TEMP, "4B"),
+    ],
+    name="ams2.car_physics",
+)
+_decode_car_physics = _CAR_PHYSICS.compile(AMS2Telemetry, extra=("ts",))
+
+
+class LatestUDPReceiver(BatchUDPReceiver):
+    """
+    Keeps the latest valid eCarPhysics packet, plus the latest complete packet of every
+    subscribed type (see subscribe()).
 
-        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self._sock.bind((self._host, self._port))
-        # timeout pequeno pra conseguir parar limpo
-        self._sock.settimeout(0.2)
-
-        self._stop.clear()
-        self._thread = threading.Thread(target=self._run, name="ams2-udp-receiver", daemon=True)
-        self._thread.start()
-
-    def stop(self) -> None:
-        self._stop.set()
-        if self._thread:
-            self._thread.join(timeout=1.0)
-        if self._sock:
-            try:
-                self._sock.close()
-            except Exception:
-                pass
-        self._sock = None
-        self._thread = None
+    Other packet types are dropped on the header byte, before any copy or decoding.
+    mPacketNumber (counts every packet the game sends) feeds the link stats; rate and jitter
+    follow the car physics stream.
+    """
+
+    name = "ams2"
+    link_kind = _PACKET_TYPE_CAR_PHYSICS
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 5606,
+        on_packet: Optional[Callable[[], None]] = None,
+        packet_types: Iterable[int] = (),
+        history: Optional[SampleRing] = None,
+    ) -> None:
+        super().__init__(host, port, on_packet, history=history)
+        self._types = frozenset(packet_types)
+        self._packets: Dict[int, sms.SMSPacket] = {}
+        self._assembler = sms.PartialAssembler()
+        self._physics: Optional[sms.SMSPacket] = None
+
+    def subscribe(self, *packet_types: int) -> None:
+        """Also keep these packet types (sms.PACKET_*); car physics is always decoded."""
+        self._types = self._types | frozenset(packet_types)
+
+    def sequence(self, view: memoryview) -> Optional[int]:
+        return _packet_number(view)[0] if len(view) >= _PACKET_BASE_SIZE else None
+
+    def classify(self, view: memoryview) -> Optional[Hashable]:
+        # PacketBase.mPacketType. Some setups send larger/smaller packets than the
+        # Patch5 559 bytes; accept anything that covers the fields we use.
+        n = len(view)
+        if n < sms.HEADER_SIZE:
+            return None
+        packet_type = view[_OFF_PACKET_TYPE]
+        if packet_type == _PACKET_TYPE_CAR_PHYSICS:
+            return _PACKET_TYPE_CAR_PHYSICS if n >= _CAR_PHYSICS.size else None
+        if packet_type not in self._types or n < sms.MIN_SIZES.get(packet_type, sms.HEADER_SIZE):
+            return None
+        if view[sms.OFF_PARTIAL_COUNT] > 1:
+            # Keep every part of a multi-part packet, not just the newest one of the batch.
+            return packet_type, view[sms.OFF_PARTIAL_INDEX]
+        return packet_type
+
+    def decode(self, kind: Hashable, view: memoryview, ts: float) -> Any:
+        if kind == _PACKET_TYPE_CAR_PHYSICS:
+            if _PACKET_TYPE_CAR_PHYSICS in self._types:
+                # Full sTelemetryData on demand; published together with the fast decode below.
+                self._physics = sms.SMSPacket.from_view(view, ts)
+            return _decode_car_physics(view, ts)
+        return sms.SMSPacket.from_view(view, ts)
+
+    def publish(self, kind: Hashable, value: Any) -> None:
+        if kind == _PACKET_TYPE_CAR_PHYSICS:
+            self._latest = value
+            if self._physics is not None:
+                self._packets[_PACKET_TYPE_CAR_PHYSICS] = self._physics
+                self._physics = None
+            return
+        packet = self._assembler.add(value)
+        if packet is not None:
+            self._packets[sms.packet_key(packet.type, packet.parts[0])] = packet
 
     def get_latest(self) -> Optional[AMS2Telemetry]:
+        return super().get_latest()
+
+    def packet(self, packet_type: int) -> Optional[sms.SMSPacket]:
+        """Latest complete packet of a subscribed type (sms.PACKET_*), or None."""
+        super().get_latest()  # drains the socket while the asyncio transport is not attached
+        with self._lock:
+            return self._packets.get(packet_type)
+
+    def stats(self) -> Dict[str, Any]:
+        out = super().stats()
+        out["incomplete"] = self._assembler.incomplete
         with self._lock:
-            return self._latest
-
-    def _run(self) -> None:
-        assert self._sock is not None
-
-        while not self._stop.is_set():
-            try:
-                data, _addr = self._sock.recvfrom(2048)
-            except socket.timeout:
-                continue
-            except OSError:
-                break
-
-            if len(data) < _PACKET_BASE_SIZE:
-                continue
-
-            # Lê PacketBase
-            try:
-                mPacketNumber, mCategoryPacketNumber, mPartialPacketIndex, mPartialPacketNumber, mPacketType, mPacketVersion = struct.unpack_from(
-                    _PACKET_BASE_FMT, data, 0
-                )
-            except struct.error:
-                continue
-
-            if mPacketType != _PACKET_TYPE_CAR_PHYSICS:
-                continue
-
-            # Require a minimum size to read the fields we use.
-            # (Patch5 header states 559 bytes for sTelemetryData).
-            if len(data) < _TELEMETRY_PACKET_SIZE:
-                # Some setups may send larger/smaller packets; if offsets are missing, ignore.
-                if len(data) < (_OFF_GEAR_NUM_GEARS + 1):
-                    continue
-
-            try:
-                brake_u8 = struct.unpack_from("<B", data, _OFF_BRAKE)[0]
-                throttle_u8 = struct.unpack_from("<B", data, _OFF_THROTTLE)[0]
-                speed_ms = struct.unpack_from("<f", data, _OFF_SPEED)[0]
-                rpm = struct.unpack_from("<H", data, _OFF_RPM)[0]
-                gear_num_gears = struct.unpack_from("<B", data, _OFF_GEAR_NUM_GEARS)[0]
-                max_rpm = struct.unpack_from("<H", data, _OFF_MAX_RPM)[0]
-            except struct.error:
-                continue
-
-            gear, num_gears = _decode_gear(gear_num_gears)
-
-            tel = AMS2Telemetry(
-            ts=_now_ts(),
-            rpm=int(rpm),
-            max_rpm=int(max_rpm),
-            speed_ms=float(speed_ms),
-            throttle_pct=_u8_to_pct(int(throttle_u8)),
-            brake_pct=_u8_to_pct(int(brake_u8)),
-            gear=int(gear),
-            num_gears=int(num_gears),
-        )
-
-            with self._lock:
-                self._latest = tel
\ No newline at end of file
+            out["types"] = sorted(sms.PACKET_TYPE_NAMES.get(t, str(t)) for t in self._packets)
+        return out
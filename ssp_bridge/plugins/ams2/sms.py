@@ -0,0 +1,489 @@
+"""SMS UDP protocol (Project CARS 2 / AMS2 "PC2" format, SMS_UDP_Definitions.hpp).
+
+Every packet starts with PacketBase; mPacketType selects the payload:
+
+    0 car physics        sTelemetryData (559)
+    1 race definition    sRaceData (308)
+    2 participants       sParticipantsData (1136, 16 per part)
+    3 timings            sTimingsData (1063)
+    4 game state         sGameStateData (24)
+    5 weather state      (not sent by the game)
+    6 vehicle names      (not sent by the game)
+    7 time stats         sTimeStatsData (1040)
+    8 participant vehicle names (1164, 16 per part) / vehicle class names (1452, 60 per part)
+
+Data that does not fit one datagram is split into parts (mPartialPacketIndex of
+mPartialPacketNumber); PartialAssembler joins them. SMSPacket keeps the raw parts and decodes
+them on first access only, so packet types nobody reads are never unpacked.
+
+Decoded packets are dicts with snake_case field names (SMS names without the `s` prefix),
+values in the units the game sends. Bit-packed bytes are split (gear/num_gears, race position/
+active flag...) and C strings are decoded."""
+# ssp_bridge/plugins/ams2/sms.py
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ssp_bridge.core.layout import Field, PacketLayout
+
+PACKET_CAR_PHYSICS = 0
+PACKET_RACE_DEFINITION = 1
+PACKET_PARTICIPANTS = 2
+PACKET_TIMINGS = 3
+PACKET_GAME_STATE = 4
+PACKET_WEATHER_STATE = 5
+PACKET_VEHICLE_NAMES = 6
+PACKET_TIME_STATS = 7
+PACKET_PARTICIPANT_VEHICLE_NAMES = 8
+# Store key for the vehicle class names variant of type 8 (told apart by size).
+PACKET_VEHICLE_CLASS_NAMES = 0x108
+
+PACKET_TYPE_NAMES = {
+    PACKET_CAR_PHYSICS: "car_physics",
+    PACKET_RACE_DEFINITION: "race_definition",
+    PACKET_PARTICIPANTS: "participants",
+    PACKET_TIMINGS: "timings",
+    PACKET_GAME_STATE: "game_state",
+    PACKET_WEATHER_STATE: "weather_state",
+    PACKET_VEHICLE_NAMES: "vehicle_names",
+    PACKET_TIME_STATS: "time_stats",
+    PACKET_PARTICIPANT_VEHICLE_NAMES: "participant_vehicle_names",
+    PACKET_VEHICLE_CLASS_NAMES: "vehicle_class_names",
+}
+
+# PacketBase (12 bytes): uint32 mPacketNumber, uint32 mCategoryPacketNumber,
+# uint8 mPartialPacketIndex, uint8 mPartialPacketNumber, uint8 mPacketType, uint8 mPacketVersion
+HEADER_SIZE = 12
+OFF_PARTIAL_INDEX = 8
+OFF_PARTIAL_COUNT = 9
+OFF_PACKET_TYPE = 10
+
+_HEADER = PacketLayout(
+    [
+        Field("number", 0, "I"),
+        Field("category", 4, "I"),
+        Field("index", 8, "B"),
+        Field("count", 9, "B"),
+        Field("type", 10, "B"),
+        Field("version", 11, "B"),
+    ],
+    name="sms.header",
+)
+_unpack_header = _HEADER.struct.unpack_from
+
+
+def _cstr(raw: bytes) -> str:
+    return raw.split(b"\x00", 1)[0].decode("utf-8", "replace")
+
+
+def _gear(packed: int) -> int:
+    # Low nibble: 0 = neutral, 15 = reverse.
+    gear = packed & 0x0F
+    return -1 if gear == 15 else gear
+
+
+def _fields(spec: Sequence[Tuple[str, int, str]], transforms: Optional[Dict[str, Callable[[Any], Any]]] = None) -> List[Field]:
+    transforms = transforms or {}
+    return [Field(name, offset, fmt, transforms.get(name)) for name, offset, fmt in spec]
+
+
+# --- 0: sTelemetryData (packed, 559 bytes) ---
+CAR_PHYSICS = PacketLayout(
+    _fields(
+        [
+            ("viewed_participant_index", 12, "b"),
+            ("unfiltered_throttle", 13, "B"),
+            ("unfiltered_brake", 14, "B"),
+            ("unfiltered_steering", 15, "b"),
+            ("unfiltered_clutch", 16, "B"),
+            ("car_flags", 17, "B"),
+            ("oil_temp_celsius", 18, "h"),
+            ("oil_pressure_kpa", 20, "H"),
+            ("water_temp_celsius", 22, "h"),
+            ("water_pressure_kpa", 24, "H"),
+            ("fuel_pressure_kpa", 26, "H"),
+            ("fuel_capacity", 28, "B"),
+            ("brake", 29, "B"),
+            ("throttle", 30, "B"),
+            ("clutch", 31, "B"),
+            ("fuel_level", 32, "f"),
+            ("speed", 36, "f"),
+            ("rpm", 40, "H"),
+            ("max_rpm", 42, "H"),
+            ("steering", 44, "b"),
+            ("gear", 45, "B"),
+            ("num_gears", 45, "B"),
+            ("boost_amount", 46, "B"),
+            ("crash_state", 47, "B"),
+            ("odometer_km", 48, "f"),
+            ("orientation", 52, "3f"),
+            ("local_velocity", 64, "3f"),
+            ("world_velocity", 76, "3f"),
+            ("angular_velocity", 88, "3f"),
+            ("local_acceleration", 100, "3f"),
+            ("world_acceleration", 112, "3f"),
+            ("extents_centre", 124, "3f"),
+            ("tyre_flags", 136, "4B"),
+            ("terrain", 140, "4B"),
+            ("tyre_y", 144, "4f"),
+            ("tyre_rps", 160, "4f"),
+            ("tyre_temp", 176, "4B"),
+            ("tyre_height_above_ground", 180, "4f"),
+            ("tyre_wear", 196, "4B"),
+            ("brake_damage", 200, "4B"),
+            ("suspension_damage", 204, "4B"),
+            ("brake_temp_celsius", 208, "4h"),
+            ("tyre_tread_temp", 216, "4H"),
+            ("tyre_layer_temp", 224, "4H"),
+            ("tyre_carcass_temp", 232, "4H"),
+            ("tyre_rim_temp", 240, "4H"),
+            ("tyre_internal_air_temp", 248, "4H"),
+            ("tyre_temp_left", 256, "4H"),
+            ("tyre_temp_center", 264, "4H"),
+            ("tyre_temp_right", 272, "4H"),
+            ("wheel_local_position_y", 280, "4f"),
+            ("ride_height", 296, "4f"),
+            ("suspension_travel", 312, "4f"),
+            ("suspension_velocity", 328, "4f"),
+            ("suspension_ride_height", 344, "4H"),
+            ("air_pressure", 352, "4H"),
+            ("engine_speed", 360, "f"),
+            ("engine_torque", 364, "f"),
+            ("wings", 368, "2B"),
+            ("hand_brake", 370, "B"),
+            ("aero_damage", 371, "B"),
+            ("engine_damage", 372, "B"),
+            ("joy_pad0", 373, "I"),
+            ("d_pad", 377, "B"),
+            ("tyre_compound_fl", 378, "40s"),
+            ("tyre_compound_fr", 418, "40s"),
+            ("tyre_compound_rl", 458, "40s"),
+            ("tyre_compound_rr", 498, "40s"),
+            ("turbo_boost_pressure", 538, "f"),
+            ("full_position", 542, "3f"),
+            ("brake_bias", 554, "B"),
+            ("tick_count", 555, "I"),
+        ],
+        {
+            "gear": _gear,
+            "num_gears": lambda b: (b >> 4) & 0x0F,
+            "tyre_compound_fl": _cstr,
+            "tyre_compound_fr": _cstr,
+            "tyre_compound_rl": _cstr,
+            "tyre_compound_rr": _cstr,
+        },
+    ),
+    size=559,
+    name="sms.car_physics",
+)
+
+# --- 1: sRaceData ---
+RACE_DEFINITION = PacketLayout(
+    _fields(
+        [
+            ("world_fastest_lap_time", 12, "f"),
+            ("personal_fastest_lap_time", 16, "f"),
+            ("personal_fastest_sector1_time", 20, "f"),
+            ("personal_fastest_sector2_time", 24, "f"),
+            ("personal_fastest_sector3_time", 28, "f"),
+            ("world_fastest_sector1_time", 32, "f"),
+            ("world_fastest_sector2_time", 36, "f"),
+            ("world_fastest_sector3_time", 40, "f"),
+            ("track_length", 44, "f"),
+            ("track_location", 48, "64s"),
+            ("track_variation", 112, "64s"),
+            ("translated_track_location", 176, "64s"),
+            ("translated_track_variation", 240, "64s"),
+            ("laps_time_in_event", 304, "H"),  # top bit set: minutes of a timed event
+            ("enforced_pit_stop_lap", 306, "b"),
+        ],
+        {
+            "track_location": _cstr,
+            "track_variation": _cstr,
+            "translated_track_location": _cstr,
+            "translated_track_variation": _cstr,
+        },
+    ),
+    name="sms.race_definition",
+)
+
+# --- 2: sParticipantsData (16 names per part) ---
+PARTICIPANTS = PacketLayout(
+    [
+        Field("participants_changed_timestamp", 12, "I"),
+        Field("names", 16, "64s" * 16, lambda names: [_cstr(n) for n in names]),
+        Field("nationality", 1040, "16I"),
+        Field("index", 1104, "16H"),
+    ],
+    name="sms.participants",
+)
+
+# --- 3: sTimingsData (32 x sParticipantInfo) ---
+PARTICIPANT_INFO_SIZE = 32
+PARTICIPANT_INFO = PacketLayout(
+    _fields(
+        [
+            ("world_position", 0, "3h"),
+            ("orientation", 6, "3h"),
+            ("current_lap_distance", 12, "H"),
+            ("race_position", 14, "B"),
+            ("active", 14, "B"),
+            ("sector", 15, "B"),
+            ("highest_flag", 16, "B"),
+            ("pit_mode_schedule", 17, "B"),
+            ("car_index", 18, "H"),
+            ("human", 18, "H"),
+            ("race_state", 20, "B"),
+            ("lap_invalidated", 20, "B"),
+            ("current_lap", 21, "B"),
+            ("current_time", 22, "f"),
+            ("current_sector_time", 26, "f"),
+            ("mp_participant_index", 30, "H"),
+        ],
+        {
+            "race_position": lambda b: b & 0x7F,
+            "active": lambda b: bool(b & 0x80),
+            "sector": lambda b: b & 0x07,
+            "car_index": lambda v: v & 0x7FFF,
+            "human": lambda v: bool(v & 0x8000),
+            "race_state": lambda b: b & 0x7F,
+            "lap_invalidated": lambda b: bool(b & 0x80),
+        },
+    ),
+    name="sms.participant_info",
+)
+TIMINGS = PacketLayout(
+    _fields(
+        [
+            ("num_participants", 12, "b"),
+            ("participants_changed_timestamp", 13, "I"),
+            ("event_time_remaining", 17, "f"),
+            ("split_time_ahead", 21, "f"),
+            ("split_time_behind", 25, "f"),
+            ("split_time", 29, "f"),
+            ("local_participant_index", 1057, "H"),
+            ("tick_count", 1059, "I"),
+        ]
+    ),
+    name="sms.timings",
+)
+_OFF_TIMINGS_PARTICIPANTS = 33
+
+# --- 4: sGameStateData ---
+GAME_STATE = PacketLayout(
+    _fields(
+        [
+            ("build_version_number", 12, "H"),
+            ("game_state", 14, "B"),
+            ("session_state", 14, "B"),
+            ("ambient_temperature", 15, "b"),
+            ("track_temperature", 16, "b"),
+            ("rain_density", 17, "B"),
+            ("snow_density", 18, "B"),
+            ("wind_speed", 19, "b"),
+            ("wind_direction_x", 20, "b"),
+            ("wind_direction_y", 21, "b"),
+        ],
+        {"game_state": lambda b: b & 0x07, "session_state": lambda b: b >> 4},
+    ),
+    name="sms.game_state",
+)
+
+# --- 7: sTimeStatsData (32 x sParticipantStatsInfo) ---
+PARTICIPANT_STATS_SIZE = 32
+PARTICIPANT_STATS = PacketLayout(
+    _fields(
+        [
+            ("fastest_lap_time", 0, "f"),
+            ("last_lap_time", 4, "f"),
+            ("last_sector_time", 8, "f"),
+            ("fastest_sector1_time", 12, "f"),
+            ("fastest_sector2_time", 16, "f"),
+            ("fastest_sector3_time", 20, "f"),
+            ("participant_online_rep", 24, "I"),
+            ("mp_participant_index", 28, "H"),
+        ]
+    ),
+    name="sms.participant_stats",
+)
+_OFF_TIME_STATS = 16
+
+# --- 8: sParticipantVehicleNamesData (16 x 72) / sVehicleClassNamesData (60 x 24) ---
+VEHICLE_INFO_SIZE = 72
+VEHICLE_INFO = PacketLayout(
+    [Field("index", 0, "H"), Field("class_index", 4, "I"), Field("name", 8, "64s", _cstr)],
+    name="sms.vehicle_info",
+)
+CLASS_INFO_SIZE = 24
+CLASS_INFO = PacketLayout(
+    [Field("class_index", 0, "I"), Field("name", 4, "20s", _cstr)],
+    name="sms.class_info",
+)
+VEHICLE_NAMES_SIZE = HEADER_SIZE + 16 * VEHICLE_INFO_SIZE  # 1164
+CLASS_NAMES_SIZE = HEADER_SIZE + 60 * CLASS_INFO_SIZE      # 1452
+
+# Minimum datagram size per type (types 5/6 are never sent: header only).
+MIN_SIZES = {
+    PACKET_CAR_PHYSICS: CAR_PHYSICS.size,
+    PACKET_RACE_DEFINITION: RACE_DEFINITION.size,
+    PACKET_PARTICIPANTS: PARTICIPANTS.size,
+    PACKET_TIMINGS: TIMINGS.size,
+    PACKET_GAME_STATE: GAME_STATE.size,
+    PACKET_WEATHER_STATE: HEADER_SIZE,
+    PACKET_VEHICLE_NAMES: HEADER_SIZE,
+    PACKET_TIME_STATS: _OFF_TIME_STATS + 32 * PARTICIPANT_STATS_SIZE,
+    PACKET_PARTICIPANT_VEHICLE_NAMES: VEHICLE_NAMES_SIZE,
+}
+
+_decode_car_physics = CAR_PHYSICS.compile()
+_decode_race_definition = RACE_DEFINITION.compile()
+_decode_participants_part = PARTICIPANTS.compile()
+_decode_participant_info = PARTICIPANT_INFO.compile()
+_decode_timings = TIMINGS.compile()
+_decode_game_state = GAME_STATE.compile()
+_decode_participant_stats = PARTICIPANT_STATS.compile()
+_decode_vehicle_info = VEHICLE_INFO.compile()
+_decode_class_info = CLASS_INFO.compile()
+
+
+def _decode_participants(parts: Sequence[bytes]) -> Dict[str, Any]:
+    participants = []
+    stamp = 0
+    for data in parts:
+        part = _decode_participants_part(data)
+        stamp = part["participants_changed_timestamp"]
+        for name, nationality, index in zip(part["names"], part["nationality"], part["index"]):
+            if name:
+                participants.append({"index": index, "name": name, "nationality": nationality})
+    return {"participants_changed_timestamp": stamp, "participants": participants}
+
+
+def _decode_timings_packet(parts: Sequence[bytes]) -> Dict[str, Any]:
+    data = parts[-1]
+    out = _decode_timings(data)
+    n = max(0, min(out["num_participants"], 32))
+    out["participants"] = [
+        _decode_participant_info(data, offset=_OFF_TIMINGS_PARTICIPANTS + i * PARTICIPANT_INFO_SIZE)
+        for i in range(n)
+    ]
+    return out
+
+
+def _decode_time_stats(parts: Sequence[bytes]) -> Dict[str, Any]:
+    data = parts[-1]
+    return {
+        "participants_changed_timestamp": int.from_bytes(data[12:16], "little"),
+        "participants": [
+            _decode_participant_stats(data, offset=_OFF_TIME_STATS + i * PARTICIPANT_STATS_SIZE)
+            for i in range(32)
+        ],
+    }
+
+
+def _decode_vehicle_names(parts: Sequence[bytes]) -> Dict[str, Any]:
+    vehicles: List[Dict[str, Any]] = []
+    classes: List[Dict[str, Any]] = []
+    for data in parts:
+        if len(data) >= CLASS_NAMES_SIZE:
+            entries = (_decode_class_info(data, offset=HEADER_SIZE + i * CLASS_INFO_SIZE) for i in range(60))
+            classes.extend(e for e in entries if e["name"])
+        else:
+            entries = (_decode_vehicle_info(data, offset=HEADER_SIZE + i * VEHICLE_INFO_SIZE) for i in range(16))
+            vehicles.extend(e for e in entries if e["name"])
+    out: Dict[str, Any] = {}
+    if vehicles:
+        out["vehicles"] = vehicles
+    if classes:
+        out["classes"] = classes
+    return out
+
+
+_DECODERS: Dict[int, Callable[[Sequence[bytes]], Dict[str, Any]]] = {
+    PACKET_CAR_PHYSICS: lambda parts: _decode_car_physics(parts[-1]),
+    PACKET_RACE_DEFINITION: lambda parts: _decode_race_definition(parts[-1]),
+    PACKET_PARTICIPANTS: _decode_participants,
+    PACKET_TIMINGS: _decode_timings_packet,
+    PACKET_GAME_STATE: lambda parts: _decode_game_state(parts[-1]),
+    PACKET_TIME_STATS: _decode_time_stats,
+    PACKET_PARTICIPANT_VEHICLE_NAMES: _decode_vehicle_names,
+}
+
+
+def decode_packet(packet_type: int, parts: Sequence[bytes]) -> Dict[str, Any]:
+    """Decode the payload of a (reassembled) packet; unknown/unsent types decode to {}."""
+    decoder = _DECODERS.get(packet_type)
+    return decoder(parts) if decoder is not None else {}
+
+
+def packet_key(packet_type: int, data: bytes) -> int:
+    """Store key: vehicle class names share type 8 with vehicle names but are kept apart."""
+    if packet_type == PACKET_PARTICIPANT_VEHICLE_NAMES and len(data) >= CLASS_NAMES_SIZE:
+        return PACKET_VEHICLE_CLASS_NAMES
+    return packet_type
+
+
+class SMSPacket:
+    """A received packet (all parts). `data` decodes on first access and is cached."""
+
+    __slots__ = ("type", "number", "category", "index", "count", "version", "ts", "parts", "_data")
+
+    def __init__(self, header: Tuple[int, ...], ts: float, parts: Tuple[bytes, ...]) -> None:
+        self.number, self.category, self.index, self.count, self.type, self.version = header
+        self.ts = ts
+        self.parts = parts
+        self._data: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_view(cls, view, ts: float) -> "SMSPacket":
+        data = bytes(view)  # receive buffers are reused: keep a copy
+        return cls(_unpack_header(data), ts, (data,))
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = decode_packet(self.type, self.parts)
+        return self._data
+
+
+class PartialAssembler:
+    """
+    Joins multi-part packets. A packet is complete once parts 1..N of one category packet
+    arrived (mCategoryPacketNumber either repeats for every part or advances with the
+    part index; both are accepted). A new first part, or a part that does not follow,
+    restarts the assembly and counts the abandoned one as incomplete.
+    """
+
+    def __init__(self) -> None:
+        self._pending: Dict[int, Tuple[int, int, Dict[int, SMSPacket]]] = {}
+        self.incomplete = 0
+
+    def add(self, part: SMSPacket) -> Optional[SMSPacket]:
+        if part.count <= 1:
+            return part
+
+        key = packet_key(part.type, part.parts[0])
+        pending = self._pending.get(key)
+        if pending is not None:
+            category, count, parts = pending
+            follows = part.category in (category, category + part.index - 1)
+            if not follows or count != part.count or part.index in parts:
+                self.incomplete += 1
+                pending = None
+        if pending is None:
+            if part.index != 1:
+                # Joined mid-packet (or lost its first part): wait for the next first part.
+                self._pending.pop(key, None)
+                return None
+            pending = (part.category, part.count, {})
+            self._pending[key] = pending
+
+        parts = pending[2]
+        parts[part.index] = part
+        if len(parts) < part.count:
+            return None
+
+        del self._pending[key]
+        ordered = tuple(parts[i].parts[0] for i in sorted(parts))
+        first = parts[min(parts)]
+        header = (part.number, first.category, 1, part.count, part.type, part.version)
+        return SMSPacket(header, part.ts, ordered)
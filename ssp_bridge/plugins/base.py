@@ -4,7 +4,9 @@ Defines the minimal interface required by the runtime and auto-detect logic."""
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ssp_bridge.core.history import SampleRing
 
 
 class TelemetryPlugin(ABC):
@@ -19,10 +21,21 @@ class TelemetryPlugin(ABC):
         It should raise only on hard failure / stale mapping that requires reopen.
       - capabilities() returns a JSON-serializable capabilities dict
       - close() releases resources safely
+
+    Optional pacing hooks (used by the runtime to avoid busy polling):
+      - push-based plugins set `push = True` and call the set_notify() callback
+        whenever fresh data arrives (from any thread)
+      - pull-based plugins may expose a raw packet counter via packet_id()
+
+    Finite sources (session replay) return True from finished() once exhausted;
+    the runtime then stops instead of waiting for the simulator to come back.
     """
 
     id: str = "unknown"
     name: str = "Unknown Plugin"
+    push: bool = False
+
+    _notify: Optional[Callable[[], None]] = None
 
     @abstractmethod
     def open(self) -> None:
@@ -38,4 +51,34 @@ class TelemetryPlugin(ABC):
 
     @abstractmethod
     def close(self) -> None:
-        ...
\ No newline at end of file
+        ...
+
+    def set_notify(self, notify: Optional[Callable[[], None]]) -> None:
+        """Register a thread-safe callback fired when fresh data arrives."""
+        self._notify = notify
+
+    def packet_id(self) -> Optional[int]:
+        """Latest raw packet counter seen by the plugin, or None if not tracked."""
+        return None
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """Ingest counters (packets/s, filtered, superseded...) when the plugin tracks them."""
+        return None
+
+    def timing(self) -> Optional[Tuple[Optional[float], float, float]]:
+        """
+        perf_counter stamps (kernel receive or None, receive, decoded) of the data behind the
+        last read_frame(), for latency tracking; None when the plugin does not track them.
+        """
+        return None
+
+    def history(self) -> Optional[SampleRing]:
+        """
+        Ring of every received sample, keyed by signal (push plugins that receive faster than
+        frames are emitted); the runtime aggregates it per emitted frame. None if not kept.
+        """
+        return None
+
+    def finished(self) -> bool:
+        """True when a finite source has nothing left to play."""
+        return False
@@ -4,10 +4,19 @@ import time
 
 from ssp_bridge.plugins.base import TelemetryPlugin
 from ssp_bridge.core.capabilities import CAPABILITIES_AC  # reuse base set shape
+from ssp_bridge.core.history import SampleRing
+from ssp_bridge.core.ingest import INGEST
 from ssp_bridge.core.proc import ProcessWatch
 
 from .receiver import LatestOutGaugeReceiver
 
+# Kept for every OutGauge packet (not just the one a frame is built from).
+_HISTORY_SIGNALS = ("engine.rpm", "vehicle.speed_kmh", "controls.throttle_pct", "controls.brake_pct")
+
+
+def _history_sample(tel) -> tuple:
+    return tel.rpm, max(tel.speed_ms * 3.6, 0.0), tel.throttle_pct, tel.brake_pct
+
 
 class BeamNGPlugin(TelemetryPlugin):
     """BeamNG.drive telemetry plugin (official OutGauge UDP).
@@ -20,6 +29,7 @@ class BeamNGPlugin(TelemetryPlugin):
 
     id = "beamng"
     name = "BeamNG.drive"
+    push = True
 
     def __init__(self) -> None:
         # BeamNG executable is commonly BeamNG.drive.x64.exe on Windows
@@ -29,11 +39,16 @@ class BeamNGPlugin(TelemetryPlugin):
             miss_threshold=3,
         )
 
-        # OutGauge receiver (BeamNG configurable; we listen on port 4444 by default)
-        self._rx = LatestOutGaugeReceiver(host="0.0.0.0", port=4444)
+        # OutGauge receiver (BeamNG configurable; we listen on port 4444 by default).
+        # Acquired from the process-wide ingest in open(); the port stays bound after close().
+        self._port = 4444
+        self._rx: LatestOutGaugeReceiver | None = None
+        self._history: SampleRing | None = None
+        self._last_tel = None
 
         # If we don't receive packets for a bit, treat telemetry as stale.
         self._stale_after_s = 0.6
+        self._first_packet_wait = 0.6
 
         # Bridge-generated "car identity" (epoch).
         # This changes when we detect a vehicle swap, so rpm_max resets correctly.
@@ -43,15 +58,41 @@ class BeamNGPlugin(TelemetryPlugin):
         self._had_activity = False  # prevents bumping epoch at startup/menu idling
 
     def open(self) -> None:
-        """Start UDP receiver and reset runtime state."""
+        """Attach to the OutGauge UDP receiver and reset runtime state."""
         self._proc.reset()
-        self._rx.start()
+        if SampleRing.default_capacity > 0:
+            self._history = SampleRing(_HISTORY_SIGNALS, getter=_history_sample)
+        self._rx = INGEST.acquire(LatestOutGaugeReceiver, "0.0.0.0", self._port)
+        self._rx.history = self._history
+        if self._notify is not None:
+            self._rx.on_packet = self._notify
 
         # Reset identity state on open (fresh session)
         self._car_epoch = 0
         self._idle_since = None
         self._had_activity = False
 
+        # Only open once OutGauge packets are live: a warm port answers at once, a freshly
+        # bound one gets a short grace period for its first packet.
+        deadline = self._rx.started_at + self._first_packet_wait
+        while True:
+            tel = self._rx.get_latest()
+            if tel is not None and time.time() - float(tel.ts) <= self._stale_after_s:
+                return
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(0.02)
+
+        self.close()
+        raise RuntimeError(f"BeamNG OutGauge not detected yet (no packets on port {self._port}).")
+
+    def set_notify(self, notify) -> None:
+        """Wake the runtime on every OutGauge packet, and when the BeamNG process exits."""
+        self._notify = notify
+        self._proc.on_exit = notify
+        if self._rx is not None:
+            self._rx.on_packet = notify
+
     def _has_live_telemetry(self, tel) -> bool:
         """Conservative filter to avoid false positives (menu/idle packets)."""
         if int(tel.rpm) > 0:
@@ -113,8 +154,11 @@ class BeamNGPlugin(TelemetryPlugin):
         """Return SSP frame dict, or None if no fresh telemetry yet."""
         if not self._proc.running():
             raise RuntimeError("BeamNG process closed")
+        if self._rx is None:
+            raise RuntimeError("BeamNGPlugin is not opened. Call open() first.")
 
         tel = self._rx.get_latest()
+        self._last_tel = tel
         if tel is None:
             return None
 
@@ -173,9 +217,23 @@ class BeamNGPlugin(TelemetryPlugin):
         caps["schema"] = "ssp/0.2"
         return caps
 
+    def stats(self):
+        """UDP ingest counters (packets/s, filtered, superseded)."""
+        return self._rx.stats() if self._rx is not None else None
+
+    def history(self):
+        """Every OutGauge sample received (for per-frame min/max/mean)."""
+        return self._history
+
+    def timing(self):
+        """Receive/decode stamps of the OutGauge packet behind the last frame."""
+        if self._rx is None or self._last_tel is None:
+            return None
+        return self._rx.timing_for(self._last_tel)
+
     def close(self) -> None:
-        """Stop UDP receiver."""
-        try:
-            self._rx.stop()
-        except Exception:
-            pass
+        """Detach from the UDP receiver (it keeps listening for re-detection)."""
+        self._proc.close()
+        INGEST.release(self._rx)
+        self._rx = None
+        self._history = None
@@ -1,20 +1,23 @@
 """Plugin registry and auto-detection.
 
-Auto mode is conservative: a plugin becomes active only after producing real telemetry frames."""
+Auto mode is conservative: a plugin becomes active only after producing real telemetry frames.
+All plugins are probed concurrently; the priority order (PLUGIN_ORDER, adjusted by running
+processes) decides between several live ones."""
 # ssp_bridge/plugins/registry.py
 from __future__ import annotations
 
 import time
-from typing import Dict, List, Type
-import sys
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Collection, Dict, List, Optional, Type
 
 
+from ssp_bridge.core.proc import PROCESSES
 from ssp_bridge.plugins.base import TelemetryPlugin
 from ssp_bridge.plugins.ac.plugin import ACPlugin
 from ssp_bridge.plugins.acc.plugin import ACCPlugin
 from ssp_bridge.plugins.ams2.plugin import AMS2Plugin
 from ssp_bridge.plugins.beamng.plugin import BeamNGPlugin
+from ssp_bridge.plugins.replay.plugin import ReplayPlugin
 
 # Notes:
 # - AC shared memory mapping can be created even when the game is not running
@@ -30,50 +33,15 @@ PLUGIN_ORDER: List[Type[TelemetryPlugin]] = [
 ]
 
 PLUGINS: Dict[str, Type[TelemetryPlugin]] = {p.id: p for p in PLUGIN_ORDER}
+# Selectable explicitly, never probed by auto-detect.
+PLUGINS[ReplayPlugin.id] = ReplayPlugin
 
-def _tasklist_image_names() -> set[str]:
-    """
-    Returns a set of running process image names (lowercase) on Windows.
-    On non-Windows, returns empty set.
-    """
-    if sys.platform != "win32":
-        return set()
-
-    try:
-        out = subprocess.check_output(
-            ["tasklist", "/FO", "CSV", "/NH"],
-            text=True,
-            encoding="utf-8",
-            errors="ignore",
-        )
-    except Exception:
-        return set()
-
-    names = set()
-    for line in out.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        # CSV: "Image Name","PID","Session Name","Session#","Mem Usage"
-        # We only need the first field
-        if line.startswith('"'):
-            parts = line.split('","')
-            if parts:
-                img = parts[0].strip('"').lower()
-                names.add(img)
-        else:
-            # fallback (rare)
-            img = line.split()[0].lower()
-            names.add(img)
-
-    return names
-
-
-def _prefer_assetto_plugin_order(default_order: list[type]) -> list[type]:
+def _prefer_assetto_plugin_order(default_order: list[type], procs: Optional[Collection[str]] = None) -> list[type]:
     """
     If we can tell AC vs ACC by running processes, reorder probe priority accordingly.
     """
-    procs = _tasklist_image_names()
+    if procs is None:
+        procs = PROCESSES.names()
 
     # Known executables:
     # ACC: AC2-Win64-Shipping.exe
@@ -103,54 +71,82 @@ def _prefer_assetto_plugin_order(default_order: list[type]) -> list[type]:
     return reordered
 
 
-def create_plugin(game_id: str) -> TelemetryPlugin:
+def create_plugin(game_id: str, **options) -> TelemetryPlugin:
+    """Instantiate a plugin by id; `options` are passed to its constructor (e.g. replay)."""
     game_id = (game_id or "").strip().lower()
     if game_id not in PLUGINS:
         raise ValueError(f"Unknown game/plugin id: {game_id}. Available: {', '.join(sorted(PLUGINS))}")
-    return PLUGINS[game_id]()
+    return PLUGINS[game_id](**options)
+
+
+def _close_quietly(plugin: TelemetryPlugin) -> None:
+    try:
+        plugin.close()
+    except Exception:
+        pass
+
+
+def _probe(plugin: TelemetryPlugin, procs: Collection[str], probe_timeout: float, probe_interval: float) -> None:
+    """Open `plugin` and wait for a real telemetry frame. Raises (plugin closed) if there is none."""
+    try:
+        plugin.open()
+
+        # Heuristic: if the simulator process is running,
+        # do not require an immediate telemetry frame during probing.
+        # (ACC/AC may sit in menus/loading and not update telemetry for a few seconds).
+        # Also applies to Proton/Wine on Linux, where the snapshot has the Windows image names.
+        if getattr(plugin, "id", None) == "acc" and "ac2-win64-shipping.exe" in procs:
+            return
+        if getattr(plugin, "id", None) == "ac" and (
+            "acs.exe" in procs or "assettocorsa.exe" in procs
+        ):
+            return
+
+        deadline = time.time() + float(probe_timeout)
+        while time.time() < deadline:
+            frame = plugin.read_frame()
+            if frame is not None:
+                return
+            time.sleep(float(probe_interval))
+
+        raise RuntimeError("opened but no live telemetry frames during probe")
+    except Exception:
+        _close_quietly(plugin)
+        raise
 
 
 def auto_detect_plugin(probe_timeout: float = 0.8, probe_interval: float = 0.02) -> TelemetryPlugin:
     """
-    Try plugins in order. A plugin only "wins" if it produces at least one
-    real telemetry frame within probe_timeout.
+    Probe every plugin at once (one thread each). A plugin only "wins" if it produces at
+    least one real telemetry frame within probe_timeout, and only once every plugin ahead of it
+    in priority order has failed; plugins that lose are closed.
+
+    Blocking: the runtime calls it through asyncio.to_thread().
     """
     errors = []
 
-    order = _prefer_assetto_plugin_order(list(PLUGIN_ORDER))
-    # Process cache (avoids calling tasklist in a tight loop).
-    procs = _tasklist_image_names()
-    
-    for plugin_cls in order:
-        plugin = plugin_cls()
-        try:
-            plugin.open()
-
-            # Heuristic: if the simulator process is running,
-            # do not require an immediate telemetry frame during probing.
-            # (ACC/AC may sit in menus/loading and not update telemetry for a few seconds).
-            if sys.platform == "win32":
-                if getattr(plugin, "id", None) == "acc" and "ac2-win64-shipping.exe" in procs:
-                    return plugin
-                if getattr(plugin, "id", None) == "ac" and (
-                    "acs.exe" in procs or "assettocorsa.exe" in procs
-                ):
-                    return plugin
-
-            deadline = time.time() + float(probe_timeout)
-            while time.time() < deadline:
-                frame = plugin.read_frame()
-                if frame is not None:
-                    return plugin
-                time.sleep(float(probe_interval))
-
-            raise RuntimeError("opened but no live telemetry frames during probe")
-
-        except Exception as e:
-            errors.append(f"{plugin_cls.__name__}: {e!r}")
-            try:
-                plugin.close()
-            except Exception:
-                pass
+    # One process snapshot for the whole cycle (shared background service, no subprocess).
+    procs = PROCESSES.names()
+    order = _prefer_assetto_plugin_order(list(PLUGIN_ORDER), procs)
 
-    raise RuntimeError("Auto-detect failed. Tried: " + ", ".join(errors))
\ No newline at end of file
+    plugins = [plugin_cls() for plugin_cls in order]
+    pool = ThreadPoolExecutor(max_workers=len(plugins), thread_name_prefix="ssp-probe")
+    try:
+        futures = [pool.submit(_probe, p, procs, probe_timeout, probe_interval) for p in plugins]
+        for i, (plugin, future) in enumerate(zip(plugins, futures)):
+            try:
+                future.result()
+            except Exception as e:
+                errors.append(f"{type(plugin).__name__}: {e!r}")
+                continue
+
+            # Lower-priority probes still running are closed when they finish.
+            for loser, pending in zip(plugins[i + 1:], futures[i + 1:]):
+                pending.add_done_callback(
+                    lambda f, p=loser: _close_quietly(p) if f.exception() is None else None
+                )
+            return plugin
+    finally:
+        pool.shutdown(wait=False)
+
+    raise RuntimeError("Auto-detect failed. Tried: " + ", ".join(errors))
@@ -0,0 +1,2 @@
+"""Replay plugin package."""
+from .plugin import ReplayPlugin
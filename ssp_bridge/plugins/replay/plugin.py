@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from ssp_bridge.plugins.base import TelemetryPlugin
+from ssp_bridge.core.capabilities import CAPABILITIES_AC
+
+from .reader import NdjsonSession
+
+
+class ReplayPlugin(TelemetryPlugin):
+    """Plays a recorded NDJSON session back through the full pipeline.
+
+    A player thread walks the session and publishes frames at their recorded pace divided
+    by `speed` (latest wins, like the UDP receivers). `speed=0` plays as fast as possible:
+    the player then hands over the next frame as soon as the previous one was read, so the
+    pipeline runs flat out (the runtime `--hz` limit still applies; raise it for benchmarks).
+
+    Frames are re-stamped with the wall clock (strictly increasing) and tagged with
+    `source: "replay"`; capabilities are taken from the recording when present.
+    Not part of auto-detect: select it explicitly (`--replay <file>`).
+    """
+
+    id = "replay"
+    name = "Session Replay"
+    push = True
+
+    def __init__(self, path: str = "", speed: float = 1.0, loop: bool = False, seek: float = 0.0) -> None:
+        if not path:
+            raise ValueError("replay plugin requires a session file (--replay <file>)")
+        self.path = path
+        self.speed = max(float(speed), 0.0)
+        self.loop = bool(loop)
+        self.start_at = max(float(seek), 0.0)
+        self.max_gap = 2.0  # seconds; longer pauses in the recording are skipped
+
+        self._session: Optional[NdjsonSession] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._cond = threading.Condition()
+
+        self._latest: Optional[Dict[str, Any]] = None
+        self._seek_to: Optional[float] = None
+        self._finished = False
+        self._last_ts = 0.0
+
+        self.frames_played = 0
+        self.loops = 0
+
+    def open(self) -> None:
+        """Map the session file and start the player thread."""
+        self._session = NdjsonSession(self.path)
+        if self._session.first_frame_ts is None:
+            self._session.close()
+            self._session = None
+            raise RuntimeError(f"no frames in {self.path}")
+
+        self._latest = None
+        self._finished = False
+        self._seek_to = self.start_at
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="replay-player", daemon=True)
+        self._thread.start()
+
+    def seek(self, seconds: float) -> None:
+        """Jump to `seconds` after the first recorded frame (thread-safe)."""
+        with self._cond:
+            self._seek_to = max(float(seconds), 0.0)
+            self._finished = False
+            self._cond.notify_all()
+
+    def finished(self) -> bool:
+        """True once a non-looping replay has played its last frame and it was read."""
+        with self._cond:
+            return self._finished and self._latest is None
+
+    def read_frame(self) -> Optional[Dict[str, Any]]:
+        with self._cond:
+            frame, self._latest = self._latest, None
+            if frame is not None:
+                self._cond.notify_all()  # as-fast-as-possible mode waits for consumption
+        if frame is None:
+            return None
+
+        # Re-stamp: the runtime deduplicates on ts, so it must strictly increase.
+        ts = time.time()
+        if ts <= self._last_ts:
+            ts = self._last_ts + 1e-6
+        self._last_ts = ts
+
+        out = dict(frame)
+        out["ts"] = ts
+        out["source"] = self.id
+        out["signals"] = dict(frame.get("signals") or {})
+        return out
+
+    def capabilities(self) -> Dict[str, Any]:
+        recorded = self._session.capabilities if self._session is not None else None
+        caps = dict(recorded or CAPABILITIES_AC)
+        caps["plugin"] = self.id
+        caps["schema"] = "ssp/0.2"
+        return caps
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+        self._thread = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    # --- Player thread ---
+
+    def _run(self) -> None:
+        sess = self._session
+        offset = sess.first_frame_offset
+        rec0: Optional[float] = None  # recorded ts <-> wall clock anchor
+        wall0 = prev_ts = 0.0
+
+        while not self._stop.is_set():
+            with self._cond:
+                seek_to, self._seek_to = self._seek_to, None
+            if seek_to is not None:
+                offset = sess.seek_ts(sess.first_frame_ts + seek_to)
+                rec0 = None
+
+            obj, nxt = sess.next_record(offset)
+            if obj is None and nxt >= sess.size:
+                if self.loop:
+                    self.loops += 1
+                    offset, rec0 = sess.first_frame_offset, None
+                    continue
+                with self._cond:
+                    self._finished = True
+                    self._cond.notify_all()
+                    while self._seek_to is None and not self._stop.is_set():
+                        self._cond.wait()
+                continue
+            offset = nxt
+
+            # Recorded status/capabilities events are not replayed: the runtime emits its own.
+            if obj is None or "type" in obj:
+                continue
+            ts = obj.get("ts")
+            if not isinstance(ts, (int, float)):
+                continue
+
+            ts = float(ts)
+            if self.speed > 0:
+                # Re-anchor after seek/loop, across recording gaps (simulator paused/lost)
+                # and when the player fell far behind, instead of sleeping or bursting.
+                if rec0 is None or not (0.0 <= ts - prev_ts <= self.max_gap):
+                    rec0, wall0 = ts, time.monotonic()
+                delay = wall0 + (ts - rec0) / self.speed - time.monotonic()
+                if delay > 0 and self._stop.wait(delay):
+                    return
+                if delay < -self.max_gap:
+                    rec0 = None
+                prev_ts = ts
+            else:
+                with self._cond:
+                    while self._latest is not None and not self._stop.is_set() and self._seek_to is None:
+                        self._cond.wait(0.5)
+
+            with self._cond:
+                self._latest = obj
+            self.frames_played += 1
+
+            cb = self._notify
+            if cb is not None:
+                try:
+                    cb()
+                except Exception:
+                    pass
@@ -0,0 +1,142 @@
+"""Memory-mapped NDJSON session reader.
+
+Opens recorded sessions instantly regardless of size: the file is mmapped and lines are
+only located on demand. Frame offsets/timestamps are indexed lazily as playback moves
+forward; seeks past the indexed region bisect the file by byte offset instead of scanning it."""
+# ssp_bridge/plugins/replay/reader.py
+from __future__ import annotations
+
+import json
+import mmap
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+def _parse(line: bytes) -> Optional[Dict[str, Any]]:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        obj = json.loads(line)
+    except ValueError:
+        return None  # torn last line of a session that was still being written
+    return obj if isinstance(obj, dict) else None
+
+
+class NdjsonSession:
+    """
+    Random access over a recorded NDJSON session.
+
+    - next_record(offset) -> (obj | None, next_offset)
+    - seek_ts(ts) -> offset of the first frame with frame ts >= ts
+    - frames are recognised by the absence of "type" (status/capabilities events carry one)
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        if self.path.suffix == ".gz":
+            raise ValueError(f"Compressed segments cannot be replayed directly (gunzip first): {self.path}")
+
+        self._file = open(self.path, "rb")
+        self.size = self.path.stat().st_size
+        self._mm: Optional[mmap.mmap] = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        )
+
+        # Lazy frame index (append-only, ts ascending): parallel compact arrays.
+        self._index_ts = array("d")
+        self._index_off = array("q")
+        self._indexed_until = 0  # byte offset up to which frames are indexed
+
+        self.first_frame_ts: Optional[float] = None
+        self.first_frame_offset: Optional[int] = None
+        self.capabilities: Optional[Dict[str, Any]] = None
+        self._scan_header()
+
+    # --- Lines ---
+
+    def _line_end(self, offset: int) -> int:
+        end = self._mm.find(b"\n", offset)
+        return self.size if end < 0 else end
+
+    def next_record(self, offset: int) -> Tuple[Optional[Dict[str, Any]], int]:
+        """Parse the line at `offset`. Returns (obj or None, offset of the next line)."""
+        if self._mm is None or offset >= self.size:
+            return None, self.size
+        end = self._line_end(offset)
+        obj = _parse(self._mm[offset:end])
+        nxt = end + 1
+
+        # Index frames as sequential playback passes them (contiguous, monotonic ts only).
+        if offset == self._indexed_until:
+            if obj is not None and "type" not in obj:
+                ts = obj.get("ts")
+                if isinstance(ts, (int, float)) and (not self._index_ts or ts >= self._index_ts[-1]):
+                    self._index_ts.append(float(ts))
+                    self._index_off.append(offset)
+            self._indexed_until = nxt
+        return obj, nxt
+
+    def _scan_header(self, max_lines: int = 1000) -> None:
+        """Find the first frame (and the capabilities recorded before it)."""
+        offset = 0
+        for _ in range(max_lines):
+            if offset >= self.size:
+                return
+            obj, nxt = self.next_record(offset)
+            if obj is not None:
+                if obj.get("type") == "capabilities" and self.capabilities is None:
+                    self.capabilities = obj.get("capabilities")
+                elif "type" not in obj and isinstance(obj.get("ts"), (int, float)):
+                    self.first_frame_ts = float(obj["ts"])
+                    self.first_frame_offset = offset
+                    return
+            offset = nxt
+
+    # --- Seeking ---
+
+    def _frame_at_or_after(self, offset: int) -> Tuple[Optional[float], int]:
+        """First frame starting at or after `offset` (line-aligned). Returns (ts, offset)."""
+        while offset < self.size:
+            end = self._line_end(offset)
+            obj = _parse(self._mm[offset:end])
+            if obj is not None and "type" not in obj and isinstance(obj.get("ts"), (int, float)):
+                return float(obj["ts"]), offset
+            offset = end + 1
+        return None, self.size
+
+    def seek_ts(self, ts: float) -> int:
+        """Byte offset of the first frame whose ts >= `ts` (end of file if none)."""
+        if self._mm is None:
+            return 0
+        idx = self._index_ts
+        if idx and ts <= idx[-1]:
+            return self._index_off[bisect_left(idx, ts)]
+
+        # Outside the indexed region: bisect byte offsets, aligning to line starts.
+        lo = self._indexed_until if idx else 0
+        hi = self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = 0 if mid == 0 else self._line_end(mid - 1) + 1
+            fts, foff = self._frame_at_or_after(start)
+            if fts is None or fts >= ts:
+                hi = mid
+            else:
+                lo = foff + 1
+        start = 0 if lo == 0 else self._line_end(lo - 1) + 1
+        return self._frame_at_or_after(start)[1]
+
+    def close(self) -> None:
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except Exception:
+                pass
+            self._mm = None
+        try:
+            self._file.close()
+        except Exception:
+            pass
@@ -0,0 +1,71 @@
+from ssp_bridge.core.delta import DeltaEncoder, apply_delta
+
+CAPS = {
+    "signals": {
+        "engine.rpm": {"type": "integer", "precision": 0},
+        "vehicle.speed_kmh": {"type": "number", "precision": 1},
+        "drivetrain.gear": {"type": "integer", "precision": 0},
+        "vehicle.car_id": {"type": "string"},
+    }
+}
+
+
+def _frame(rpm, speed, gear=3, car="ks_bmw"):
+    return {
+        "v": "0.2",
+        "ts": 1.0,
+        "source": "ac",
+        "signals": {
+            "engine.rpm": rpm,
+            "vehicle.speed_kmh": speed,
+            "drivetrain.gear": gear,
+            "vehicle.car_id": car,
+        },
+    }
+
+
+def test_keyframe_then_quantized_deltas_against_keyframe():
+    enc = DeltaEncoder(keyframe_interval=10.0)
+    enc.set_capabilities(CAPS)
+
+    key, is_key = enc.encode(_frame(5000, 100.01), now=0.0)
+    assert is_key and key["delta"] == "key"
+    assert key["signals"]["vehicle.speed_kmh"] == 100.0
+
+    # Float noise below precision is not a change.
+    d1, is_key = enc.encode(_frame(5000, 100.04), now=0.1)
+    assert not is_key
+    assert d1["signals"] == {} and d1["base"] == key["seq"]
+
+    d2, _ = enc.encode(_frame(5100, 100.04, gear=4), now=0.2)
+    assert d2["signals"] == {"engine.rpm": 5100, "drivetrain.gear": 4}
+
+    # Dropping d2 is harmless: d3 is still relative to the keyframe.
+    f3 = _frame(5200, 101.0, gear=4)
+    del f3["signals"]["vehicle.car_id"]
+    d3, _ = enc.encode(f3, now=0.3)
+    assert d3["removed"] == ["vehicle.car_id"]
+
+    state = {}
+    apply_delta(state, key)
+    assert apply_delta(state, d3) == {"engine.rpm": 5200, "vehicle.speed_kmh": 101.0, "drivetrain.gear": 4}
+
+
+def test_keyframe_interval_and_source_switch():
+    enc = DeltaEncoder(keyframe_interval=1.0)
+    enc.set_capabilities(CAPS)
+    k1, _ = enc.encode(_frame(1, 1.0), now=0.0)
+    _, is_key = enc.encode(_frame(1, 1.0), now=0.5)
+    assert not is_key
+    k2, is_key = enc.encode(_frame(1, 1.0), now=1.0)
+    assert is_key and k2["seq"] == k1["seq"] + 1
+
+    other = _frame(1, 1.0)
+    other["source"] = "acc"
+    _, is_key = enc.encode(other, now=1.1)
+    assert is_key
+
+    state = {}
+    apply_delta(state, k1)
+    stale, _ = enc.encode(other, now=1.2)
+    assert apply_delta(state, stale) is None
@@ -0,0 +1,61 @@
+import pytest
+
+from ssp_bridge.core.derived import Derivation, DerivedSignals, EngineRpmMax, EngineRpmPct
+from ssp_bridge.core.history import SampleRing
+
+
+def test_rpm_ratio_from_source_or_observed_peak():
+    derived = DerivedSignals([EngineRpmPct(), EngineRpmMax()])
+    assert derived.active == ("EngineRpmMax", "EngineRpmPct")
+
+    # Simulator rpm_max wins over the observed peak.
+    sig = {"engine.rpm": 6300, "engine.rpm_max": 7000}
+    derived.run(sig)
+    assert sig == {"engine.rpm": 6300, "engine.rpm_max": 7000, "engine.rpm_pct": 0.9}
+
+    # No rpm_max from the source: the peak between frames (window) counts.
+    ring = SampleRing(("engine.rpm",), capacity=8)
+    for rpm in (5000, 8000, 6000):
+        ring.append((rpm,))
+    sig = {"engine.rpm": 6000, "vehicle.car_id": "a"}
+    derived.run(sig, ring.window(0))
+    assert (sig["engine.rpm_max"], sig["engine.rpm_pct"]) == (8000, 0.75)
+
+    # Below the publish threshold after a car change: neither signal.
+    sig = {"engine.rpm": 2000, "vehicle.car_id": "b"}
+    derived.run(sig)
+    assert "engine.rpm_max" not in sig and "engine.rpm_pct" not in sig
+
+
+class _Counting(Derivation):
+    def __init__(self, inputs, outputs):
+        self.inputs, self.outputs = inputs, outputs
+        self.calls = 0
+
+    def derive(self, *values):
+        self.calls += 1
+        return {key: sum(values) for key in self.outputs}
+
+
+def test_stages_sorted_pruned_and_skipped_when_inputs_unchanged():
+    total = _Counting(("a.x2", "b"), ("a.total",))
+    double = _Counting(("a", "a"), ("a.x2",))
+    unused = _Counting(("b",), ("b.copy",))
+    derived = DerivedSignals([total, unused, double])
+    assert derived.active == ("_Counting",) * 3
+    assert derived.derivations[:2] == [unused, double]
+
+    derived.compile(lambda key: key == "a.total")
+    sig = {"a": 2, "b": 1}
+    derived.run(sig)
+    assert sig == {"a": 2, "b": 1, "a.x2": 4, "a.total": 5}
+    assert unused.calls == 0
+
+    sig = {"a": 2, "b": 1}
+    derived.run(sig)
+    assert sig["a.total"] == 5 and (double.calls, total.calls) == (1, 1)
+    derived.run({"a": 2, "b": 3})
+    assert (double.calls, total.calls) == (1, 2)
+
+    with pytest.raises(ValueError):
+        DerivedSignals([_Counting(("p",), ("q",)), _Counting(("q",), ("p",))])
@@ -0,0 +1,70 @@
+import pytest
+
+from ssp_bridge.core import filters
+from ssp_bridge.core.capabilities import CAPABILITIES_AC
+from ssp_bridge.core.filters import Ema, Median, OneEuro, RateLimit, SignalFilters, parse_filter_spec
+from ssp_bridge.core.history import SampleRing
+
+
+def test_filters_and_specs():
+    assert Ema(0.5).block([0.0, 8.0, 8.0], 0.01) == [0.0, 4.0, 6.0]
+    # A one-sample spike never gets through a median of 3.
+    assert Median(3).block([1.0, 1.0, 90.0, 1.0, 2.0], 0.01) == [1.0, 1.0, 1.0, 1.0, 2.0]
+    assert RateLimit(100.0).block([0.0, 50.0, 50.0, -10.0], 0.1) == [0.0, 10.0, 20.0, 10.0]
+
+    # One-euro: jitter is smoothed at rest, a fast move is followed closely.
+    euro = OneEuro(min_cutoff=1.0, beta=0.1)
+    rest = euro.block([50.0 + (0.5 if i % 2 else -0.5) for i in range(100)], 0.01)
+    assert max(rest[50:]) - min(rest[50:]) < 0.1
+    moved = euro.block([100.0] * 20, 0.01)
+    assert moved[-1] > 95.0
+
+    signal, chain = parse_filter_spec("engine.rpm=median:n=3+ema:alpha=0.5")
+    assert signal == "engine.rpm" and [type(f) for f in chain] == [Median, Ema]
+    assert (chain[0].n, chain[1].alpha) == (3, 0.5)
+    for bad in ("engine.rpm", "engine.rpm=lowpass", "engine.rpm=ema:alpha", "engine.rpm=ema:alpha=2"):
+        with pytest.raises(ValueError):
+            parse_filter_spec(bad)
+
+
+def test_stage_filters_every_sample_since_the_previous_frame():
+    stage = SignalFilters(dict(
+        parse_filter_spec(s)
+        for s in ("engine.rpm=median:n=3", "controls.throttle_pct=ema:alpha=0.5", "vehicle.car_id=ema")
+    ))
+    assert stage.bind(CAPABILITIES_AC) == ["vehicle.car_id"]
+
+    ring = SampleRing(("engine.rpm", "controls.throttle_pct"), capacity=16)
+    for rpm, thr in ((5000, 0.0), (5100, 0.0), (9000, 100.0), (5200, 100.0)):
+        ring.append((rpm, thr))
+    sig = {"engine.rpm": 5200, "controls.throttle_pct": 100.0, "vehicle.car_id": "x"}
+    stage.apply(sig, 1.0, ring.samples(0))
+    # Median of the last three samples, EMA over all four, rounded to the declared precision.
+    assert sig == {"engine.rpm": 5200, "controls.throttle_pct": 75.0, "vehicle.car_id": "x"}
+
+    # Without a history the frame value is the only sample.
+    sig = {"engine.rpm": 5300, "controls.throttle_pct": 100.0}
+    stage.apply(sig, 1.1)
+    assert sig == {"engine.rpm": 5300, "controls.throttle_pct": 87.5}
+
+    # Unexpected values pass through untouched instead of stopping the bridge.
+    sig = {"engine.rpm": "n/a", "controls.throttle_pct": float("nan")}
+    stage.apply(sig, 1.2)
+    assert sig["engine.rpm"] == "n/a" and sig["controls.throttle_pct"] != sig["controls.throttle_pct"]
+    sig = {"engine.rpm": 5400, "controls.throttle_pct": 100.0}
+    stage.apply(sig, 1.3)
+    assert sig == {"engine.rpm": 5400, "controls.throttle_pct": 93.8}
+
+
+def test_numpy_blocks_match_the_python_loop(monkeypatch):
+    np = pytest.importorskip("numpy")
+    xs = np.sin(np.arange(200) / 7.0) * 1000.0 + np.arange(200)
+    for make in (lambda: Ema(0.2), lambda: Median(5)):
+        vectorized, loop = make(), make()
+        loop.block(xs[:10].tolist(), 0.01)
+        vectorized.block(xs[:10].tolist(), 0.01)
+        fast = vectorized.block(xs[10:], 0.01)
+        monkeypatch.setattr(filters, "np", None)
+        slow = loop.block(xs[10:].tolist(), 0.01)
+        monkeypatch.undo()
+        assert np.allclose(fast, slow)
@@ -0,0 +1,28 @@
+from ssp_bridge.core.history import SampleRing
+
+
+def test_window_aggregates_since_cursor_across_wrap():
+    ring = SampleRing(("rpm", "brake"), capacity=8)
+    cursor = ring.head
+    for i in range(6):
+        ring.append((1000 + i, 0.0))
+    w = ring.window(cursor)
+    assert (w.count, w.dropped, w.end) == (6, 0, 6)
+    assert w.columns["rpm"] == (1000, 1005, 1002.5, 1005)
+
+    # 10 more samples into 8 slots: 7 readable (the 8th is the producer's next write).
+    for i in range(10):
+        ring.append((2000 + i, 90.0 if i == 4 else 0.0))
+    w = ring.window(w.end)
+    assert (w.count, w.dropped) == (7, 3)
+    assert w.columns["rpm"].min == 2003 and w.columns["brake"].max == 90.0
+    assert w.as_dict()["signals"]["rpm"]["last"] == 2009
+
+    assert ring.window(w.end) == (16, 0, 0, {})
+
+
+def test_getter_maps_decoded_values():
+    ring = SampleRing(("engine.rpm",), capacity=4, getter=lambda tel: (tel["rpm"],))
+    for rpm in (7000, 8200, 6900):
+        ring.add({"rpm": rpm})
+    assert ring.window(0).columns["engine.rpm"].max == 8200
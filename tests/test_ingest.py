@@ -0,0 +1,84 @@
+import socket
+import struct
+import threading
+import time
+
+from ssp_bridge.core.ingest import UDPIngest
+from ssp_bridge.plugins import registry
+from ssp_bridge.plugins.ams2.receiver import LatestUDPReceiver
+from ssp_bridge.plugins.base import TelemetryPlugin
+from ssp_bridge.plugins.beamng.receiver import LatestOutGaugeReceiver
+
+
+def _ams2_packet(packet_type: int, rpm: int) -> bytes:
+    buf = bytearray(559)
+    struct.pack_into("<II4B", buf, 0, rpm, rpm, 0, 1, packet_type, 2)
+    struct.pack_into("<H", buf, 40, rpm)
+    return bytes(buf)
+
+
+def test_released_receivers_keep_listening_and_are_reused():
+    ingest = UDPIngest()
+    activity = threading.Event()
+    ingest.on_activity = activity.set
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        rx = ingest.acquire(LatestUDPReceiver, "127.0.0.1", 0)
+        port = rx.port
+        assert ingest.acquire(LatestUDPReceiver, "127.0.0.1", port) is rx
+        try:
+            ingest.acquire(LatestOutGaugeReceiver, "127.0.0.1", port)
+            raise AssertionError("port conflict not detected")
+        except RuntimeError:
+            pass
+
+        rx.on_packet = lambda: None  # a plugin attached...
+        ingest.release(rx)           # ...and closed: no rebind, packets still land
+        tx.sendto(_ams2_packet(0, 4321), ("127.0.0.1", port))
+        assert activity.wait(2.0)
+        assert rx.listening and rx.get_latest().rpm == 4321
+    finally:
+        tx.close()
+        ingest.close()
+    assert not rx.listening
+
+
+class _Probe(TelemetryPlugin):
+    delay = 0.0
+    live = True
+    closed = None
+
+    def open(self):
+        pass
+
+    def read_frame(self):
+        time.sleep(self.delay)
+        if not self.live:
+            raise RuntimeError("no telemetry")
+        return {"v": "0.2", "ts": time.time(), "source": self.id, "signals": {}}
+
+    def capabilities(self):
+        return {}
+
+    def close(self):
+        self.closed.append(self.id)
+
+
+def test_auto_detect_probes_concurrently_in_priority_order(monkeypatch):
+    closed = []
+
+    def probe(pid, delay, live=True):
+        return type(pid, (_Probe,), {"id": pid, "delay": delay, "live": live, "closed": closed})
+
+    order = [probe("dead", 0.3, live=False), probe("slow", 0.3), probe("fast", 0.0)]
+    monkeypatch.setattr(registry, "PLUGIN_ORDER", order)
+
+    t0 = time.perf_counter()
+    plugin = registry.auto_detect_plugin(probe_timeout=1.0)
+    elapsed = time.perf_counter() - t0
+    # "fast" answered first, but "slow" ranks higher once "dead" has failed.
+    assert plugin.id == "slow" and elapsed < 0.55
+    deadline = time.time() + 1.0
+    while "fast" not in closed and time.time() < deadline:
+        time.sleep(0.01)
+    assert sorted(closed) == ["dead", "fast"]
@@ -0,0 +1,36 @@
+import time
+
+from ssp_bridge.core.latency import LatencyHistogram, LatencyTracker
+
+
+def test_histogram_percentiles_and_window_rotation():
+    h = LatencyHistogram(window=10.0)
+    t0 = time.monotonic()
+    for i in range(99):
+        h.record(0.0005, now=t0)
+    h.record(0.004, now=t0)
+
+    snap = h.snapshot(now=t0)
+    assert snap["count"] == 100
+    assert 0.45 <= snap["p50_ms"] <= 0.6  # bucket edge within 19%
+    assert snap["p99_ms"] <= 0.6 and snap["max_ms"] == 4.0
+
+    # Kept for one more half-window after rotating, dropped after a whole idle window.
+    assert h.snapshot(now=t0 + 6.0)["count"] == 100
+    assert h.snapshot(now=t0 + 21.0) == {"count": 0}
+
+
+def test_tracker_stages_from_receiver_timing():
+    tracker = LatencyTracker()
+    clock = tracker.start((1.000, 1.001, 1.002), read=1.004, emit=1.010)
+    clock.mark("derive", 1.0105)
+    clock.mark("encode", 1.011)
+    clock.mark("ws", 1.0115)
+    clock.done()
+
+    snap = tracker.snapshot()
+    assert set(snap) == {"queue", "decode", "pickup", "hold", "derive", "encode", "ws", "total"}
+    assert 0.9 <= snap["queue"]["max_ms"] <= 1.1
+    # The --hz wait is its own stage, not part of the processing after it.
+    assert 5.4 <= snap["hold"]["max_ms"] <= 6.6 and snap["derive"]["max_ms"] <= 0.6
+    assert 10.4 <= snap["total"]["max_ms"] <= 12.6
@@ -0,0 +1,50 @@
+import struct
+
+import pytest
+
+from ssp_bridge.core.layout import Field, PacketLayout
+from ssp_bridge.plugins.ams2 import receiver as ams2
+from ssp_bridge.plugins.beamng import receiver as beamng
+
+
+def test_layout_compiles_one_struct_with_shared_slots():
+    layout = PacketLayout(
+        [
+            Field("hi", 5, "B", lambda b: b >> 4),
+            Field("speed", 0, "f", lambda v: round(v, 1)),
+            Field("lo", 5, "B", lambda b: b & 0x0F),
+            Field("tag", 6, "2s"),
+        ],
+        size=10,
+    )
+    assert layout.struct.format == "<f1xB2s" and layout.size == 10
+
+    data = struct.pack("<fxB2s", 12.34, 0x5A, b"ok")
+    extract = layout.compile(extra=("ts",))
+    assert extract(data, 1.5) == {"ts": 1.5, "hi": 5, "lo": 10, "speed": 12.3, "tag": b"ok"}
+    assert layout.unpack(data) == {"hi": 5, "lo": 10, "speed": 12.3, "tag": b"ok"}
+    assert extract(b"\x00" + data, 0.0, offset=1)["lo"] == 10
+
+    with pytest.raises(struct.error):
+        extract(data[:6], 0.0)
+    with pytest.raises(ValueError):
+        PacketLayout([Field("a", 0, "I"), Field("b", 2, "H")])
+
+
+def test_receiver_layouts_decode_known_packets():
+    buf = bytearray(559)
+    struct.pack_into("<II4B", buf, 0, 1, 1, 0, 1, 0, 2)
+    struct.pack_into("<BB", buf, 29, 0, 255)
+    struct.pack_into("<f", buf, 36, 41.5)
+    struct.pack_into("<HHxB", buf, 40, 6500, 8000, 0x6F)
+    struct.pack_into("<4B", buf, 176, 80, 81, 92, 93)
+    tel = ams2._decode_car_physics(bytes(buf), 7.0)
+    assert tel == ams2.AMS2Telemetry(7.0, 6500, 8000, 41.5, 100.0, 0.0, -1, 6, (80, 81, 92, 93))
+
+    pkt = struct.pack(
+        beamng._OG_FMT, 0, b"beam", 0, b"\x03", b"\x00", 20.0, 3000.7,
+        0, 90, 0.5, 0, 90, 0, 0, 0.4, 1.5, 0, b"", b"", 0,
+    )
+    tel = beamng._decode_outgauge(pkt[:-4], 7.0)  # `id` is optional
+    assert (tel.gear, tel.rpm, tel.speed_ms, tel.brake_pct) == (2, 3000, 20.0, 100.0)
+    assert tel.throttle_pct == pytest.approx(40.0)
@@ -0,0 +1,54 @@
+import pytest
+
+from ssp_bridge.core.binary import layout_from_capabilities
+from ssp_bridge.core.capabilities import CAPABILITIES_AC
+from ssp_bridge.core.derived import DerivedSignals
+from ssp_bridge.core.leds import ShiftLights, ShiftProfile, ShiftProfiles
+
+
+def test_masks_thresholds_and_blink():
+    now = [0.0]
+    lights = ShiftLights(ShiftProfiles(
+        default=ShiftProfile(leds=4, start=0.5, shift=0.8, blink_hz=5),
+        cars={"mx5": ShiftProfile(leds=5, pattern="converge", rpm=[5000, 6000, 7000], blink_rpm=7500)},
+    ), clock=lambda: now[0])
+
+    # Default profile: steps at 50/60/70/80 % of rpm_max, blink from 80 %.
+    assert [lights.derive(rpm, 10000, "other")["hw.leds"] for rpm in (4000, 5000, 6500, 7999)] == [
+        0b0000, 0b0001, 0b0011, 0b0111,
+    ]
+    assert lights.derive(8000, 10000, None)["hw.leds"] == 0b1111
+    now[0] = 0.1  # second half of a 5 Hz period
+    assert lights.derive(8000, 10000, None)["hw.leds"] == 0
+    assert lights.derive(5000, None, None) is None  # needs rpm_max
+
+    # Car profile: absolute thresholds, LEDs converge from both ends, no rpm_max needed.
+    assert [lights.derive(rpm, None, "mx5")["hw.leds"] for rpm in (5000, 6000, 7000)] == [
+        0b10001, 0b11011, 0b11111,
+    ]
+    assert lights.derive(7600, None, "mx5")["hw.leds"] == 0
+
+    with pytest.raises(ValueError):
+        ShiftProfile(leds=4, rpm=[1, 2, 3])
+    with pytest.raises(ValueError):
+        ShiftProfile(leds=40)
+
+
+def test_leds_as_an_opt_in_derivation():
+    derived = DerivedSignals(extra=[ShiftLights(clock=lambda: 0.0, max_hz=30.0)])
+    caps = derived.capabilities(CAPABILITIES_AC)
+    assert caps["signals"]["hw.leds"]["max"] == 0xFF and "hw.leds" not in CAPABILITIES_AC["signals"]
+    # Rate of engine.rpm, capped by the emit rate.
+    assert caps["signals"]["hw.leds"]["hz"] == 30.0
+    assert DerivedSignals(extra=[ShiftLights()]).capabilities(CAPABILITIES_AC)["signals"]["hw.leds"]["hz"] == 60
+    assert [s.code for s in layout_from_capabilities(caps, ["hw.leds"])] == ["B"]
+
+    # A device that only wants the LEDs still pulls in the observed rpm_max.
+    derived.compile(lambda key: key == "hw.leds")
+    assert derived.active == ("EngineRpmMax", "ShiftLights")
+    sig = {"engine.rpm": 7000, "vehicle.car_id": "a"}
+    derived.run(sig)
+    assert sig["hw.leds"] == 0xFF  # at rpm_max: blinking, "on" phase
+    sig = {"engine.rpm": 5950}
+    derived.run(sig)
+    assert sig["hw.leds"] == 0b111  # 85 % of the observed 7000: three of 80..97 %
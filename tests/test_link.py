@@ -0,0 +1,33 @@
+from ssp_bridge.core.link import LinkStats
+
+
+def test_sequence_loss_reordering_duplicates_and_restart():
+    link = LinkStats(bits=32)
+    accepted = [link.check(s) for s in (10, 11, 14, 12, 12, 11, 15)]
+    assert accepted == [True, True, True, False, False, False, True]
+    assert (link.received, link.lost, link.reordered, link.duplicates) == (4, 1, 1, 2)
+
+    snap = link.snapshot()
+    assert snap["lost"] == 1 and snap["loss_pct"] == 20.0
+
+    # Game restarted: a counter far behind the window resynchronizes instead of being rejected.
+    assert link.check(100_000)  # beyond max_gap: resync, not 99985 lost
+    assert link.check(3) and link.check(4) and link.resyncs == 2 and link.lost == 1
+
+    # Counter wrap is a forward step, not a restart.
+    wrap = LinkStats(bits=32)
+    assert wrap.check(0xFFFFFFFE) and wrap.check(1) and not wrap.check(0xFFFFFFFF)
+    assert (wrap.lost, wrap.reordered, wrap.resyncs) == (1, 1, 0)
+
+
+def test_arrival_jitter_and_rate():
+    link = LinkStats()
+    t = 100.0
+    for i in range(400):
+        link.arrival(t)
+        t += 0.003 if i % 2 else 0.002  # 2.5 ms mean, +-0.5 ms
+    snap = link.snapshot(now=link._rate_ts + 1.0)
+    assert abs(snap["interval_ms"] - 2.5) < 0.1
+    assert abs(snap["jitter_ms"] - 0.5) < 0.05
+    assert snap["rate_hz"] == 400.0
+    assert "lost" not in snap  # no sequence numbers fed
@@ -0,0 +1,140 @@
+import json
+
+from ssp_bridge.core.serialize import SerializedFrame, serialize
+from ssp_bridge.outputs.ndjson import NdjsonWriter
+
+
+def _frame(rpm: int = 1000) -> dict:
+    return {
+        "v": "0.2",
+        "ts": 1.0,
+        "source": "ac",
+        "signals": {"engine.rpm": rpm, "vehicle.car_id": "ks_é"},
+    }
+
+
+def test_serialized_frame_is_encoded_once_and_shared():
+    sf = serialize(_frame())
+    assert serialize(sf) is sf
+    assert sf.text == '{"v":"0.2","ts":1.0,"source":"ac","signals":{"engine.rpm":1000,"vehicle.car_id":"ks_é"}}'
+    assert sf.data == sf.text.encode("utf-8")
+    assert sf.line == sf.data + b"\n"
+    assert sf.type is None
+
+    calls = []
+
+    def build(obj):
+        calls.append(1)
+        return obj["signals"]["engine.rpm"]
+
+    assert sf.encoding("rpm", build) == 1000
+    assert sf.encoding("rpm", build) == 1000
+    assert len(calls) == 1
+
+
+def test_ndjson_writer_accepts_dicts_and_serialized_frames(tmp_path):
+    path = tmp_path / "s.ndjson"
+    nd = NdjsonWriter(str(path))
+    nd.write(_frame(1))
+    nd.write(SerializedFrame(_frame(2)))
+    nd.close()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(l)["signals"]["engine.rpm"] for l in lines] == [1, 2]
+
+
+def test_ndjson_batch_mode_rotates_and_compresses(tmp_path):
+    import gzip
+
+    path = tmp_path / "s.ndjson"
+    nd = NdjsonWriter(
+        str(path),
+        flush="batch",
+        flush_bytes=1,
+        flush_interval=0.05,
+        rotate_bytes=200,
+        compress=True,
+    )
+    for i in range(20):
+        nd.write(_frame(i))
+    nd.close()
+
+    segments = sorted(tmp_path.glob("s.part*.ndjson.gz"))
+    assert len(segments) > 1
+    assert not list(tmp_path.glob("*.ndjson"))
+
+    rpms = []
+    for seg in segments:
+        with gzip.open(seg, "rt", encoding="utf-8") as f:
+            rpms += [json.loads(l)["signals"]["engine.rpm"] for l in f]
+    assert rpms == list(range(20))
+
+    # A second session with the same path continues the numbering instead of replacing segments.
+    nd = NdjsonWriter(str(path), rotate_bytes=200, compress=True)
+    for i in range(20, 25):
+        nd.write(_frame(i))
+    nd.close()
+    rpms = []
+    for seg in sorted(tmp_path.glob("s.part*.ndjson.gz")):
+        with gzip.open(seg, "rt", encoding="utf-8") as f:
+            rpms += [json.loads(l)["signals"]["engine.rpm"] for l in f]
+    assert rpms == list(range(25))
+
+
+def test_ws_client_queue_is_latest_wins_for_frames_and_keeps_events():
+    from ssp_bridge.outputs.ws import _Client
+
+    c = _Client(websocket=None, max_frames=1, max_events=2)
+    for i in range(5):
+        c.push_frame(serialize(_frame(i)))
+    assert c.queue_depth == 1
+    assert c.dropped_frames == 4
+    assert c.frames[0].obj["signals"]["engine.rpm"] == 4
+
+    # Other events keep the live frame.
+    c.push_event(serialize({"type": "stats", "latency": {}}))
+    assert len(c.frames) == 1 and c.dropped_frames == 4
+    c.events.clear()
+
+    # Events always survive; status/capabilities flush stale frames.
+    c.push_event(serialize({"type": "status", "state": "lost"}))
+    c.push_event(serialize({"type": "capabilities", "capabilities": {}}))
+    c.push_event(serialize({"type": "status", "state": "waiting"}))
+    assert not c.frames
+    assert [e.type for e in c.events] == ["capabilities", "status"]
+    assert c.events[-1].obj["state"] == "waiting"
+    assert c.coalesced_events == 1
+
+
+def test_ws_subscription_group_projects_and_clamps_rate():
+    from ssp_bridge.outputs.ws import _Group
+
+    caps = {
+        "signals": {
+            "engine.rpm": {"hz": 60},
+            "engine.rpm_max": {"hz": 1},
+            "controls.throttle_pct": {"hz": 60},
+            "vehicle.car_id": {"hz": 0},
+        }
+    }
+    g = _Group(("controls.*", "engine.rpm_max"), 120.0)
+    g.resolve_rate(caps)
+    assert g.hz == 60.0
+
+    sf = serialize({"v": "0.2", "ts": 1.0, "source": "ac", "signals": {
+        "engine.rpm": 5000, "engine.rpm_max": 8000, "controls.throttle_pct": 12.5,
+    }})
+    proj = g.project(sf)
+    assert proj.obj == {"v": "0.2", "ts": 1.0, "source": "ac", "signals": {
+        "engine.rpm_max": 8000, "controls.throttle_pct": 12.5,
+    }}
+    # Shared between groups with identical patterns via the frame's encoding cache.
+    assert _Group(("controls.*", "engine.rpm_max"), 10.0).project(sf) is proj
+
+    assert g.due(100.0)
+    assert not g.due(100.001)
+    assert g.due(100.02)
+
+    slow = _Group(("engine.rpm_max",), 0.0)
+    slow.resolve_rate(caps)
+    assert slow.hz == 1.0
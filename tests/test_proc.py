@@ -0,0 +1,95 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from ssp_bridge.core.proc import EXIT_WATCH_SUPPORTED, ExitWatcher, ProcessSnapshots, ProcessWatch, scan_proc
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self"), reason="needs /proc")
+def test_proc_scan_names_native_and_wine_processes(tmp_path):
+    me = scan_proc()
+    assert any(os.getpid() in pids for pids in me.values())
+
+    # Proton/Wine: comm is truncated, argv[0] carries the Windows path.
+    (tmp_path / "4242").mkdir()
+    (tmp_path / "4242" / "comm").write_bytes(b"AC2-Win64-Shipp\n")
+    (tmp_path / "4242" / "cmdline").write_bytes(b"Z:\\games\\acc\\AC2-Win64-Shipping.exe\0-dx11\0")
+    (tmp_path / "self").mkdir()
+    table = scan_proc(str(tmp_path))
+    assert table["ac2-win64-shipping.exe"] == (4242,) and "ac2-win64-shipp" in table
+
+
+def test_watches_share_one_snapshot_and_need_misses_to_report_exit():
+    scans = []
+    table = {"ac2-win64-shipping.exe": (7,)}
+
+    def scanner():
+        scans.append(1)
+        return dict(table)
+
+    snaps = ProcessSnapshots(interval=0.01, idle_timeout=0.2, scanner=scanner)
+    watches = [ProcessWatch("AC2-Win64-Shipping.exe", cache_ttl=0.0, snapshots=snaps) for _ in range(5)]
+    assert all(w.running() for w in watches) and len(scans) == 1
+
+    table.clear()
+    time.sleep(0.05)  # background refresh
+    w = watches[0]
+    assert w.running() and w.running()  # below miss_threshold
+    assert not w.running()
+
+    # Never seen: off Windows the sim may be on another host (mirrored pages).
+    ghost = ProcessWatch("acs.exe", cache_ttl=0.0, snapshots=snaps)
+    assert all(ghost.running() for _ in range(5)) == (sys.platform != "win32")
+
+    time.sleep(0.4)
+    assert snaps._thread is None  # idle: service thread stopped
+
+
+@pytest.mark.skipif(not EXIT_WATCH_SUPPORTED, reason="needs pidfd / OpenProcess")
+def test_exit_is_reported_the_moment_the_process_ends():
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    fired = threading.Event()
+    snaps = ProcessSnapshots(scanner=lambda: {"sim.exe": (child.pid,)} if child.poll() is None else {})
+    watch = ProcessWatch("sim.exe", cache_ttl=10.0, snapshots=snaps, on_exit=fired.set)
+    try:
+        assert watch.running() and watch._watcher is not None
+        t0 = time.perf_counter()
+        child.kill()
+        assert fired.wait(2.0)
+        assert time.perf_counter() - t0 < 0.5
+        assert not watch.running()  # despite cache_ttl and miss_threshold
+
+        watch.reset()  # closes the watcher
+        child.wait()
+        assert ExitWatcher.start(child.pid).exited.is_set()  # pid already gone
+    finally:
+        child.kill()
+        child.wait()
+        watch.close()
+
+
+@pytest.mark.skipif(not EXIT_WATCH_SUPPORTED, reason="no pidfd / process handles")
+def test_closing_after_exit_never_touches_reused_descriptors(tmp_path):
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    fired = threading.Event()
+    snaps = ProcessSnapshots(scanner=lambda: {"sim.exe": (child.pid,)} if child.poll() is None else {})
+    watch = ProcessWatch("sim.exe", cache_ttl=10.0, snapshots=snaps, on_exit=fired.set)
+    path = tmp_path / "reused"
+    try:
+        assert watch.running()
+        child.kill()
+        assert fired.wait(2.0)
+        # The watcher released its descriptors; new files may get the same numbers.
+        files = [open(path.with_suffix(f".{i}"), "wb") for i in range(4)]
+        watch.reset()
+        for f in files:
+            f.close()
+        assert all(path.with_suffix(f".{i}").read_bytes() == b"" for i in range(4))
+    finally:
+        child.kill()
+        child.wait()
+        watch.close()
@@ -0,0 +1,80 @@
+import json
+import time
+
+from ssp_bridge.plugins.registry import PLUGIN_ORDER, create_plugin
+from ssp_bridge.plugins.replay.reader import NdjsonSession
+
+
+def _write_session(path, n=200, hz=100.0):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"type": "status", "ts": 0.0, "state": "active", "source": "ac"}) + "\n")
+        caps = {"plugin": "ac", "signals": {"engine.rpm": {"type": "integer", "hz": 60}}}
+        f.write(json.dumps({"type": "capabilities", "ts": 0.0, "source": "ac", "capabilities": caps}) + "\n")
+        for i in range(n):
+            f.write(json.dumps({"v": "0.2", "ts": 500.0 + i / hz, "source": "ac", "signals": {"engine.rpm": i}}) + "\n")
+            if i == n // 2:
+                f.write(json.dumps({"type": "status", "ts": 0.0, "state": "lost", "source": "ac"}) + "\n")
+        f.write('{"v": "0.2", "ts": 99')  # torn last line
+
+
+def _rpm_at(sess, offset):
+    return sess.next_record(offset)[0]["signals"]["engine.rpm"]
+
+
+def test_session_seek_before_and_after_lazy_index(tmp_path):
+    path = tmp_path / "s.ndjson"
+    _write_session(path)
+    sess = NdjsonSession(path)
+    try:
+        assert sess.first_frame_ts == 500.0 and sess.capabilities["plugin"] == "ac"
+
+        # Nothing indexed past the header yet: bisection over byte offsets.
+        assert _rpm_at(sess, sess.seek_ts(501.505)) == 151
+        assert _rpm_at(sess, sess.seek_ts(500.0)) == 0
+        assert sess.seek_ts(10_000.0) == sess.size
+
+        # Sequential playback fills the index; seeks inside it use the index.
+        offset, seen = sess.first_frame_offset, 0
+        while offset < sess.size:
+            obj, offset = sess.next_record(offset)
+            seen += obj is not None and "type" not in obj
+        assert seen == 200 and len(sess._index_ts) == 200
+        assert _rpm_at(sess, sess.seek_ts(500.5)) == 50
+        assert _rpm_at(sess, sess.seek_ts(501.105)) == 111
+    finally:
+        sess.close()
+
+
+def test_replay_plugin_plays_every_frame_at_max_speed_and_loops(tmp_path):
+    path = tmp_path / "s.ndjson"
+    _write_session(path, n=50)
+    assert "replay" not in [p.id for p in PLUGIN_ORDER]
+
+    plugin = create_plugin("replay", path=str(path), speed=0, seek=0.1)
+    plugin.open()
+    try:
+        assert plugin.capabilities()["plugin"] == "replay"
+        rpms, last_ts = [], 0.0
+        deadline = time.time() + 5.0
+        while not plugin.finished() and time.time() < deadline:
+            frame = plugin.read_frame()
+            if frame is None:
+                time.sleep(0.0005)
+                continue
+            assert frame["source"] == "replay" and frame["ts"] > last_ts
+            last_ts = frame["ts"]
+            rpms.append(frame["signals"]["engine.rpm"])
+        assert rpms == list(range(10, 50))
+    finally:
+        plugin.close()
+
+    plugin = create_plugin("replay", path=str(path), speed=0, loop=True)
+    plugin.open()
+    try:
+        deadline = time.time() + 5.0
+        while plugin.loops < 2 and time.time() < deadline:
+            plugin.read_frame()
+            time.sleep(0.0005)
+        assert plugin.loops >= 2 and not plugin.finished()
+    finally:
+        plugin.close()
@@ -0,0 +1,215 @@
+"""Host-side harness for the binary serial mode: SerialOut writes into a pty pair and the
+reference decoder reads the other end, exactly like a microcontroller would."""
+import os
+import select
+import sys
+import time
+
+import pytest
+
+from ssp_bridge.core.binary import BinaryDecoder, BinaryEncoder, cobs_decode, cobs_encode, crc16_ccitt
+from ssp_bridge.core.capabilities import CAPABILITIES_AC
+from ssp_bridge.core.serialize import serialize
+
+
+def _frame(rpm: int) -> dict:
+    return {
+        "v": "0.2",
+        "ts": 1.0,
+        "source": "ac",
+        "signals": {
+            "engine.rpm": rpm,
+            "vehicle.speed_kmh": 123.46,
+            "drivetrain.gear": -1,
+            "controls.throttle_pct": 99.96,
+            "controls.brake_pct": 0.0,
+            "engine.rpm_pct": 0.8766,
+            "vehicle.car_id": "ks_bmw",
+        },
+    }
+
+
+def test_cobs_and_crc_round_trip():
+    assert crc16_ccitt(b"123456789") == 0x29B1
+    for data in (b"", b"\x00", b"\x00\x00", b"abc\x00def", bytes(range(256)) * 2, b"\x01" * 254):
+        enc = cobs_encode(data)
+        assert b"\x00" not in enc
+        assert cobs_decode(enc) == data
+
+
+def test_encoder_decoder_round_trip_and_corruption():
+    enc = BinaryEncoder()
+    dec = BinaryDecoder()
+    stream = enc.set_capabilities(CAPABILITIES_AC) + enc.encode_status("active") + enc.encode_frame(_frame(7000))
+
+    # Corrupt one packet: it must be skipped, not mis-decoded.
+    bad = bytearray(enc.encode_frame(_frame(1)))
+    bad[5] ^= 0x40
+    stream += bytes(bad) + enc.encode_frame(_frame(7100))
+
+    msgs = list(dec.feed(stream[:7])) + list(dec.feed(stream[7:]))
+    assert [m["kind"] for m in msgs] == ["layout", "status", "frame", "frame"]
+    assert dec.errors == 1
+
+    sig = msgs[2]["signals"]
+    assert sig["engine.rpm"] == 7000
+    assert sig["drivetrain.gear"] == -1
+    assert sig["vehicle.speed_kmh"] == pytest.approx(123.5)
+    assert sig["controls.throttle_pct"] == pytest.approx(100.0)
+    assert sig["engine.rpm_pct"] == pytest.approx(0.877)
+    assert "vehicle.car_id" not in sig
+    assert msgs[3]["signals"]["engine.rpm"] == 7100
+
+    # Non-finite values clear their presence bit instead of breaking the stream.
+    nan = _frame(7200)
+    nan["signals"].update({"engine.rpm_pct": float("nan"), "vehicle.speed_kmh": float("inf")})
+    sig = next(dec.feed(enc.encode_frame(nan)))["signals"]
+    assert sig["engine.rpm"] == 7200
+    assert "engine.rpm_pct" not in sig and "vehicle.speed_kmh" not in sig
+
+    # A compact frame: well under the ~200 bytes of the JSON line.
+    assert len(enc.encode_frame(_frame(7000))) < 32
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="pty pairs are POSIX-only")
+def test_serial_out_binary_mode_over_pty():
+    from ssp_bridge.outputs.serial_out import SerialOut
+
+    master, slave = os.openpty()
+    out = SerialOut(os.ttyname(slave), 115200, mode="binary", rate_hz=0)
+    try:
+        assert out.enabled
+        out.send(serialize({"type": "status", "state": "active", "source": "ac"}))
+        out.send(serialize({"type": "capabilities", "source": "ac", "capabilities": CAPABILITIES_AC}))
+        for rpm in range(5000, 5010):
+            out.send(serialize(_frame(rpm)))
+
+        dec = BinaryDecoder()
+        msgs = []
+        deadline = time.time() + 2.0
+        while time.time() < deadline and not any(
+            m["kind"] == "frame" and m["signals"]["engine.rpm"] == 5009 for m in msgs
+        ):
+            r, _, _ = select.select([master], [], [], 0.1)
+            if r:
+                msgs += list(dec.feed(os.read(master, 4096)))
+
+        assert msgs[0] == {"kind": "status", "state": "active"}
+        assert msgs[1]["kind"] == "layout"
+        # The writer thread coalesces frames (latest wins): order is kept and the newest arrives.
+        rpms = [m["signals"]["engine.rpm"] for m in msgs if m["kind"] == "frame"]
+        assert rpms and rpms == sorted(rpms) and rpms[-1] == 5009
+        assert dec.errors == 0
+    finally:
+        out.close()
+        os.close(master)
+        os.close(slave)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="pty pairs are POSIX-only")
+def test_serial_out_never_blocks_and_keeps_latest_frame_while_disconnected(tmp_path):
+    from ssp_bridge.outputs.serial_out import SerialOut
+
+    out = SerialOut(str(tmp_path / "missing-tty"), 115200, reconnect_interval=0.05)
+    try:
+        t0 = time.perf_counter()
+        out.send(serialize({"type": "status", "state": "active", "source": "ac"}))
+        for rpm in range(100):
+            out.send(serialize(_frame(rpm)))
+        assert time.perf_counter() - t0 < 0.1
+
+        assert not out.connected
+        st = out.stats()
+        assert st["frames"] == 0 and st["frames_coalesced"] == 99
+        assert out._frame is not None and b'"engine.rpm":99' in out._frame
+    finally:
+        out.close()
+
+
+def test_serial_out_retries_a_timed_out_header(monkeypatch):
+    import serial
+
+    from ssp_bridge.outputs.serial_out import SerialOut
+
+    written = []
+
+    class StalledOnce:
+        def __init__(self, *args, **kwargs):
+            self.stalled = False
+
+        def write(self, data):
+            if not self.stalled:
+                self.stalled = True
+                raise serial.SerialTimeoutException("write timeout")
+            written.append(data)
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(serial, "Serial", StalledOnce)
+    out = SerialOut("fake", 115200, mode="csv", signals=["engine.rpm"], rate_hz=0)
+    try:
+        out.send(serialize({"type": "capabilities", "source": "ac", "capabilities": CAPABILITIES_AC}))
+        out.send(serialize(_frame(5000)))
+        deadline = time.time() + 2.0
+        while time.time() < deadline and len(written) < 2:
+            time.sleep(0.01)
+        # The CSV header hit the timeout; it is sent again before the row, not lost.
+        assert written[0].startswith(b"#ssp,") and written[1] == b"5000\n"
+        assert out.stats()["stalls"] == 1
+    finally:
+        out.close()
+
+
+def test_parse_serial_spec():
+    from ssp_bridge.outputs.serial_hub import parse_serial_spec
+
+    cfg = parse_serial_spec("COM3")
+    assert (cfg.port, cfg.baud, cfg.encoding, cfg.hz, cfg.signals) == ("COM3", 115200, "json", 60, None)
+
+    cfg = parse_serial_spec("/dev/ttyUSB0:57600,enc=csv,hz=20,signals=engine.rpm+drivetrain.gear,precision=1")
+    assert (cfg.port, cfg.baud, cfg.encoding, cfg.hz) == ("/dev/ttyUSB0", 57600, "csv", 20)
+    assert cfg.signals == ["engine.rpm", "drivetrain.gear"] and cfg.precision == 1
+
+    assert parse_serial_spec("COM4", default_encoding="binary").encoding == "binary"
+    # Slow rates stay slow (0 would mean unlimited).
+    assert parse_serial_spec("COM3,hz=0.5").hz == 0.5
+    with pytest.raises(ValueError):
+        parse_serial_spec("COM3,enc=xml")
+    with pytest.raises(ValueError):
+        parse_serial_spec("COM3,hz=-1")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="pty pairs are POSIX-only")
+def test_serial_hub_shares_encoder_between_identical_devices():
+    from ssp_bridge.outputs.serial_hub import SerialConfig, SerialHub
+
+    ptys = [os.openpty() for _ in range(3)]
+    csv = dict(encoding="csv", signals=["engine.rpm", "drivetrain.gear"], hz=0)
+    hub = SerialHub([
+        SerialConfig(os.ttyname(ptys[0][1]), **csv),
+        SerialConfig(os.ttyname(ptys[1][1]), **csv),
+        SerialConfig(os.ttyname(ptys[2][1]), encoding="binary", hz=0),
+    ])
+    try:
+        assert hub.devices[0].encoder is hub.devices[1].encoder
+        assert hub.devices[2].encoder is not hub.devices[0].encoder
+
+        hub.send(serialize({"type": "capabilities", "source": "ac", "capabilities": CAPABILITIES_AC}))
+        hub.send(serialize(_frame(6500)))
+
+        for master, _ in ptys[:2]:
+            data = b""
+            deadline = time.time() + 2.0
+            while time.time() < deadline and b"6500,-1\n" not in data:
+                r, _, _ = select.select([master], [], [], 0.1)
+                if r:
+                    data += os.read(master, 4096)
+            assert data == b"#ssp,engine.rpm,drivetrain.gear\n6500,-1\n"
+
+        assert all(st["frames"] == 1 for st in hub.stats()[:2])
+    finally:
+        hub.close()
+        for master, slave in ptys:
+            os.close(master)
+            os.close(slave)
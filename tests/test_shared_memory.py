@@ -0,0 +1,124 @@
+import ctypes
+import mmap
+import threading
+import time
+
+from ssp_bridge.core.shm import FileMapping, SharedMapping
+from ssp_bridge.plugins.ac.shared_memory import ACSharedMemory, SPageFilePhysics
+from ssp_bridge.plugins.acc.shared_memory import ACCSharedMemory, SPageFilePhysicsACC, SPageFileStatic
+
+
+def test_physics_pages_match_published_layout():
+    assert SPageFilePhysics.gear.offset == 16
+    assert SPageFilePhysics.rpms.offset == 20
+    assert SPageFilePhysics.speedKmh.offset == 28
+    # ACC extends the AC page in place.
+    assert SPageFilePhysicsACC.P2PActivations.offset == ctypes.sizeof(SPageFilePhysics)
+    assert ctypes.sizeof(SPageFilePhysicsACC) == 800
+
+
+def test_reads_in_place_and_rereads_torn_pages():
+    page = SPageFilePhysicsACC()
+    page.packetId, page.gas, page.gear, page.rpms, page.speedKmh = 7, 0.5, 3, 6500, 120.0
+
+    sm = ACCSharedMemory()
+    sm._attach(ctypes.addressof(page))
+    frame = sm.read()
+    assert frame["signals"]["engine.rpm"] == 6500
+    assert frame["signals"]["controls.throttle_pct"] == 50.0
+
+    page.rpms = 7000  # no copy: the next read sees the live page
+    assert sm.read()["signals"]["engine.rpm"] == 7000
+    assert sm.last_packet_id == 7
+
+    class Torn:
+        """packetId moves on every access, as if the sim rewrote the page mid-read."""
+
+        gas = brake = 0.0
+        gear, rpms, speedKmh = 2, 5000, 80.0
+
+        def __init__(self):
+            self._pkt = 0
+
+        @property
+        def packetId(self):
+            self._pkt += 1
+            return self._pkt
+
+    ac = ACSharedMemory()
+    ac._phys = Torn()
+    assert ac.read() is None
+    ac._attach(ctypes.addressof(page))
+    assert ac.read()["signals"]["engine.rpm"] == 7000
+
+
+class _PageWriter(threading.Thread):
+    """Stand-in for the sim: rewrites a file-backed ACC physics page at 333 Hz."""
+
+    def __init__(self, directory, hz=333.0):
+        super().__init__(daemon=True)
+        path = directory / "acpmf_physics"
+        path.write_bytes(b"\x00" * ctypes.sizeof(SPageFilePhysicsACC))
+        self._file = open(path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        self.page = SPageFilePhysicsACC.from_buffer(self._mm)
+        self.period = 1.0 / hz
+        self.stop = threading.Event()
+
+    def run(self):
+        pkt = 0
+        while not self.stop.is_set():
+            pkt += 1
+            # Fields first, packetId last, like a sim finishing a physics step.
+            self.page.gas = 0.5
+            self.page.gear = 3
+            self.page.rpms = 3000 + pkt % 5000
+            self.page.speedKmh = float(pkt % 300)
+            self.page.packetId = pkt
+            time.sleep(self.period)
+
+    def close(self):
+        self.stop.set()
+        self.join()
+        del self.page
+        self._mm.close()
+        self._file.close()
+
+
+def test_file_backend_reads_pages_from_a_333hz_writer(tmp_path, monkeypatch):
+    monkeypatch.setattr(FileMapping, "directory", str(tmp_path))
+    monkeypatch.setattr(SharedMapping, "default_backend", "file")
+
+    sm = ACCSharedMemory()
+    try:
+        sm.open()
+        raise AssertionError("open() must fail before the page exists")
+    except RuntimeError:
+        pass
+
+    static = SPageFileStatic()
+    static.maxRpm = 9250
+    car = "porsche_992_gt3_r".encode("utf-16-le")
+    ctypes.memmove(ctypes.addressof(static) + SPageFileStatic.carModel.offset, car, len(car))
+    (tmp_path / "acpmf_static").write_bytes(bytes(static))
+
+    writer = _PageWriter(tmp_path)
+    writer.start()
+    try:
+        sm.open()
+        seen = set()
+        deadline = time.time() + 0.5
+        while time.time() < deadline:
+            frame = sm.read()
+            if frame is not None:
+                pkt = sm.last_packet_id
+                sig = frame["signals"]
+                assert sig["engine.rpm"] == 3000 + pkt % 5000  # never a torn frame
+                assert sig["vehicle.car_id"] == "porsche_992_gt3_r"
+                assert sig["engine.rpm_max"] == 9250
+                seen.add(pkt)
+            time.sleep(0.001)
+        assert len(seen) > 50  # ~166 pages written in 0.5 s
+    finally:
+        sm.close()
+        writer.close()
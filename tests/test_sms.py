@@ -0,0 +1,96 @@
+import socket
+import struct
+import time
+
+from ssp_bridge.plugins.ams2 import sms
+from ssp_bridge.plugins.ams2.receiver import LatestUDPReceiver
+
+
+def _header(packet_type, number=1, category=1, index=1, count=1):
+    return struct.pack("<II4B", number, category, index, count, packet_type, 2)
+
+
+def _participants_part(category, index, count, names):
+    buf = bytearray(sms.PARTICIPANTS.size)
+    buf[:12] = _header(sms.PACKET_PARTICIPANTS, category, category, index, count)
+    for i, name in enumerate(names):
+        struct.pack_into("64s", buf, 16 + 64 * i, name.encode())
+        struct.pack_into("<H", buf, 1104 + 2 * i, (index - 1) * 16 + i)
+    return bytes(buf)
+
+
+def _timings(local, position, lap, lap_time):
+    buf = bytearray(sms.TIMINGS.size)
+    buf[:12] = _header(sms.PACKET_TIMINGS)
+    struct.pack_into("<b", buf, 12, 2)
+    entry = 33 + 32 * local
+    struct.pack_into("<BB", buf, entry + 14, 0x80 | position, 1)
+    struct.pack_into("<BBf", buf, entry + 20, 0x80, lap, lap_time)
+    struct.pack_into("<H", buf, 1057, local)
+    return bytes(buf)
+
+
+def test_timings_decode_lazily_with_bit_fields():
+    packet = sms.SMSPacket.from_view(memoryview(_timings(1, 3, 7, 61.25)), 1.0)
+    assert packet.type == sms.PACKET_TIMINGS and packet._data is None  # nothing unpacked yet
+
+    me = packet.data["participants"][packet.data["local_participant_index"]]
+    assert (me["race_position"], me["active"], me["sector"]) == (3, True, 1)
+    assert (me["current_lap"], me["current_time"], me["lap_invalidated"]) == (7, 61.25, True)
+    assert packet.data is packet.data  # decoded once
+
+
+def test_partial_packets_are_reassembled_in_order():
+    asm = sms.PartialAssembler()
+    names = [f"driver {i}" for i in range(20)]
+    part1 = sms.SMSPacket.from_view(_participants_part(5, 1, 2, names[:16]), 1.0)
+    part2 = sms.SMSPacket.from_view(_participants_part(5, 2, 2, names[16:]), 1.1)
+
+    assert asm.add(part2) is None  # joined mid-packet: ignored
+    assert asm.add(part1) is None
+    packet = asm.add(part2)
+    assert packet is not None and len(packet.parts) == 2
+    decoded = packet.data["participants"]
+    assert [p["name"] for p in decoded] == names
+    assert decoded[17]["index"] == 17
+
+    # A new packet starting before the previous one completed counts as incomplete.
+    asm.add(sms.SMSPacket.from_view(_participants_part(6, 1, 2, names[:16]), 2.0))
+    asm.add(sms.SMSPacket.from_view(_participants_part(7, 1, 2, names[:16]), 2.1))
+    assert asm.incomplete == 1
+
+    # Losing the first part of the next packet abandons the pending one once, not once per part.
+    asm = sms.PartialAssembler()
+    asm.add(sms.SMSPacket.from_view(_participants_part(10, 1, 3, names[:16]), 3.0))
+    for index in (2, 3):
+        assert asm.add(sms.SMSPacket.from_view(_participants_part(20, index, 3, names[16:]), 3.1)) is None
+    assert asm.incomplete == 1
+
+
+def test_receiver_keeps_subscribed_types_only():
+    rx = LatestUDPReceiver(host="127.0.0.1", port=0, packet_types=(sms.PACKET_TIMINGS, sms.PACKET_PARTICIPANTS))
+    rx.start()
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        names = [f"driver {i}" for i in range(20)]
+        datagrams = [
+            _participants_part(9, 1, 2, names[:16]),
+            _participants_part(9, 2, 2, names[16:]),  # same batch: both parts must survive
+            _timings(0, 2, 4, 12.5),
+            _header(sms.PACKET_GAME_STATE) + bytes(12),  # not subscribed
+        ]
+        for number, d in enumerate(datagrams, 1):
+            # mPacketNumber counts every packet sent (late/duplicate ones are dropped).
+            tx.sendto(struct.pack("<I", number) + d[4:], ("127.0.0.1", rx.port))
+
+        deadline = time.time() + 2.0
+        while time.time() < deadline and rx.stats()["packets"] < len(datagrams):
+            time.sleep(0.01)
+
+        assert rx.stats()["filtered"] == 1
+        assert rx.packet(sms.PACKET_GAME_STATE) is None
+        assert len(rx.packet(sms.PACKET_PARTICIPANTS).data["participants"]) == 20
+        assert rx.packet(sms.PACKET_TIMINGS).data["participants"][0]["race_position"] == 2
+    finally:
+        tx.close()
+        rx.stop()
@@ -0,0 +1,147 @@
+import socket
+import struct
+import time
+
+from ssp_bridge.core import udp
+from ssp_bridge.plugins.ams2.receiver import LatestUDPReceiver
+
+
+def _ams2_packet(packet_type: int, rpm: int) -> bytes:
+    buf = bytearray(559)
+    struct.pack_into("<II4B", buf, 0, rpm, rpm, 0, 1, packet_type, 2)
+    struct.pack_into("<H", buf, 40, rpm)
+    return bytes(buf)
+
+
+def test_batch_receiver_filters_by_type_and_keeps_newest():
+    wakeups = []
+    rx = LatestUDPReceiver(host="127.0.0.1", port=0, on_packet=lambda: wakeups.append(1))
+    rx.start()
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sent = 0
+        for rpm in range(1000, 1100):
+            tx.sendto(_ams2_packet(rpm % 4, rpm), ("127.0.0.1", rx.port))  # types 0..3
+            sent += 1
+        tx.sendto(b"\x00" * 8, ("127.0.0.1", rx.port))  # runt
+        sent += 1
+
+        deadline = time.time() + 2.0
+        while time.time() < deadline and rx.stats()["packets"] < sent:
+            time.sleep(0.01)
+
+        st = rx.stats()
+        assert st["packets"] == sent
+        assert st["filtered"] == 76  # 75 non-physics + 1 runt
+        assert st["superseded"] + len(wakeups) == 25 and st["errors"] == 0
+        assert rx.get_latest().rpm == 1096  # newest eCarPhysics packet
+    finally:
+        tx.close()
+        rx.stop()
+
+
+def test_asyncio_transport_decodes_on_the_loop_without_threads():
+    import asyncio
+    import threading
+
+    async def scenario():
+        woke = []
+        rx = LatestUDPReceiver(host="127.0.0.1", port=0, on_packet=lambda: woke.append(threading.get_ident()))
+        rx.start()
+        tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            assert rx.transport == "asyncio" and rx._thread is None
+            # Before the loop runs the transport, get_latest() drains synchronously (blocking open()).
+            tx.sendto(_ams2_packet(0, 3000), ("127.0.0.1", rx.port))
+            deadline = time.time() + 1.0
+            while rx.get_latest() is None and time.time() < deadline:
+                time.sleep(0.01)
+            assert rx.get_latest().rpm == 3000
+
+            await asyncio.sleep(0.05)  # transport attached
+            for rpm in (3001, 3002):
+                tx.sendto(_ams2_packet(0, rpm), ("127.0.0.1", rx.port))
+            tx.sendto(_ams2_packet(3, 9999), ("127.0.0.1", rx.port))
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if rx.stats()["packets"] == 4:
+                    break
+            assert rx.get_latest().rpm == 3002 and rx.stats()["filtered"] == 1
+            assert set(woke) == {threading.get_ident()}
+        finally:
+            tx.close()
+            rx.stop()
+        assert rx.transport == "" and rx._sock is None
+
+    asyncio.run(scenario())
+
+
+def test_receiver_keeps_stage_stamps_per_published_value():
+    kernel = LatestUDPReceiver.kernel_timestamps
+    LatestUDPReceiver.kernel_timestamps = udp.KERNEL_TIMESTAMPS_SUPPORTED
+    rx = LatestUDPReceiver(host="127.0.0.1", port=0)  # no running loop: thread transport
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        rx.start()
+        before = time.perf_counter()
+        tx.sendto(_ams2_packet(0, 4000), ("127.0.0.1", rx.port))
+        deadline = time.time() + 2.0
+        while rx.get_latest() is None and time.time() < deadline:
+            time.sleep(0.005)
+
+        tel = rx.get_latest()
+        k, recv, decoded = rx.timing_for(tel)
+        assert before <= recv <= decoded <= time.perf_counter()
+        if udp.KERNEL_TIMESTAMPS_SUPPORTED:
+            assert rx.stats()["kernel_timestamps"]
+            # Wall-clock kernel stamp mapped onto perf_counter (allow clock-read jitter).
+            assert before - 0.005 <= k <= recv + 0.005
+        assert rx.timing_for(object()) is None
+    finally:
+        LatestUDPReceiver.kernel_timestamps = kernel
+        tx.close()
+        rx.stop()
+
+
+def test_late_and_duplicate_datagrams_never_replace_newer_data():
+    rx = LatestUDPReceiver(host="127.0.0.1", port=0)
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        rx.start()
+        # mPacketNumber == rpm here: 5003 arrives after 5005, 5005 twice, 5004 never.
+        for rpm in (5000, 5001, 5002, 5005, 5003, 5005, 5006):
+            tx.sendto(_ams2_packet(0, rpm), ("127.0.0.1", rx.port))
+            time.sleep(0.002)  # separate batches
+        deadline = time.time() + 2.0
+        while rx.stats()["packets"] < 7 and time.time() < deadline:
+            time.sleep(0.01)
+
+        link = rx.stats()["link"]
+        assert (link["received"], link["lost"], link["reordered"], link["duplicates"]) == (5, 1, 1, 1)
+        assert rx.get_latest().rpm == 5006
+    finally:
+        tx.close()
+        rx.stop()
+
+
+def test_history_keeps_superseded_samples():
+    from ssp_bridge.core.history import SampleRing
+
+    ring = SampleRing(("rpm",), capacity=64, getter=lambda tel: (tel.rpm,))
+    rx = LatestUDPReceiver(host="127.0.0.1", port=0, history=ring)  # thread transport
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        rx.start()
+        for rpm in range(6000, 6040):
+            tx.sendto(_ams2_packet(0, rpm), ("127.0.0.1", rx.port))
+        tx.sendto(_ams2_packet(3, 9000), ("127.0.0.1", rx.port))  # other kind: not recorded
+        deadline = time.time() + 2.0
+        while rx.stats()["packets"] < 41 and time.time() < deadline:
+            time.sleep(0.01)
+
+        w = ring.window(0)
+        assert w.count == 40 and w.columns["rpm"] == (6000, 6039, 6019.5, 6039)
+        assert rx.get_latest().rpm == 6039
+    finally:
+        tx.close()
+        rx.stop()